@@ -0,0 +1,328 @@
+"""
+Facade asyncio untuk WhisperEngine.
+
+Berbeda dengan `WhisperEngine.transcribe_*` yang memblokir dan mengubah
+exception menjadi string "Error: ...", setiap pemanggilan di sini langsung
+mengembalikan `TranscriptionJob` yang bisa di-await, dibatalkan, dan diberi
+batas waktu. Inferensi berjalan di ThreadPoolExecutor berukuran tetap,
+sehingga event loop (UI, CLI batch, server) tidak pernah terblokir.
+
+Contoh:
+    async def main():
+        engine = AsyncWhisperEngine(max_workers=2)
+        job = engine.submit_file("base", "rekaman.wav", timeout=300,
+                                 on_progress=lambda job, seg: print(job.progress))
+        try:
+            result = await job
+            print(result.text)
+        except JobError as e:
+            print(e)
+
+Pembatalan dan deadline bersifat kooperatif: transkripsi file berhenti di
+batas jendela berikutnya, sedangkan satu inferensi segmen yang sudah
+berjalan tetap diselesaikan (whisper.cpp tidak bisa diinterupsi).
+"""
+import sys
+import time
+import asyncio
+import argparse
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from whisper_engine import WhisperEngine, TranscriptionStopped, AVAILABLE_MODELS, FILE_WINDOW_SEC, FILE_OVERLAP_SEC
+from audio_frontend import audio_duration
+from segments import SegmentTable
+
+DEFAULT_MAX_WORKERS = 2  # Jumlah inferensi yang boleh berjalan bersamaan
+
+# Status job
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+JOB_TIMEOUT = "timeout"
+
+
+class JobError(Exception):
+    """
+    Dasar semua error job; `job` menunjuk ke TranscriptionJob yang gagal.
+    """
+    def __init__(self, job, message):
+        super().__init__(message)
+        self.job = job
+
+
+class JobCancelled(JobError):
+    pass
+
+
+class JobTimeout(JobError):
+    pass
+
+
+class TranscriptionFailed(JobError):
+    """
+    Inferensi atau pembacaan audio gagal; exception aslinya ada di `__cause__`
+    (untuk job file, error yang sudah ditangani engine hanya ada di pesan).
+    """
+    pass
+
+
+def _discard_outcome(future):
+    # Hasil worker yang ditinggal (timeout/cancel) tetap diambil agar asyncio tidak memperingatkan
+    if not future.cancelled():
+        future.exception()
+
+
+class TranscriptionResult:
+    """
+    Hasil terstruktur satu job.
+    """
+    def __init__(self, model_name, text, process_time, segments=None, source=None, cached=False,
+                 segment_table=None):
+        self.model_name = model_name
+        self.text = text
+        self.process_time = process_time
+        self.segments = segments or []
+        self.source = source  # Path file, atau None untuk segmen dari memori
+        self.cached = cached
+        self.segment_table = segment_table  # SegmentTable: waktu, token dan probabilitas per segmen whisper
+
+    def to_dict(self):
+        return {
+            "model": self.model_name,
+            "text": self.text,
+            "process_time": self.process_time,
+            "segments": self.segments,
+            "segment_table": self.segment_table.to_dicts() if self.segment_table is not None else None,
+            "source": self.source,
+            "cached": self.cached,
+        }
+
+    def __repr__(self):
+        return f"TranscriptionResult(model={self.model_name!r}, process_time={self.process_time:.2f}, text={self.text[:40]!r})"
+
+
+class TranscriptionJob:
+    """
+    Handle satu job. `await job` mengembalikan TranscriptionResult atau
+    melempar JobError (JobCancelled / JobTimeout / TranscriptionFailed).
+    """
+    _ids = itertools.count(1)
+
+    def __init__(self, kind, model_name, source=None):
+        self.id = next(self._ids)
+        self.kind = kind  # "file" atau "segment"
+        self.model_name = model_name
+        self.source = source
+        self.status = JOB_PENDING
+        self.progress = 0.0  # 0..1, diperbarui per jendela untuk job file
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._cancel_event = threading.Event()  # Dibaca thread worker di antara jendela
+        self._task = None
+
+    def cancel(self):
+        """
+        Meminta pembatalan. Job yang belum mulai tidak akan dijalankan.
+        """
+        self._cancel_event.set()
+        if self._task is not None:
+            self._task.cancel()
+
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def done(self):
+        return self._task is not None and self._task.done()
+
+    def __await__(self):
+        return self._task.__await__()
+
+    async def result(self):
+        return await self._task
+
+    def __repr__(self):
+        return f"TranscriptionJob(id={self.id}, kind={self.kind}, model={self.model_name!r}, status={self.status})"
+
+
+class AsyncWhisperEngine:
+    """
+    Menjalankan job transkripsi di executor terbatas dan memberikan handle asyncio.
+
+    `engine` boleh dipakai bersama komponen lain (mis. LiveWorker) karena
+    semua pemanggilan model tetap lewat `WhisperEngine._infer`.
+    """
+    def __init__(self, engine=None, max_workers=DEFAULT_MAX_WORKERS):
+        self.engine = engine or WhisperEngine()
+        self.max_workers = max(1, int(max_workers))
+        self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="whisper-job")
+        self._jobs = {}
+
+    def submit_file(self, model_name, audio_file_path, on_progress=None, timeout=None,
+                    window_sec=FILE_WINDOW_SEC, overlap_sec=FILE_OVERLAP_SEC, return_segments=False):
+        """
+        Menjadwalkan transkripsi file per jendela lewat
+        `WhisperEngine.transcribe_file_streaming` (cache hasil ikut dipakai).
+        `on_progress(job, segment)` dipanggil di event loop setiap satu
+        jendela selesai. `return_segments` mengisi `result.segment_table`.
+        Harus dipanggil dari dalam event loop yang sedang berjalan.
+        """
+        job = TranscriptionJob("file", model_name, audio_file_path)
+        loop = asyncio.get_running_loop()
+        work = (self._run_file, job, loop, on_progress, window_sec, overlap_sec, return_segments)
+        return self._start(job, loop, work, timeout)
+
+    def submit_segment(self, model_name, audio, timeout=None):
+        """
+        Menjadwalkan transkripsi potongan audio (numpy float32 16kHz).
+        """
+        job = TranscriptionJob("segment", model_name)
+        loop = asyncio.get_running_loop()
+        return self._start(job, loop, (self._run_segment, job, audio), timeout)
+
+    async def transcribe_file(self, model_name, audio_file_path, **kwargs):
+        return await self.submit_file(model_name, audio_file_path, **kwargs)
+
+    async def transcribe_segment(self, model_name, audio, **kwargs):
+        return await self.submit_segment(model_name, audio, **kwargs)
+
+    def jobs(self):
+        """
+        Job yang belum selesai.
+        """
+        return [job for job in self._jobs.values() if not job.done()]
+
+    def cancel_all(self):
+        for job in self.jobs():
+            job.cancel()
+
+    def shutdown(self, wait=True):
+        """
+        Membatalkan semua job dan menghentikan executor.
+        """
+        self.cancel_all()
+        self._executor.shutdown(wait=wait)
+
+    def _start(self, job, loop, work, timeout):
+        future = loop.run_in_executor(self._executor, *work)
+        job._task = loop.create_task(self._supervise(job, future, timeout))
+        self._jobs[job.id] = job
+        job._task.add_done_callback(lambda _: self._jobs.pop(job.id, None))
+        return job
+
+    async def _supervise(self, job, future, timeout):
+        try:
+            # shield: timeout/cancel tidak membatalkan future sebelum worker sempat berhenti
+            result = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            job._cancel_event.set()
+            future.add_done_callback(_discard_outcome)
+            job.status = JOB_TIMEOUT
+            job.finished = time.time()
+            raise JobTimeout(job, f"Job {job.id} ({job.model_name}) melewati batas {timeout} detik") from None
+        except asyncio.CancelledError:
+            job._cancel_event.set()
+            future.cancel()  # Berhasil jika job belum mulai di executor
+            future.add_done_callback(_discard_outcome)
+            job.status = JOB_CANCELLED
+            job.finished = time.time()
+            raise JobCancelled(job, f"Job {job.id} ({job.model_name}) dibatalkan") from None
+        except JobCancelled:
+            job.status = JOB_CANCELLED
+            job.finished = time.time()
+            raise
+        except JobError:
+            job.status = JOB_FAILED
+            job.finished = time.time()
+            raise
+        job.status = JOB_DONE
+        job.progress = 1.0
+        job.finished = time.time()
+        return result
+
+    def _check_cancelled(self, job):
+        if job._cancel_event.is_set():
+            raise JobCancelled(job, f"Job {job.id} ({job.model_name}) dibatalkan")
+
+    def _begin(self, job):
+        self._check_cancelled(job)
+        job.status = JOB_RUNNING
+        job.started = time.time()
+
+    def _run_file(self, job, loop, on_progress, window_sec, overlap_sec, return_segments):
+        self._begin(job)
+        duration = 0.0
+        segments = []
+
+        def on_segment(segment):
+            segments.append(segment)
+            job.progress = min(1.0, segment['end'] / duration) if duration else 0.0
+            if on_progress is not None:
+                loop.call_soon_threadsafe(on_progress, job, segment)
+
+        try:
+            duration = audio_duration(job.source)
+            # Titik pembatalan: di antara jendela
+            output = self.engine.transcribe_file_streaming(
+                job.model_name, job.source, on_segment, window_sec, overlap_sec,
+                return_segments=return_segments, should_stop=job._cancel_event.is_set
+            )
+        except TranscriptionStopped:
+            raise JobCancelled(job, f"Job {job.id} ({job.model_name}) dibatalkan") from None
+        except Exception as e:
+            raise TranscriptionFailed(job, f"Transkripsi '{job.model_name}' gagal: {e}") from e
+        text, process_time = output[:2]
+        if text.startswith("Error:"):
+            raise TranscriptionFailed(job, f"Transkripsi '{job.model_name}' gagal: {text}")
+        cached = any(segment.get('cached') for segment in segments)
+        return TranscriptionResult(job.model_name, text, process_time, segments, job.source, cached=cached,
+                                   segment_table=output[2] if return_segments else None)
+
+    def _run_segment(self, job, audio):
+        self._begin(job)
+        try:
+            t_start = time.time()
+            result = self.engine._infer(job.model_name, audio)
+            process_time = time.time() - t_start
+        except Exception as e:
+            raise TranscriptionFailed(job, f"Transkripsi segmen '{job.model_name}' gagal: {e}") from e
+        table = SegmentTable()
+        table.add_result(result)
+        return TranscriptionResult(job.model_name, table.text().strip(), process_time, table.to_dicts(),
+                                   segment_table=table)
+
+
+async def _run_cli(args):
+    engine = AsyncWhisperEngine(max_workers=args.workers)
+
+    def progress(job, segment):
+        print(f"  [{job.model_name}] {job.progress * 100:5.1f}%  {segment['text']}")
+
+    jobs = [engine.submit_file(m, args.audio, on_progress=progress, timeout=args.timeout)
+            for m in args.models]
+    results = await asyncio.gather(*[job.result() for job in jobs], return_exceptions=True)
+    for job, result in zip(jobs, results):
+        if isinstance(result, JobError):
+            print(f"{job.model_name}: {job.status} - {result}")
+        else:
+            print(f"{job.model_name}: {result.process_time:.2f} dtk{' (cache)' if result.cached else ''}\n  {result.text}")
+    engine.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transkripsi file dengan beberapa model secara async.")
+    parser.add_argument("audio")
+    parser.add_argument("--models", nargs="+", default=["base"], choices=AVAILABLE_MODELS)
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument("--timeout", type=float, default=None, help="Batas waktu per job (detik)")
+    args = parser.parse_args(argv)
+    asyncio.run(_run_cli(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+import os
+import json
+import hashlib
+import threading
+from math import gcd
+
+import numpy as np
+import soundfile as sf
+
+TARGET_SAMPLE_RATE = 16000  # Whisper selalu bekerja di 16kHz mono
+READ_BLOCK_SEC = 5  # Ukuran blok saat membaca file secara streaming
+
+# Filter anti-aliasing resampler (setara default scipy.signal.resample_poly)
+FILTER_HALF_LEN_FACTOR = 10  # Panjang setengah filter = faktor x max(up, down)
+KAISER_BETA = 5.0
+OUTPUT_CHUNK = 8192  # Sampel output per langkah vektor (membatasi memori sementara)
+
+# Cache audio yang sudah dinormalisasi (16kHz mono float32, format .npy)
+AUDIO_CACHE_DIR = "./cache/audio"
+AUDIO_CACHE_MAX_MB = 1024  # Batas total file .npy; yang paling lama tidak dipakai dihapus lebih dulu
+HASH_CHUNK_BYTES = 1 << 20
+
+
+class PolyphaseResampler:
+    """
+    Resampler polyphase rasional (up/down) yang menyimpan state antar blok.
+
+    Filter low-pass windowed-sinc (Kaiser) dipecah menjadi `up` fase sehingga
+    setiap sampel output hanya menghitung tap yang tidak nol. Hasil per blok
+    identik dengan memproses seluruh sinyal sekaligus; panggil `flush()` di
+    akhir untuk mengeluarkan ekor filter.
+    """
+    def __init__(self, orig_sr, target_sr=TARGET_SAMPLE_RATE):
+        g = gcd(int(orig_sr), int(target_sr))
+        self.orig_sr = orig_sr
+        self.target_sr = target_sr
+        self.up = int(target_sr) // g
+        self.down = int(orig_sr) // g
+
+        max_rate = max(self.up, self.down)
+        self.half_len = FILTER_HALF_LEN_FACTOR * max_rate
+        n = np.arange(-self.half_len, self.half_len + 1)
+        cutoff = 1.0 / max_rate
+        h = np.sinc(cutoff * n) * np.kaiser(len(n), KAISER_BETA)
+        h *= self.up / h.sum()  # Gain DC = 1 setelah upsampling
+
+        # Tabel fase: phases[p, j] = h[p + j * up]
+        self.taps_per_phase = -(-len(h) // self.up)
+        padded = np.zeros(self.taps_per_phase * self.up)
+        padded[:len(h)] = h
+        self._phases = padded.reshape(self.taps_per_phase, self.up).T.astype(np.float32)
+
+        # Riwayat input; indeks global sampel pertama di _history = _history_start
+        self._history = np.zeros(self.taps_per_phase - 1, dtype=np.float32)
+        self._history_start = -(self.taps_per_phase - 1)
+        self._n_input = 0
+        self._n_output = 0
+        self._tap_offsets = np.arange(self.taps_per_phase)
+
+    def output_length(self, n_input):
+        """
+        Jumlah sampel output untuk `n_input` sampel input (sama dengan resample_poly).
+        """
+        return -(-n_input * self.up // self.down)
+
+    def process(self, block):
+        if self.up == self.down:
+            return np.asarray(block, dtype=np.float32)
+
+        self._history = np.concatenate((self._history, np.asarray(block, dtype=np.float32)))
+        self._n_input += len(block)
+        return self._emit(self._n_input - 1)
+
+    def flush(self):
+        """
+        Mengeluarkan sisa output dengan menganggap input setelah akhir file bernilai nol.
+        """
+        if self.up == self.down:
+            return np.zeros(0, dtype=np.float32)
+        total = self.output_length(self._n_input)
+        last_base = ((total - 1) * self.down + self.half_len) // self.up
+        pad = max(0, last_base - (self._history_start + len(self._history)) + 1)
+        self._history = np.concatenate((self._history, np.zeros(pad, dtype=np.float32)))
+        return self._emit(last_base, limit=total)
+
+    def _emit(self, max_base, limit=None):
+        # Output m membutuhkan input sampai indeks (m * down + half_len) // up
+        n_ready = ((max_base + 1) * self.up - 1 - self.half_len) // self.down + 1
+        if limit is not None:
+            n_ready = min(n_ready, limit)
+        n_out = max(0, n_ready - self._n_output)
+
+        out = np.empty(n_out, dtype=np.float32)
+        for start in range(0, n_out, OUTPUT_CHUNK):
+            m = self._n_output + start + np.arange(min(OUTPUT_CHUNK, n_out - start))
+            pos = m * self.down + self.half_len
+            base = pos // self.up - self._history_start
+            phase = pos % self.up
+            samples = self._history[base[:, None] - self._tap_offsets]
+            out[start:start + len(m)] = np.einsum('ij,ij->i', samples, self._phases[phase])
+        self._n_output += n_out
+
+        # Buang riwayat yang tidak lagi dibutuhkan output berikutnya
+        next_base = (self._n_output * self.down + self.half_len) // self.up
+        drop = next_base - (self.taps_per_phase - 1) - self._history_start
+        if drop > 0:
+            self._history = self._history[drop:]
+            self._history_start += drop
+        return out
+
+
+def _downmix(block):
+    if block.shape[1] > 1:
+        return block.mean(axis=1, dtype=np.float32)  # Konversi ke mono per blok
+    return block[:, 0]
+
+
+def iter_decoded_blocks(audio_file_path, block_sec=READ_BLOCK_SEC, target_sr=TARGET_SAMPLE_RATE):
+    """
+    Membaca file audio per blok lalu mengembalikan blok mono float32 di `target_sr`.
+
+    Hanya satu blok yang berada di memori pada satu waktu, berapa pun panjang file.
+    """
+    info = sf.info(audio_file_path)
+    resampler = PolyphaseResampler(info.samplerate, target_sr)
+    blocksize = int(block_sec * info.samplerate)
+
+    for block in sf.blocks(audio_file_path, blocksize=blocksize, dtype='float32', always_2d=True):
+        out = resampler.process(_downmix(block))
+        if len(out):
+            yield out
+    tail = resampler.flush()
+    if len(tail):
+        yield tail
+
+
+def iter_audio_blocks(audio_file_path, block_sec=READ_BLOCK_SEC, use_cache=True,
+                      cache_dir=AUDIO_CACHE_DIR):
+    """
+    Blok audio 16kHz mono float32. Dengan `use_cache`, file didekode sekali
+    ke cache .npy lalu dibaca lewat memory-map, sehingga evaluasi beberapa
+    model atas file yang sama tidak mendekode ulang. Bila cache belum ada,
+    blok langsung dikeluarkan sambil cache diisi (window pertama tidak
+    menunggu seluruh file selesai didekode).
+    """
+    if not use_cache:
+        yield from iter_decoded_blocks(audio_file_path, block_sec)
+        return
+
+    cache_path = _cache_path(file_hash(audio_file_path, cache_dir), cache_dir)
+    if not os.path.exists(cache_path):
+        yield from _fill_cache(audio_file_path, cache_path, block_sec)
+        return
+
+    audio = _open_cached(cache_path)
+    step = int(block_sec * TARGET_SAMPLE_RATE)
+    for start in range(0, len(audio), step):
+        yield audio[start:start + step]
+
+
+def audio_duration(audio_file_path):
+    """
+    Durasi file audio (detik) tanpa membaca isinya.
+    """
+    return sf.info(audio_file_path).duration
+
+
+# --- Cache audio ter-normalisasi ---
+
+_index_lock = threading.Lock()
+
+
+def _index_path(cache_dir):
+    return os.path.join(cache_dir, "index.json")
+
+
+def file_hash(path, cache_dir=AUDIO_CACHE_DIR):
+    """
+    SHA-1 isi file. Hash disimpan di index per (path, ukuran, mtime) agar
+    file yang tidak berubah tidak perlu dibaca ulang seluruhnya.
+    """
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    stamp = [stat.st_size, stat.st_mtime_ns]
+
+    with _index_lock:
+        index = _read_index(cache_dir)
+        entry = index.get(key)
+        if entry and entry["stamp"] == stamp:
+            return entry["sha1"]
+
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    sha1 = digest.hexdigest()
+
+    with _index_lock:
+        index = _read_index(cache_dir)
+        entry = {"stamp": stamp, "sha1": sha1}
+        if index.get(key) == entry:
+            return sha1  # Sudah ditulis thread/proses lain
+        # Buang entri untuk file yang sudah tidak ada agar index tidak terus membesar
+        index = {path: e for path, e in index.items() if os.path.exists(path)}
+        index[key] = entry
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{_index_path(cache_dir)}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, _index_path(cache_dir))
+    return sha1
+
+
+def _read_index(cache_dir):
+    try:
+        with open(_index_path(cache_dir), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _cache_path(sha1, cache_dir):
+    return os.path.join(cache_dir, f"{sha1}_{TARGET_SAMPLE_RATE}.npy")
+
+
+def _fill_cache(audio_file_path, cache_path, block_sec=READ_BLOCK_SEC):
+    """
+    Mendekode file per blok ke file .npy di cache sambil mengembalikan setiap
+    blok. File cache baru dipindahkan ke nama akhirnya setelah seluruh file
+    selesai; bila pemanggil berhenti di tengah jalan, file sementara dihapus.
+    """
+    info = sf.info(audio_file_path)
+    n_out = PolyphaseResampler(info.samplerate).output_length(info.frames)
+
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    # Nama sementara unik agar proses lain yang mendekode file sama tidak bentrok
+    tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    audio = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=(n_out,))
+    completed = False
+    try:
+        pos = 0
+        for block in iter_decoded_blocks(audio_file_path, block_sec):
+            take = min(len(block), n_out - pos)
+            audio[pos:pos + take] = block[:take]
+            pos += take
+            yield block[:take]
+        audio.flush()
+        completed = True
+    finally:
+        del audio
+        if completed:
+            os.replace(tmp_path, cache_path)
+            _evict_audio_cache(os.path.dirname(cache_path) or ".", keep=cache_path)
+        elif os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_audio_16k(audio_file_path, cache_dir=AUDIO_CACHE_DIR):
+    """
+    Audio 16kHz mono float32 sebagai array memory-map read-only.
+
+    Saat pertama kali, file didekode per blok langsung ke file .npy di cache
+    (tanpa memuat seluruh audio ke RAM). Pemanggilan berikutnya, termasuk
+    dari proses lain, cukup memetakan file tersebut.
+    """
+    cache_path = _cache_path(file_hash(audio_file_path, cache_dir), cache_dir)
+    if not os.path.exists(cache_path):
+        for _ in _fill_cache(audio_file_path, cache_path):
+            pass
+        return np.load(cache_path, mmap_mode='r')
+    return _open_cached(cache_path)
+
+
+def _open_cached(cache_path):
+    try:
+        os.utime(cache_path)  # Tandai baru dipakai (LRU)
+    except OSError:
+        pass
+    return np.load(cache_path, mmap_mode='r')
+
+
+def _evict_audio_cache(cache_dir, keep=None):
+    """
+    Menghapus file .npy yang paling lama tidak dipakai (mtime) sampai total
+    ukuran cache di bawah AUDIO_CACHE_MAX_MB. `keep` (file yang baru ditulis)
+    tidak pernah dihapus.
+    """
+    entries = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".npy"):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((path, stat.st_size, stat.st_mtime))
+
+    max_bytes = int(AUDIO_CACHE_MAX_MB * 2**20)
+    total = sum(size for _, size, _ in entries)
+    for path, size, _ in sorted(entries, key=lambda e: e[2]):
+        if total <= max_bytes:
+            break
+        if keep and os.path.abspath(path) == os.path.abspath(keep):
+            continue
+        try:
+            os.remove(path)  # Gagal di Windows bila masih dipetakan proses lain
+        except OSError:
+            continue
+        total -= size
+
+
+def clear_audio_cache(cache_dir=AUDIO_CACHE_DIR):
+    """
+    Menghapus semua audio ter-cache.
+    """
+    if not os.path.isdir(cache_dir):
+        return
+    for name in os.listdir(cache_dir):
+        if name.endswith(".npy") or name == "index.json":
+            os.remove(os.path.join(cache_dir, name))
@@ -0,0 +1,158 @@
+import time
+import threading
+import numpy as np
+
+from audio_frontend import load_audio_16k
+from session_recorder import Recording, FLAG_OVERFLOW
+
+BACKPRESSURE_POLL_SEC = 0.002  # Interval cek ruang kosong ring buffer saat replay secepat mungkin
+
+
+class CallbackStatus:
+    """
+    Pengganti sd.CallbackFlags untuk sumber audio tiruan (tidak pernah overflow).
+    """
+    input_overflow = False
+    input_underflow = False
+
+    def __bool__(self):
+        return False
+
+
+class ArrayInputStream:
+    """
+    Pengganti `sd.InputStream` berbasis callback yang memutar array audio.
+
+    Antarmukanya sama dengan yang dipakai LiveWorker (context manager +
+    `callback(indata, frames, time_info, status)`), sehingga pipeline live
+    bisa dijalankan tanpa mikrofon. `speed=1.0` memutar secara real-time,
+    nilai lebih besar memutar lebih cepat. `finished` di-set setelah audio habis.
+
+    `speed=0` memutar secepat mungkin; jika consumer memasang
+    `set_backpressure(free_space)`, blok baru ditahan sampai muat di ring
+    buffer, sehingga tidak ada sampel yang dibuang dan hasilnya deterministik.
+    """
+    def __init__(self, audio, samplerate=16000, channels=1, dtype='float32',
+                 blocksize=1024, callback=None, speed=1.0, **kwargs):
+        if channels != 1:
+            raise ValueError("ArrayInputStream hanya mendukung 1 channel")
+        self.audio = np.asarray(audio, dtype=dtype)
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.callback = callback
+        self.speed = speed
+        self.finished = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._status = CallbackStatus()
+        self._free_space = None
+
+    def set_backpressure(self, free_space):
+        """
+        `free_space()` mengembalikan jumlah sampel yang masih muat di consumer.
+        Hanya dipakai saat `speed=0`; pada real-time overflow dibiarkan terjadi seperti mikrofon.
+        """
+        self._free_space = free_space
+
+    def _wait(self, due, frames):
+        # Menunggu jadwal blok (real-time) atau ruang di ring buffer (secepat mungkin)
+        if not self.speed:
+            while (self._free_space is not None and self._free_space() < frames
+                   and not self._stop_event.is_set()):
+                time.sleep(BACKPRESSURE_POLL_SEC)
+            return
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    close = stop
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def _run(self):
+        t_start = time.perf_counter()
+        for pos in range(0, len(self.audio), self.blocksize):
+            if self._stop_event.is_set():
+                break
+            block = self.audio[pos:pos + self.blocksize]
+
+            # Jadwalkan blok sesuai waktu rekam aslinya (dibagi speed)
+            self._wait(t_start + (pos + len(block)) / self.samplerate / (self.speed or 1), len(block))
+
+            self.callback(block[:, None], len(block), None, self._status)
+        self.finished.set()
+
+
+class WavInputStream(ArrayInputStream):
+    """
+    ArrayInputStream yang memutar file audio (di-resample ke 16kHz mono lewat cache).
+    """
+    def __init__(self, audio_file_path, **kwargs):
+        super().__init__(load_audio_16k(audio_file_path), **kwargs)
+
+
+class RecordingInputStream(ArrayInputStream):
+    """
+    Memutar rekaman SessionRecorder dengan blok dan waktu callback aslinya,
+    termasuk flag overflow yang tercatat. Audio dibaca dari np.memmap.
+    """
+    def __init__(self, recording_path, samplerate=16000, **kwargs):
+        self.recording = Recording(recording_path)
+        if self.recording.sample_rate != samplerate:
+            raise ValueError(f"Rekaman {self.recording.sample_rate} Hz, pipeline meminta {samplerate} Hz")
+        super().__init__(self.recording.audio, samplerate=samplerate, **kwargs)
+        self._overflow_status = CallbackStatus()
+        self._overflow_status.input_overflow = True
+
+    def _run(self):
+        t_start = time.perf_counter()
+        for sample, t, frames, flags in self.recording.index.tolist():
+            if self._stop_event.is_set():
+                break
+            self._wait(t_start + t / (self.speed or 1), frames)
+            block = self.audio[sample:sample + frames]
+            status = self._overflow_status if flags & FLAG_OVERFLOW else self._status
+            self.callback(block[:, None], frames, None, status)
+        self.finished.set()
+
+
+def replay_stream_factory(recording_path, speed=1.0):
+    """
+    Seperti `wav_stream_factory`, tetapi memutar rekaman sesi live.
+    `speed=0` = secepat mungkin dengan backpressure (deterministik).
+    """
+    def factory(**kwargs):
+        kwargs.pop('blocksize', None)  # Ukuran blok mengikuti rekaman
+        stream = RecordingInputStream(recording_path, speed=speed, **kwargs)
+        factory.last_stream = stream
+        return stream
+    factory.last_stream = None
+    return factory
+
+
+def wav_stream_factory(audio_file_path, speed=1.0):
+    """
+    Membuat `stream_factory` untuk LiveWorker yang memutar file audio.
+    Stream terakhir yang dibuat tersedia di atribut `factory.last_stream`.
+    """
+    def factory(**kwargs):
+        stream = WavInputStream(audio_file_path, speed=speed, **kwargs)
+        factory.last_stream = stream
+        return stream
+    factory.last_stream = None
+    return factory
@@ -0,0 +1,173 @@
+"""
+Autotune jumlah thread dan job paralel per model.
+
+Untuk setiap model, semua kombinasi (thread per job, jumlah job bersamaan)
+dicoba pada klip kalibrasi. Setiap job berjalan di prosesnya sendiri dan
+baru mulai menghitung waktu setelah semua job selesai memuat model, jadi
+yang terukur murni inferensi yang saling berebut CPU.
+
+Dari hasil sweep disimpan ke profil host (lihat tuning_profile.py):
+  - n_threads: thread dengan latensi terendah untuk satu job (dipakai
+    WhisperEngine saat memuat model, kecuali WHISPER_PARAMS diisi eksplisit)
+  - concurrency / threads_per_job: kombinasi dengan throughput tertinggi
+    (detik audio per detik), dipakai EvaluationScheduler dan batch_eval
+    jika jumlah worker tidak diisi
+
+Profil selalu ditulis ke TUNING_PROFILE_PATH, file yang dibaca WhisperEngine.
+n_threads hanya berlaku saat konteks whisper.cpp dibuat: proses yang sudah
+memuat model baru memakai nilai baru setelah model dimuat ulang, dan setiap
+perubahan jumlah thread (termasuk set_model_threads) berarti memuat ulang model.
+
+Contoh:
+    python autotune.py --audio kalibrasi.wav --models tiny base small
+"""
+import os
+import sys
+import time
+import queue
+import argparse
+import multiprocessing as mp
+
+from whisper_engine import AVAILABLE_MODELS
+from tuning_profile import save_tuned_params, TUNING_PROFILE_PATH
+
+BARRIER_TIMEOUT_SEC = 600  # Batas tunggu semua job selesai memuat model
+MAX_OVERSUBSCRIPTION = 2  # Total thread (job x thread) maksimal = faktor x jumlah CPU
+
+
+def default_thread_counts(cpu_count):
+    """
+    1, 2, 4, ... sampai jumlah CPU, ditambah jumlah CPU itu sendiri dan
+    setengahnya (perkiraan core fisik pada mesin SMT).
+    """
+    counts = set()
+    n = 1
+    while n <= cpu_count:
+        counts.add(n)
+        n *= 2
+    counts.add(cpu_count)
+    counts.add(max(1, cpu_count // 2))
+    return sorted(counts)
+
+
+def _job_process(model_name, n_threads, audio_file_path, barrier, result_queue):
+    try:
+        import whisper_engine
+        from audio_frontend import load_audio_16k
+
+        whisper_engine.WHISPER_PARAMS['n_threads'] = n_threads
+        engine = whisper_engine.WhisperEngine(use_result_cache=False)
+        audio = load_audio_16k(audio_file_path)
+        engine.warm_up(model_name)
+        barrier.wait(BARRIER_TIMEOUT_SEC)
+
+        t_start = time.perf_counter()
+        engine._infer(model_name, audio)
+        result_queue.put(("ok", time.perf_counter() - t_start))
+    except Exception as e:
+        barrier.abort()
+        result_queue.put(("error", str(e)))
+
+
+def measure(model_name, n_threads, n_jobs, audio_file_path, audio_sec):
+    """
+    Menjalankan `n_jobs` job bersamaan dengan `n_threads` masing-masing.
+    """
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(n_jobs)
+    result_queue = ctx.Queue()
+    processes = [
+        ctx.Process(target=_job_process, args=(model_name, n_threads, audio_file_path, barrier, result_queue))
+        for _ in range(n_jobs)
+    ]
+    for process in processes:
+        process.start()
+
+    elapsed = []
+    error = None
+    for _ in processes:
+        try:
+            status, value = result_queue.get(timeout=BARRIER_TIMEOUT_SEC)
+        except queue.Empty:
+            error = "timeout"
+            break
+        if status == "ok":
+            elapsed.append(value)
+        else:
+            error = value
+    for process in processes:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+
+    if error is not None:
+        return {"n_threads": n_threads, "n_jobs": n_jobs, "error": error}
+
+    wall = max(elapsed)
+    return {
+        "n_threads": n_threads,
+        "n_jobs": n_jobs,
+        "job_rtf": wall / audio_sec,  # Latensi relatif satu job
+        "throughput": n_jobs * audio_sec / wall,  # Detik audio per detik
+    }
+
+
+def tune_model(model_name, audio_file_path, thread_counts, job_counts, cpu_count):
+    from audio_frontend import load_audio_16k, TARGET_SAMPLE_RATE
+    audio_sec = len(load_audio_16k(audio_file_path)) / TARGET_SAMPLE_RATE
+
+    results = []
+    for n_jobs in job_counts:
+        for n_threads in thread_counts:
+            if n_jobs * n_threads > MAX_OVERSUBSCRIPTION * cpu_count:
+                continue
+            result = measure(model_name, n_threads, n_jobs, audio_file_path, audio_sec)
+            results.append(result)
+            if "error" in result:
+                print(f"  {n_jobs} job x {n_threads} thread: GAGAL ({result['error']})")
+            else:
+                print(f"  {n_jobs} job x {n_threads} thread: RTF/job {result['job_rtf']:.3f}, "
+                      f"throughput {result['throughput']:.2f}x")
+
+    ok = [r for r in results if "error" not in r]
+    if not ok:
+        return None
+
+    single = [r for r in ok if r["n_jobs"] == 1] or ok
+    best_latency = min(single, key=lambda r: r["job_rtf"])
+    best_throughput = max(ok, key=lambda r: r["throughput"])
+    return {
+        "n_threads": best_latency["n_threads"],
+        "rtf": best_latency["job_rtf"],
+        "concurrency": best_throughput["n_jobs"],
+        "threads_per_job": best_throughput["n_threads"],
+        "throughput": best_throughput["throughput"],
+        "calibration_audio": os.path.abspath(audio_file_path),
+        "sweep": results,
+    }
+
+
+def main(argv=None):
+    cpu_count = os.cpu_count() or 4
+    parser = argparse.ArgumentParser(description="Autotune n_threads dan concurrency per model.")
+    parser.add_argument("--audio", required=True, help="Klip kalibrasi (sebaiknya 10-30 detik)")
+    parser.add_argument("--models", nargs="+", default=["base"], choices=AVAILABLE_MODELS)
+    parser.add_argument("--threads", nargs="+", type=int, default=default_thread_counts(cpu_count))
+    parser.add_argument("--jobs", nargs="+", type=int, default=[1, 2, 4])
+    args = parser.parse_args(argv)
+
+    for model_name in args.models:
+        print(f"Autotune model '{model_name}'...")
+        best = tune_model(model_name, args.audio, args.threads, args.jobs, cpu_count)
+        if best is None:
+            print(f"  Tidak ada konfigurasi yang berhasil untuk '{model_name}'.")
+            continue
+        save_tuned_params(model_name, best)
+        print(f"  Terbaik: {best['n_threads']} thread (RTF {best['rtf']:.3f}); "
+              f"paralel {best['concurrency']} job x {best['threads_per_job']} thread")
+    print(f"Profil disimpan ke {TUNING_PROFILE_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
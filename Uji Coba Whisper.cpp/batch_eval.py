@@ -0,0 +1,294 @@
+"""
+Evaluasi batch tanpa GUI atas banyak pasangan audio + teks referensi.
+
+Contoh:
+    python batch_eval.py --dir rekaman/ --ref-dir text/ --models tiny base -o hasil.jsonl
+    python batch_eval.py --manifest manifest.csv --models small --workers 2 -o hasil.jsonl
+
+Setiap pasangan (audio, model) yang selesai langsung ditulis sebagai satu
+baris JSON ke file output. Jika dijalankan ulang dengan output yang sama,
+pasangan yang sudah berhasil dinilai dilewati sehingga run yang terputus
+bisa dilanjutkan. Ringkasan agregat per model ditulis ke `<output>.summary.json`.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import soundfile as sf
+
+from whisper_engine import AVAILABLE_MODELS
+from eval_scheduler import split_threads
+from tuning_profile import get_parallel_split
+from scoring import score, score_batch
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".flac", ".ogg")
+
+# Engine per proses worker (dibuat oleh _init_worker)
+_worker_engine = None
+
+
+def _init_worker(n_threads):
+    global _worker_engine
+    import whisper_engine
+    whisper_engine.WHISPER_PARAMS['n_threads'] = n_threads
+    _worker_engine = whisper_engine.WhisperEngine()
+
+
+def _transcribe_job(model_name, audio_path):
+    text, process_time = _worker_engine.transcribe_file(model_name, audio_path)
+    return text, process_time
+
+
+def load_manifest(manifest_path):
+    """
+    Membaca manifest CSV (kolom `audio`, `reference`) atau JSONL
+    (`audio` + `reference` berupa path, atau `text` berisi referensi langsung).
+    Path relatif dihitung dari folder manifest.
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    rows = []
+    with open(manifest_path, encoding="utf-8") as f:
+        if manifest_path.endswith(".jsonl"):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    pairs = []
+    for row in rows:
+        audio = os.path.join(base_dir, row["audio"])
+        if row.get("text"):
+            reference = row["text"]
+        else:
+            with open(os.path.join(base_dir, row["reference"]), encoding="utf-8") as ref_file:
+                reference = ref_file.read()
+        pairs.append((os.path.abspath(audio), reference.strip()))
+    return pairs
+
+
+def scan_directory(audio_dir, ref_dir=None):
+    """
+    Mencari file audio di `audio_dir` dan teks referensi dengan nama yang sama
+    (`rekaman1.wav` -> `rekaman1.txt`) di `ref_dir` atau folder yang sama.
+    """
+    ref_dir = ref_dir or audio_dir
+    pairs = []
+    for name in sorted(os.listdir(audio_dir)):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() not in AUDIO_EXTENSIONS:
+            continue
+        ref_path = os.path.join(ref_dir, stem + ".txt")
+        if not os.path.exists(ref_path):
+            print(f"Peringatan: referensi untuk '{name}' tidak ditemukan, dilewati.")
+            continue
+        with open(ref_path, encoding="utf-8") as f:
+            pairs.append((os.path.abspath(os.path.join(audio_dir, name)), f.read().strip()))
+    return pairs
+
+
+def load_done_keys(output_path):
+    """
+    Pasangan (audio, model) yang sudah berhasil dinilai pada run sebelumnya.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Baris terakhir bisa terpotong jika run dihentikan paksa
+            if record.get("status") == "ok":
+                done.add((record["audio"], record["model"]))
+    return done
+
+
+def score_pair(reference, hypothesis, measures=None):
+    if measures is None:
+        measures = score(reference, hypothesis)
+    return {
+        "wer": measures['wer'],
+        "cer": measures['cer'],
+        "substitutions": measures['substitutions'],
+        "deletions": measures['deletions'],
+        "insertions": measures['insertions'],
+        "hits": measures['hits'],
+        "reference_words": measures['hits'] + measures['substitutions'] + measures['deletions'],
+    }
+
+
+def summarize(output_path):
+    """
+    Agregat per model dari semua record sukses: WER total (bukan rata-rata per file),
+    S/D/I, dan real-time factor. None jika file hasil belum ada.
+    """
+    if not os.path.exists(output_path):
+        print(f"Error: File hasil tidak ditemukan: {output_path}")
+        return None
+
+    # Record terakhir per (audio, model) yang berlaku; percobaan gagal yang
+    # kemudian berhasil tidak ikut dihitung
+    latest = {}
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            latest[(record["audio"], record["model"])] = record
+
+    summary = {}
+    for record in latest.values():
+        model = summary.setdefault(record["model"], {
+            "files": 0, "failed": 0, "substitutions": 0, "deletions": 0,
+            "insertions": 0, "reference_words": 0, "audio_sec": 0.0, "process_sec": 0.0
+        })
+        if record.get("status") != "ok":
+            model["failed"] += 1
+            continue
+        model["files"] += 1
+        for key in ("substitutions", "deletions", "insertions", "reference_words"):
+            model[key] += record[key]
+        model["audio_sec"] += record["audio_sec"]
+        model["process_sec"] += record["process_time"]
+
+    for model in summary.values():
+        errors = model["substitutions"] + model["deletions"] + model["insertions"]
+        model["wer"] = errors / model["reference_words"] if model["reference_words"] else None
+        model["rtf"] = model["process_sec"] / model["audio_sec"] if model["audio_sec"] else None
+    return summary
+
+
+def rescore(pairs, output_path):
+    """
+    Menilai ulang semua record sukses dari hipotesis yang tersimpan (tanpa
+    transkripsi ulang), misalnya setelah aturan normalisasi berubah.
+    Semua pasangan dinilai sekaligus dengan kernel batch.
+    Mengembalikan jumlah record yang dinilai ulang, atau None jika file hasil belum ada.
+    """
+    if not os.path.exists(output_path):
+        print(f"Error: File hasil tidak ditemukan: {output_path}")
+        return None
+
+    references = dict(pairs)
+    with open(output_path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+
+    targets = [r for r in records if r.get("status") == "ok" and r["audio"] in references]
+    results = score_batch([(references[r["audio"]], r["hypothesis"]) for r in targets])
+    for record, measures in zip(targets, results):
+        record.update(score_pair(None, None, measures))
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, output_path)
+    print(f"{len(targets)} record dinilai ulang.")
+    return len(targets)
+
+
+def run_batch(pairs, models, output_path, workers=None, total_threads=None):
+    """
+    Mentranskripsi dan menilai semua pasangan yang belum ada di `output_path`.
+    `workers` None = concurrency dan thread per worker dari profil autotune
+    (1 worker jika model belum di-autotune).
+    """
+    done = load_done_keys(output_path)
+    # Urut per model agar setiap worker cenderung memegang satu model saja
+    jobs = [(model, audio, reference) for model in models for audio, reference in pairs
+            if (audio, model) not in done]
+    print(f"{len(pairs)} file x {len(models)} model; {len(done)} sudah dinilai, {len(jobs)} tersisa.")
+    if not jobs:
+        return
+
+    tuned = get_parallel_split(models) if workers is None else None
+    workers = workers or (tuned[0] if tuned else 1)
+    if tuned and not total_threads:
+        n_threads = tuned[1]
+    else:
+        n_threads = split_threads(total_threads or os.cpu_count() or 4, workers)
+    print(f"{workers} worker x {n_threads} thread.")
+    with open(output_path, "a", encoding="utf-8") as out, ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(n_threads,)
+    ) as pool:
+        futures = {pool.submit(_transcribe_job, model, audio): (model, audio, reference)
+                   for model, audio, reference in jobs}
+
+        for i, future in enumerate(as_completed(futures), start=1):
+            model, audio, reference = futures[future]
+            record = {"audio": audio, "model": model, "finished_at": time.time()}
+            try:
+                hypothesis, process_time = future.result()
+                if hypothesis.startswith("Error:"):
+                    raise RuntimeError(hypothesis)
+                audio_sec = sf.info(audio).duration
+                record.update(score_pair(reference, hypothesis))
+                record.update({
+                    "status": "ok",
+                    "hypothesis": hypothesis,
+                    "process_time": process_time,
+                    "audio_sec": audio_sec,
+                    "rtf": process_time / audio_sec if audio_sec else None,
+                })
+                print(f"[{i}/{len(jobs)}] {model} {os.path.basename(audio)}: WER {record['wer'] * 100:.2f} %")
+            except Exception as e:
+                record.update({"status": "failed", "error": str(e)})
+                print(f"[{i}/{len(jobs)}] {model} {os.path.basename(audio)}: GAGAL ({e})")
+
+            # Tulis & flush per record agar run yang terputus bisa dilanjutkan
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluasi batch WER whisper.cpp tanpa GUI.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--manifest", help="File CSV/JSONL berisi pasangan audio dan referensi")
+    source.add_argument("--dir", help="Folder berisi file audio")
+    parser.add_argument("--ref-dir", help="Folder teks referensi (default: sama dengan --dir)")
+    parser.add_argument("--models", nargs="+", default=["base"], choices=AVAILABLE_MODELS)
+    parser.add_argument("-o", "--output", required=True, help="File hasil JSONL (dilanjutkan jika sudah ada)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Jumlah proses worker (default: profil autotune, atau 1)")
+    parser.add_argument("--threads", type=int, default=None, help="Total thread CPU yang dibagi ke worker")
+    parser.add_argument("--rescore", action="store_true",
+                        help="Nilai ulang hasil yang sudah ada tanpa transkripsi ulang")
+    args = parser.parse_args(argv)
+
+    pairs = load_manifest(args.manifest) if args.manifest else scan_directory(args.dir, args.ref_dir)
+    if not pairs:
+        print("Tidak ada pasangan audio/referensi yang ditemukan.")
+        return 1
+
+    if args.rescore:
+        if rescore(pairs, args.output) is None:
+            return 1
+    else:
+        run_batch(pairs, args.models, args.output, workers=args.workers, total_threads=args.threads)
+
+    summary = summarize(args.output)
+    if summary is None:
+        return 1
+    summary_path = os.path.splitext(args.output)[0] + ".summary.json"
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    for model, stats in summary.items():
+        wer = f"{stats['wer'] * 100:.2f} %" if stats['wer'] is not None else "-"
+        rtf = f"{stats['rtf']:.3f}" if stats['rtf'] is not None else "-"
+        print(f"{model}: {stats['files']} file, WER {wer}, RTF {rtf}, gagal {stats['failed']}")
+    print(f"Ringkasan ditulis ke {summary_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""
+Benchmark WhisperEngine yang bisa diulang: waktu load, real-time factor,
+persentil latensi per segmen, peak RSS dan utilisasi CPU per model dan
+jumlah thread. Mode live disimulasikan dengan memutar file audio lewat
+pengganti `sd.InputStream`, jadi tidak butuh mikrofon maupun jaringan.
+
+Contoh:
+    python benchmark.py --audio rekaman.wav --models tiny base --threads 2 4 -o bench.json
+    python benchmark.py --audio rekaman.wav --models small --live --speed 2
+
+Setiap konfigurasi dijalankan di proses baru agar peak RSS dan waktu load
+tidak terpengaruh konfigurasi sebelumnya. Hasil ditulis sebagai JSON
+(termasuk commit git) agar bisa dibandingkan antar commit.
+"""
+import os
+import sys
+import json
+import time
+import queue
+import socket
+import platform
+import argparse
+import subprocess
+import multiprocessing as mp
+
+import numpy as np
+
+try:
+    import resource  # Hanya ada di Unix
+except ImportError:
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from whisper_engine import AVAILABLE_MODELS
+
+LIVE_DRAIN_TIMEOUT_SEC = 60  # Batas tunggu antrian live habis setelah audio selesai diputar
+
+
+def percentiles(values):
+    """
+    p50/p95/p99, rata-rata dan maksimum dari daftar latensi (detik).
+    """
+    if not values:
+        return {"count": 0}
+    arr = np.asarray(values, dtype=np.float64)
+    p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+    return {
+        "count": len(values),
+        "mean": float(arr.mean()),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "max": float(arr.max()),
+    }
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size proses ini (MB), atau None jika tidak bisa diukur.
+    """
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux melaporkan KB, macOS melaporkan byte
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 2**20
+    return None
+
+
+class _Meter:
+    """
+    Mengukur waktu dinding dan waktu CPU (semua thread) sebuah tahap.
+    """
+    def __enter__(self):
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall = time.perf_counter() - self.wall_start
+        self.cpu = time.process_time() - self.cpu_start
+        return False
+
+    def cpu_utilisation(self):
+        """
+        Fraksi kapasitas CPU mesin yang terpakai (1.0 = semua core penuh).
+        """
+        if self.wall <= 0:
+            return None
+        return self.cpu / self.wall / (os.cpu_count() or 1)
+
+
+def _bench_file(engine, model_name, audio_file_path, audio_sec):
+    latencies = []
+    with _Meter() as meter:
+        for segment in engine.iter_transcribe_file(model_name, audio_file_path):
+            latencies.append(segment['delay'])
+    return {
+        "wall_sec": meter.wall,
+        "rtf": meter.wall / audio_sec if audio_sec else None,
+        "cpu_utilisation": meter.cpu_utilisation(),
+        "segment_latency": percentiles(latencies),
+    }
+
+
+def _bench_live(engine, model_name, audio_file_path, audio_sec, speed, mode, use_vad):
+    from live_worker import LiveWorker
+    from audio_sources import wav_stream_factory
+
+    ui_queue = queue.Queue()
+    factory = wav_stream_factory(audio_file_path, speed=speed)
+    worker = LiveWorker(engine, model_name, ui_queue, mode=mode, use_vad=use_vad, stream_factory=factory)
+
+    latencies = []
+    with _Meter() as meter:
+        worker.start()
+        # Tunggu audio selesai diputar, lalu tunggu sisa antrian diproses
+        while factory.last_stream is None or not factory.last_stream.finished.is_set():
+            time.sleep(0.05)
+            if not worker.is_alive():
+                break
+        deadline = time.perf_counter() + LIVE_DRAIN_TIMEOUT_SEC
+        while worker.is_alive() and not worker.waiting_for_audio and time.perf_counter() < deadline:
+            time.sleep(0.05)
+        worker.stop()
+        worker.join()
+
+    errors = []
+    while not ui_queue.empty():
+        item = ui_queue.get()
+        if isinstance(item, dict):
+            latencies.append(item.get("delay", 0))
+        else:
+            errors.append(str(item))
+
+    return {
+        "mode": mode,
+        "vad": use_vad,
+        "speed": speed,
+        "wall_sec": meter.wall,
+        "cpu_utilisation": meter.cpu_utilisation(),
+        "segment_latency": percentiles(latencies),
+        "capture": worker.get_stats(),
+        "errors": errors,
+    }
+
+
+def run_config(model_name, n_threads, audio_file_path, live, speed, live_mode, use_vad):
+    """
+    Menjalankan satu konfigurasi (model x thread). Dipanggil di proses terpisah.
+    """
+    import whisper_engine
+    from audio_frontend import load_audio_16k
+
+    whisper_engine.WHISPER_PARAMS['n_threads'] = n_threads
+    # Cache hasil dimatikan agar setiap run benar-benar menjalankan inferensi
+    engine = whisper_engine.WhisperEngine(use_result_cache=False)
+    audio_sec = len(load_audio_16k(audio_file_path)) / whisper_engine.SAMPLE_RATE
+
+    result = {"model": model_name, "n_threads": n_threads, "audio_sec": audio_sec}
+    try:
+        with _Meter() as meter:
+            engine._load_model(model_name)
+        result["load_sec"] = meter.wall
+
+        with _Meter() as meter:
+            engine.warm_up(model_name)
+        result["warmup_sec"] = meter.wall
+
+        result["memory"] = engine.memory_stats()
+        result["file"] = _bench_file(engine, model_name, audio_file_path, audio_sec)
+        if live:
+            result["live"] = _bench_live(engine, model_name, audio_file_path, audio_sec,
+                                         speed, live_mode, use_vad)
+        result["status"] = "ok"
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def _config_process(args, result_queue):
+    result_queue.put(run_config(*args))
+
+
+def environment_info(audio_file_path):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.time(),
+        "git_commit": commit,
+        "host": socket.gethostname(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "audio": os.path.abspath(audio_file_path),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark WhisperEngine (file & live tersimulasi).")
+    parser.add_argument("--audio", required=True, help="File audio untuk diputar ulang")
+    parser.add_argument("--models", nargs="+", default=["base"], choices=AVAILABLE_MODELS)
+    parser.add_argument("--threads", nargs="+", type=int, default=[os.cpu_count() or 4])
+    parser.add_argument("--live", action="store_true", help="Juga jalankan simulasi mode live")
+    parser.add_argument("--live-mode", default="chunk", choices=["chunk", "stream"])
+    parser.add_argument("--vad", action="store_true", help="Aktifkan VAD pada simulasi live")
+    parser.add_argument("--speed", type=float, default=1.0, help="Kecepatan putar simulasi live (1.0 = real-time)")
+    parser.add_argument("-o", "--output", default="bench.json")
+    args = parser.parse_args(argv)
+
+    ctx = mp.get_context("spawn")
+    report = {"meta": environment_info(args.audio), "results": []}
+
+    for model_name in args.models:
+        for n_threads in args.threads:
+            print(f"Benchmark '{model_name}' dengan {n_threads} thread...")
+            result_queue = ctx.Queue()
+            config = (model_name, n_threads, args.audio, args.live, args.speed, args.live_mode, args.vad)
+            process = ctx.Process(target=_config_process, args=(config, result_queue))
+            process.start()
+            result = None
+            while result is None:
+                try:
+                    result = result_queue.get(timeout=1)
+                except queue.Empty:
+                    if not process.is_alive():
+                        result = {"model": model_name, "n_threads": n_threads, "status": "failed",
+                                  "error": f"proses berhenti (exit code {process.exitcode})"}
+            process.join()
+            report["results"].append(result)
+
+            if result["status"] == "ok":
+                latency = result["file"]["segment_latency"]
+                print(f"  load {result['load_sec']:.2f} dtk, RTF {result['file']['rtf']:.3f}, "
+                      f"p95 {latency.get('p95', 0):.2f} dtk, peak RSS {result['peak_rss_mb'] or 0:.0f} MB")
+            else:
+                print(f"  GAGAL: {result['error']}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil benchmark ditulis ke {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+import os
+import time
+import tkinter as tk
+from collections import deque
+
+FRAME_MS = 50  # Interval render (20 fps); semua hasil yang masuk selama satu frame digabung
+MAX_SCROLLBACK_LINES = 200  # Baris yang disimpan di widget; yang lebih lama hanya ada di arsip
+LINE_CHARS = 400  # Teks committed dipecah menjadi baris sepanjang ini agar widget tetap cepat
+SESSION_DIR = "./sessions"
+MAX_CORRECTABLE_SEGMENTS = 64  # Segmen terakhir yang masih punya tag untuk diganti koreksi
+
+
+class CaptionView:
+    """
+    Lapisan render untuk caption live di atas widget Text/ScrolledText.
+
+    Hasil dari worker hanya dikumpulkan lewat `push()`; widget baru
+    disentuh sekali per frame di `render()`. Teks committed ditambahkan,
+    ekor parsial (tag 'partial') diganti, lalu baris tertua dibuang jika
+    melebihi `max_lines`. Semua teks committed juga ditulis ke file sesi,
+    sehingga biaya UI tetap konstan berapa pun lama sesinya.
+
+    Segmen yang di-push dengan `segment_id` diberi tag sendiri agar bisa
+    diganti di tempat lewat `correct()` (tier koreksi). Arsip sesi tetap
+    berisi teks seperti yang pertama kali ditampilkan.
+    """
+    def __init__(self, text_widget, max_lines=MAX_SCROLLBACK_LINES, line_chars=LINE_CHARS,
+                 archive_path=None):
+        self.widget = text_widget
+        self.max_lines = max_lines
+        self.line_chars = line_chars
+        self.archive_path = archive_path
+        self._archive = None
+
+        self._pending_text = []  # (teks, segment_id) committed yang belum dirender
+        self._pending_partial = None  # None = parsial tidak berubah sejak frame terakhir
+        self._pending_corrections = {}  # segment_id -> teks pengganti
+        self._segment_tags = deque()  # Tag segmen yang masih bisa dikoreksi, tertua di kiri
+        self._line_count = 1  # Jumlah baris di widget
+        self._line_len = 0  # Panjang baris terakhir
+
+        # Statistik
+        self.frames_rendered = 0
+        self.segments_pushed = 0
+        self.lines_trimmed = 0
+        self.corrections_applied = 0
+        self.corrections_missed = 0  # Segmen sudah keluar dari scrollback
+
+        self.widget.tag_configure('partial', foreground='gray')
+        self.widget.tag_configure('corrected', foreground='#1a4d8f')
+
+    def start_session(self, archive_path=None):
+        """
+        Mengosongkan widget dan membuka file arsip sesi baru.
+        """
+        self.close()
+        self._pending_text = []
+        self._pending_partial = None
+        self._pending_corrections = {}
+        self._line_count = 1
+        self._line_len = 0
+        self.frames_rendered = 0
+        self.segments_pushed = 0
+        self.lines_trimmed = 0
+        self.corrections_applied = 0
+        self.corrections_missed = 0
+
+        self.widget.config(state='normal')
+        self.widget.delete('1.0', tk.END)
+        while self._segment_tags:
+            self.widget.tag_delete(self._segment_tags.popleft())
+        self.widget.config(state='disabled')
+
+        if archive_path is None:
+            archive_path = os.path.join(SESSION_DIR, time.strftime("live_%Y%m%d_%H%M%S.txt"))
+        self.archive_path = archive_path
+        os.makedirs(os.path.dirname(archive_path) or ".", exist_ok=True)
+        self._archive = open(archive_path, "a", encoding="utf-8")
+
+    def push(self, text, partial=None, segment_id=None):
+        """
+        Menampung satu hasil dari worker. Murah: tidak menyentuh widget.
+        `partial` None berarti hasil tanpa ekor parsial (mode chunk).
+        """
+        if text:
+            self._pending_text.append((text, segment_id))
+            self.segments_pushed += 1
+        self._pending_partial = partial or ""
+
+    def correct(self, segment_id, text):
+        """
+        Menampung teks pengganti untuk segmen yang sudah di-push.
+        """
+        self._pending_corrections[segment_id] = text
+
+    def render(self):
+        """
+        Menerapkan semua hasil yang tertampung sebagai satu update widget.
+        Mengembalikan True jika widget berubah.
+        """
+        if not self._pending_text and self._pending_partial is None and not self._pending_corrections:
+            return False
+
+        widget = self.widget
+        # Hanya auto-scroll jika pengguna sedang melihat bagian paling bawah
+        at_bottom = widget.yview()[1] >= 0.999
+
+        committed = self._layout(self._pending_text)
+        if self._archive is not None and self._pending_text:
+            self._archive.write(" ".join(text for text, _ in self._pending_text) + " ")
+            self._archive.flush()
+        self._pending_text = []
+
+        widget.config(state='normal')
+        if self._pending_partial is not None:
+            partial_range = widget.tag_ranges('partial')
+            if partial_range:
+                widget.delete(*partial_range)
+        if committed:
+            # Sebelum ekor parsial (jika masih ada)
+            partial_range = widget.tag_ranges('partial')
+            widget.insert(partial_range[0] if partial_range else tk.END, *committed)
+        if self._pending_partial:
+            widget.insert(tk.END, self._pending_partial, 'partial')
+        self._pending_partial = None
+        if self._pending_corrections:
+            self._apply_corrections()
+
+        excess = self._line_count - self.max_lines
+        if excess > 0:
+            widget.delete('1.0', f'{excess + 1}.0')
+            self._line_count -= excess
+            self.lines_trimmed += excess
+
+        if at_bottom:
+            widget.see(tk.END)
+        widget.config(state='disabled')
+        self.frames_rendered += 1
+        return True
+
+    def _layout(self, texts):
+        # Argumen widget.insert (teks, tag, teks, tag, ...); baris dipecah setiap sekitar `line_chars` karakter
+        parts = []
+        for text, segment_id in texts:
+            if self._line_len and self._line_len + len(text) > self.line_chars:
+                parts += ["\n", ()]
+                self._line_count += 1
+                self._line_len = 0
+            if segment_id is None:
+                parts += [f"{text} ", ()]
+            else:
+                tag = f"seg{segment_id}"
+                parts += [f"{text} ", (tag,)]
+                self._segment_tags.append(tag)
+            self._line_len += len(text) + 1
+        while len(self._segment_tags) > MAX_CORRECTABLE_SEGMENTS:
+            self.widget.tag_delete(self._segment_tags.popleft())
+        return parts
+
+    def _apply_corrections(self):
+        # Mengganti teks segmen di tempat; segmen yang sudah terpangkas dilewati
+        widget = self.widget
+        for segment_id, text in self._pending_corrections.items():
+            tag = f"seg{segment_id}"
+            ranges = widget.tag_ranges(tag)
+            if not ranges:
+                self.corrections_missed += 1
+                continue
+            start = widget.index(ranges[0])
+            widget.delete(start, ranges[1])
+            widget.insert(start, f"{text} ", ('corrected',))
+            self.corrections_applied += 1
+        self._pending_corrections = {}
+
+    def close(self):
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+    def get_stats(self):
+        return {
+            "frames_rendered": self.frames_rendered,
+            "segments_pushed": self.segments_pushed,
+            "lines_in_view": self._line_count,
+            "lines_trimmed": self.lines_trimmed,
+            "corrections_applied": self.corrections_applied,
+            "corrections_missed": self.corrections_missed,
+            "archive_path": self.archive_path,
+        }
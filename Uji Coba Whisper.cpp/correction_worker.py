@@ -0,0 +1,152 @@
+import time
+import threading
+from collections import deque
+
+import numpy as np
+
+import tracing
+
+MAX_PENDING_SEGMENTS = 8  # Segmen yang menunggu koreksi; yang tertua dibuang jika lebih
+MAX_CORRECTION_LAG_SEC = 30  # Segmen yang lebih tua dari ini tidak dikoreksi lagi
+HEADROOM_POLL_SEC = 0.05  # Interval cek ulang saat model cepat sedang sibuk
+LAG_WINDOW = 512  # Lag koreksi terakhir yang disimpan untuk statistik
+
+
+class CorrectionWorker(threading.Thread):
+    """
+    Tier kedua mode live: model yang lebih besar mendekode ulang audio
+    segmen yang sudah ditampilkan oleh model cepat, lalu mengirim teks
+    pengganti ke UI sebagai {"correction": segment_id, "text": ...}.
+
+    Pekerjaan hanya dimulai saat `has_headroom()` True (model cepat sedang
+    menunggu audio), dengan thread lebih sedikit dari model cepat, sehingga
+    caption utama tidak ikut tertinggal. Jumlah thread dipasang ke model
+    koreksi lewat `set_model_threads` dan dikembalikan saat worker berhenti. Antrian dibatasi: jika model
+    koreksi tidak terkejar, segmen tertua dilewati dan dihitung di statistik.
+    """
+    def __init__(self, whisper_engine, model_name, ui_queue, has_headroom=None, n_threads=None,
+                 max_pending=MAX_PENDING_SEGMENTS, max_lag_sec=MAX_CORRECTION_LAG_SEC):
+        super().__init__(name=f"correction-{model_name}", daemon=True)
+        self.engine = whisper_engine
+        self.model_name = model_name
+        self.ui_queue = ui_queue
+        self.has_headroom = has_headroom or (lambda: True)
+        self.n_threads = n_threads
+        self.max_pending = max_pending
+        self.max_lag_sec = max_lag_sec
+        self._pending = deque()  # (segment_id, audio, teks_draft, waktu_capture)
+        self._lock = threading.Lock()
+        self._work_event = threading.Event()
+        self._stop_event = threading.Event()
+
+        # Statistik
+        self.submitted = 0
+        self.corrected = 0  # Koreksi yang terkirim ke UI
+        self.changed = 0  # Koreksi yang teksnya berbeda dari draft
+        self.dropped_backlog = 0  # Dibuang karena antrian penuh
+        self.dropped_stale = 0  # Dibuang karena sudah lebih tua dari max_lag_sec
+        self.errors = 0
+        self.failed = None  # Pesan error jika model koreksi gagal dimuat
+        self._lags = deque(maxlen=LAG_WINDOW)
+
+    def submit(self, segment_id, audio, text, captured_at):
+        """
+        Dipanggil LiveWorker setelah segmen ditampilkan. Tidak memblokir.
+        """
+        with self._lock:
+            self._pending.append((segment_id, audio, text, captured_at))
+            self.submitted += 1
+            if len(self._pending) > self.max_pending:
+                self._pending.popleft()
+                self.dropped_backlog += 1
+        self._work_event.set()
+
+    def _next(self):
+        # Segmen tertua berikutnya, atau None jika belum ada pekerjaan/headroom
+        if not self._work_event.wait(HEADROOM_POLL_SEC):
+            return None
+        if not self.has_headroom():
+            self._stop_event.wait(HEADROOM_POLL_SEC)
+            return None
+        with self._lock:
+            if not self._pending:
+                self._work_event.clear()
+                return None
+            return self._pending.popleft()
+
+    def run(self):
+        if self.n_threads is None:
+            # Setengah thread agar model cepat tetap punya CPU saat chunk berikutnya datang
+            self.n_threads = max(1, self.engine.model_threads(self.model_name) // 2)
+        try:
+            self.engine.set_model_threads(self.model_name, self.n_threads)
+            if not self.engine.is_ready(self.model_name):
+                self.engine._load_model(self.model_name)
+                self.engine.warm_up(self.model_name)
+        except Exception as e:
+            self.failed = str(e)
+            self.engine.set_model_threads(self.model_name, None)
+            print(f"Model koreksi '{self.model_name}' tidak bisa dipakai: {e}")
+            return
+        print(f"CorrectionWorker (model: {self.model_name}, {self.n_threads} thread) dimulai...")
+
+        while not self._stop_event.is_set():
+            item = self._next()
+            if item is None:
+                continue
+            segment_id, audio, draft, captured_at = item
+            if time.time() - captured_at > self.max_lag_sec:
+                self.dropped_stale += 1
+                continue
+
+            with tracing.span("correction.transcribe", model=self.model_name):
+                text, delay = self.engine.transcribe_segment(self.model_name, audio)
+            if text.startswith("Error:"):
+                self.errors += 1
+                continue
+            if self._stop_event.is_set():
+                break
+
+            lag = time.time() - captured_at
+            changed = text != draft
+            self.corrected += 1
+            self.changed += changed
+            self._lags.append(lag)
+            tracing.count("correction.changed" if changed else "correction.confirmed")
+            self.ui_queue.put({
+                "correction": segment_id,
+                "text": text,
+                "changed": changed,
+                "lag": lag,
+                "delay": delay
+            })
+
+        self.engine.set_model_threads(self.model_name, None)
+        print(f"CorrectionWorker (model: {self.model_name}) berhenti. "
+              f"Dikoreksi {self.corrected}/{self.submitted} segmen, berubah {self.changed}.")
+
+    def get_stats(self):
+        """
+        Seberapa sering koreksi sampai ke UI dan seberapa jauh tertinggal dari pembicara.
+        """
+        lags = np.fromiter(list(self._lags), dtype=np.float64)
+        return {
+            "model": self.model_name,
+            "submitted": self.submitted,
+            "corrected": self.corrected,
+            "changed": self.changed,
+            "correction_rate": self.corrected / self.submitted if self.submitted else 0.0,
+            "change_rate": self.changed / self.corrected if self.corrected else 0.0,
+            "dropped_backlog": self.dropped_backlog,
+            "dropped_stale": self.dropped_stale,
+            "errors": self.errors,
+            "pending": len(self._pending),
+            "lag_mean_sec": float(lags.mean()) if len(lags) else 0.0,
+            "lag_p95_sec": float(np.percentile(lags, 95)) if len(lags) else 0.0,
+            "lag_max_sec": float(lags.max()) if len(lags) else 0.0,
+            "failed": self.failed,
+        }
+
+    def stop(self):
+        self._stop_event.set()
+        self._work_event.set()
@@ -0,0 +1,169 @@
+import os
+import queue
+import threading
+import multiprocessing as mp
+
+from tuning_profile import get_parallel_split
+
+DEFAULT_MAX_CONCURRENT = 2  # Jumlah model yang dievaluasi bersamaan
+POLL_INTERVAL_SEC = 0.1
+
+# Jenis event yang dikirim ke `events`
+EVENT_STARTED = "started"
+EVENT_PROGRESS = "progress"  # Hasil parsial satu jendela audio
+EVENT_DONE = "done"
+EVENT_FAILED = "failed"
+EVENT_CANCELLED = "cancelled"
+EVENT_FINISHED = "finished"  # Semua job selesai / dibatalkan
+
+
+def split_threads(total_threads, n_jobs):
+    """
+    Membagi thread CPU ke job yang berjalan bersamaan agar core tidak oversubscribed.
+    """
+    return max(1, total_threads // max(1, n_jobs))
+
+
+def _transcribe_in_process(model_name, audio_file_path, n_threads, result_queue):
+    """
+    Entry point proses worker: memuat engine sendiri dengan jatah thread terbatas.
+    """
+    import whisper_engine
+    whisper_engine.WHISPER_PARAMS['n_threads'] = n_threads
+
+    engine = whisper_engine.WhisperEngine()
+    # Mode streaming: memori konstan dan hasil parsial dikirim per jendela
+    text, process_time = engine.transcribe_file_streaming(
+        model_name,
+        audio_file_path,
+        on_segment=lambda segment: result_queue.put((EVENT_PROGRESS, model_name, segment))
+    )
+    result_queue.put((EVENT_DONE, model_name, (text, process_time)))
+
+
+class EvaluationScheduler:
+    """
+    Menjalankan `transcribe_file_streaming` untuk beberapa model di proses terpisah.
+
+    Setiap model berjalan di prosesnya sendiri (maksimal `max_concurrent`
+    sekaligus) dengan `n_threads` dibagi rata. Jika `max_concurrent` None,
+    concurrency dan thread per job diambil dari profil autotune (atau
+    DEFAULT_MAX_CONCURRENT jika belum ada). Hasil dikirim per model ke
+    `events` (queue.Queue) begitu selesai, sehingga UI cukup memantaunya
+    dengan `after()`. Proses yang sedang berjalan bisa dihentikan lewat `cancel()`.
+    """
+    def __init__(self, max_concurrent=None, total_threads=None):
+        self.max_concurrent = max(1, int(max_concurrent)) if max_concurrent else None
+        self.total_threads = total_threads
+        self.events = queue.Queue()
+
+        self._ctx = mp.get_context("spawn")  # Aman dipakai bersama thread Tk
+        self._cancel_event = threading.Event()
+        self._dispatcher = None
+
+    def start(self, model_names, audio_file_path):
+        """
+        Memulai evaluasi di background; tidak memblokir pemanggil.
+        """
+        if self.is_running():
+            raise RuntimeError("Evaluasi sebelumnya masih berjalan.")
+
+        self._cancel_event.clear()
+        self._dispatcher = threading.Thread(
+            target=self._dispatch,
+            args=(list(model_names), audio_file_path),
+            daemon=True
+        )
+        self._dispatcher.start()
+
+    def cancel(self):
+        """
+        Membatalkan job yang belum mulai dan menghentikan proses yang sedang berjalan.
+        """
+        self._cancel_event.set()
+
+    def is_running(self):
+        return self._dispatcher is not None and self._dispatcher.is_alive()
+
+    def _dispatch(self, model_names, audio_file_path):
+        pending = list(model_names)
+        tuned = get_parallel_split(pending) if self.max_concurrent is None else None
+        n_concurrent = min(self.max_concurrent or (tuned[0] if tuned else DEFAULT_MAX_CONCURRENT), len(pending))
+        if tuned and n_concurrent == tuned[0] and not self.total_threads:
+            n_threads = tuned[1]  # Kombinasi yang terukur paling cepat di host ini
+        else:
+            n_threads = split_threads(self.total_threads or os.cpu_count() or 4, n_concurrent)
+        result_queue = self._ctx.Queue()
+        running = {}  # model_name -> Process
+
+        try:
+            while (pending or running) and not self._cancel_event.is_set():
+                # Isi slot kosong
+                while pending and len(running) < n_concurrent:
+                    model_name = pending.pop(0)
+                    process = self._ctx.Process(
+                        target=_transcribe_in_process,
+                        args=(model_name, audio_file_path, n_threads, result_queue),
+                        daemon=True
+                    )
+                    process.start()
+                    running[model_name] = process
+                    self.events.put({"type": EVENT_STARTED, "model": model_name, "n_threads": n_threads})
+
+                # Kumpulkan hasil yang sudah masuk
+                try:
+                    self._handle_message(result_queue.get(timeout=POLL_INTERVAL_SEC), running)
+                except queue.Empty:
+                    pass
+
+                # Proses yang mati tanpa mengirim hasil (mis. kehabisan RAM)
+                for model_name, process in list(running.items()):
+                    if process.is_alive():
+                        continue
+                    process.join()
+                    # Hasil terakhir bisa masih di pipe walau prosesnya sudah keluar
+                    self._drain(result_queue, running)
+                    if model_name in running:
+                        running.pop(model_name)
+                        self.events.put({
+                            "type": EVENT_FAILED,
+                            "model": model_name,
+                            "error": f"Error: proses berhenti (exit code {process.exitcode})"
+                        })
+
+            if self._cancel_event.is_set():
+                for model_name, process in running.items():
+                    process.terminate()
+                    process.join()
+                    self.events.put({"type": EVENT_CANCELLED, "model": model_name})
+                for model_name in pending:
+                    self.events.put({"type": EVENT_CANCELLED, "model": model_name})
+        finally:
+            self.events.put({"type": EVENT_FINISHED})
+
+    def _handle_message(self, message, running):
+        kind, model_name, payload = message
+        if kind == EVENT_PROGRESS:
+            self.events.put({"type": EVENT_PROGRESS, "model": model_name, "segment": payload})
+            return
+        text, process_time = payload
+        process = running.pop(model_name, None)
+        if process is not None:
+            process.join()
+        if text.startswith("Error:"):
+            self.events.put({"type": EVENT_FAILED, "model": model_name, "error": text})
+        else:
+            self.events.put({
+                "type": EVENT_DONE,
+                "model": model_name,
+                "text": text,
+                "process_time": process_time
+            })
+
+    def _drain(self, result_queue, running):
+        # Memproses semua pesan yang tersisa di antrian
+        while True:
+            try:
+                self._handle_message(result_queue.get(timeout=POLL_INTERVAL_SEC), running)
+            except queue.Empty:
+                return
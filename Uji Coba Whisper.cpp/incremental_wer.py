@@ -0,0 +1,95 @@
+import numpy as np
+
+from scoring import tokenize, Vocabulary, initial_row, advance_row, split_counts, measures_from_counts
+
+DEFAULT_BAND = 500  # Lebar pita (kata) di kiri & kanan posisi terbaik saat ini
+
+
+class IncrementalWER:
+    """
+    WER berjalan untuk sesi live terhadap teks referensi yang sudah diketahui.
+
+    Setiap kata hipotesis baru menambah satu baris tabel edit distance
+    (baris = kata hipotesis, kolom = posisi referensi) lewat kernel
+    `scoring.advance_row`. Hanya kolom dalam pita di sekitar posisi
+    terbaik yang disimpan, jadi biaya per kata tetap O(band) berapa pun
+    panjang sesinya.
+
+    Hasil akhir sama persis dengan edit distance penuh selama jalur
+    optimal tidak keluar dari pita (selalu benar jika referensi tidak
+    lebih panjang dari `band`). Pada kasus seri pembagian S/D/I bisa
+    berbeda dari jiwer, tetapi totalnya (dan WER) sama. Teks dinormalisasi
+    dengan aturan yang sama seperti `scoring.score`.
+    """
+    def __init__(self, reference, band=DEFAULT_BAND, normalize=True):
+        self.band = band
+        self.normalize = normalize
+        self.ref_words = tokenize(reference, normalize)
+        self._vocab = Vocabulary()
+        self._ref_ids = self._vocab.encode(self.ref_words)
+        self.n_ref = len(self.ref_words)
+        self.n_hyp = 0
+
+        # Baris 0: hipotesis kosong -> semua kata referensi dihapus
+        self._lo = 0
+        self._hi = min(self.n_ref + 1, band + 1)
+        self._cost, self._sub = initial_row(self._hi)
+        self._pos = 0  # Kolom (posisi referensi) dengan biaya terendah
+
+    def update(self, text):
+        """
+        Menambahkan teks hipotesis (committed) dan mengembalikan stats().
+        """
+        for word in tokenize(text, self.normalize):
+            # Kata yang tidak ada di referensi tidak pernah cocok (id -1)
+            self._add_word(self._vocab.lookup(word))
+        return self.stats()
+
+    def _add_word(self, word_id):
+        self.n_hyp += 1
+        lo = max(self._lo, self._pos - self.band)
+        hi = min(self.n_ref + 1, max(self._hi, self._pos + self.band + 1))
+
+        # Baris sebelumnya pada kolom [lo, hi). Kolom baru di kanan diisi lewat rantai delesi.
+        cost = self._cost[lo - self._lo:]
+        sub = self._sub[lo - self._lo:]
+        extra = hi - self._hi
+        if extra > 0:
+            cost = np.concatenate((cost, cost[-1] + np.arange(1, extra + 1, dtype=cost.dtype)))
+            sub = np.concatenate((sub, np.full(extra, sub[-1], dtype=sub.dtype)))
+
+        self._cost, self._sub = advance_row(cost, sub, self._ref_ids[lo:hi - 1], word_id)
+        self._lo, self._hi = lo, hi
+
+        # Posisi terbaik; pada seri pilih yang paling jauh di referensi
+        best = self._cost.min()
+        self._pos = lo + int(np.flatnonzero(self._cost == best)[-1])
+
+    def _counts(self, j):
+        # (biaya, S, D, I) di kolom j; di kanan pita = sisa referensi dihapus
+        idx = min(j, self._hi - 1) - self._lo
+        extra = j - (self._hi - 1) if j >= self._hi else 0
+        cost = int(self._cost[idx]) + extra
+        return (cost,) + split_counts(cost, int(self._sub[idx]), j, self.n_hyp)
+
+    def stats(self):
+        """
+        WER berjalan terhadap bagian referensi yang sudah "terlewati".
+        """
+        errors, s, d, i = self._counts(self._pos)
+        return {
+            "wer": errors / self._pos if self._pos else (1.0 if self.n_hyp else 0.0),
+            "position": self._pos,
+            "ref_words": self.n_ref,
+            "hyp_words": self.n_hyp,
+            "substitutions": s,
+            "deletions": d,
+            "insertions": i,
+        }
+
+    def final(self):
+        """
+        Skor akhir terhadap seluruh referensi (nama field mengikuti jiwer.compute_measures).
+        """
+        _, s, d, i = self._counts(self.n_ref)
+        return measures_from_counts(self.n_ref, self.n_hyp, s, d, i)
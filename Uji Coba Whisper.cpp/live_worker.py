@@ -1,25 +1,103 @@
 import threading
 import queue
+import time
 import sounddevice as sd
 import numpy as np
 
+import tracing
+from ring_buffer import RingBuffer
+from vad import VoiceActivityDetector, SpeechSegmenter
+from correction_worker import CorrectionWorker
+from session_recorder import SessionRecorder
+
 # Konfigurasi rekaman
 SAMPLE_RATE = 16000  # 16kHz, standar untuk Whisper
 CHUNK_DURATION_SEC = 4  # Merekam per 4 detik
 BUFFER_SIZE = CHUNK_DURATION_SEC * SAMPLE_RATE
 
+# Konfigurasi capture berbasis callback
+CAPTURE_BLOCK_SIZE = 1024  # Sampel per callback PortAudio (~64 ms)
+RING_BUFFER_SEC = 30  # Kapasitas ring buffer; audio lebih lama dari ini akan dibuang
+READ_TIMEOUT_SEC = 0.1  # Interval cek stop event saat menunggu audio
+
+# Mode transkripsi
+MODE_CHUNK = "chunk"  # Potongan tetap CHUNK_DURATION_SEC
+MODE_STREAM = "stream"  # Jendela geser dengan commit bertahap
+STREAM_WINDOW_SEC = 10
+STREAM_HOP_SEC = 1
+VAD_BLOCK_SIZE = 4000  # Sampel per blok yang dianalisis VAD (250 ms)
+
 class LiveWorker(threading.Thread):
     """
-    Thread untuk merekam audio secara live dan mengirimkannya 
+    Thread untuk merekam audio secara live dan mengirimkannya
     ke WhisperEngine untuk transkripsi.
+
+    Capture berjalan di callback PortAudio dan hanya menulis ke ring buffer,
+    sedangkan thread ini menjadi consumer yang menjalankan inferensi.
+    Dengan begitu audio yang diucapkan selama inferensi tidak hilang.
+
+    Jika `correction_model` diberikan (mode chunk), setiap segmen diberi
+    `segment_id` dan audionya diteruskan ke CorrectionWorker yang
+    mengirim teks pengganti untuk segmen yang sama.
+
+    Jika `record_path` diberikan, audio capture mentah direkam oleh
+    SessionRecorder sehingga sesi bisa diputar ulang lewat
+    `audio_sources.replay_stream_factory`.
     """
-    def __init__(self, whisper_engine, model_name, ui_queue):
+    def __init__(self, whisper_engine, model_name, ui_queue, ring_buffer_sec=RING_BUFFER_SEC,
+                 mode=MODE_CHUNK, window_sec=STREAM_WINDOW_SEC, hop_sec=STREAM_HOP_SEC,
+                 use_vad=False, stream_factory=None, correction_model=None, correction_threads=None,
+                 record_path=None):
         super().__init__()
         self.engine = whisper_engine
         self.model_name = model_name
         self.ui_queue = ui_queue  # Antrian untuk kirim hasil ke UI
+        self.mode = mode
+        self.window_sec = window_sec
+        self.hop_sec = hop_sec
+        self.use_vad = use_vad
+        # Sumber audio; default mikrofon. Bisa diganti sumber tiruan (benchmark/replay)
+        self.stream_factory = stream_factory or sd.InputStream
         self._stop_event = threading.Event()
-        
+
+        # Ring buffer dialokasikan sekali di awal, bukan di dalam callback
+        self._ring = RingBuffer(int(ring_buffer_sec * SAMPLE_RATE))
+
+        # Statistik capture
+        self.overflow_count = 0  # Overflow yang dilaporkan PortAudio
+        self.callback_count = 0
+        self.segments_processed = 0
+        self.waiting_for_audio = False  # True jika consumer sedang menunggu audio (antrian habis)
+
+        # Statistik VAD: audio (mode chunk) atau langkah (mode streaming) yang dilewati
+        self._segmenter = SpeechSegmenter() if use_vad and mode == MODE_CHUNK else None
+        self.vad_steps_total = 0
+        self.vad_steps_skipped = 0
+
+        self._recorder = None
+        if record_path:
+            self._recorder = SessionRecorder(record_path, SAMPLE_RATE, metadata={
+                "model": model_name,
+                "mode": mode,
+                "vad": use_vad,
+                "blocksize": CAPTURE_BLOCK_SIZE,
+            })
+
+        # Tier koreksi: hanya mode chunk, karena teks mode streaming tidak terikat ke satu potongan audio
+        self._next_segment_id = 0
+        self._corrector = None
+        if correction_model and correction_model != model_name:
+            if mode == MODE_CHUNK:
+                self._corrector = CorrectionWorker(
+                    whisper_engine,
+                    correction_model,
+                    ui_queue,
+                    has_headroom=lambda: self.waiting_for_audio,
+                    n_threads=correction_threads
+                )
+            else:
+                print("Model koreksi diabaikan: hanya didukung di mode chunk.")
+
         # Cek apakah model ada sebelum memulai
         try:
             self.engine._load_model(self.model_name)
@@ -27,55 +105,222 @@ class LiveWorker(threading.Thread):
             self.ui_queue.put(f"ERROR: Model '{self.model_name}' tidak ditemukan.")
             self._stop_event.set() # Langsung stop jika model tidak ada
 
+    def _audio_callback(self, indata, frames, time_info, status):
+        """
+        Dipanggil oleh PortAudio di thread audio. Harus cepat dan tidak memblokir.
+        """
+        if status.input_overflow:
+            self.overflow_count += 1
+            tracing.count("capture.overflow")
+        self.callback_count += 1
+        tracing.count("capture.callback")
+        self._ring.write(indata[:, 0])
+        if self._recorder is not None:
+            self._recorder.write(indata[:, 0], status.input_overflow)
+
     def run(self):
         """
-        Loop utama thread: rekam, transkripsi, kirim hasil.
+        Loop utama thread: ambil audio dari ring buffer, transkripsi, kirim hasil.
         """
         print(f"LiveWorker (model: {self.model_name}) dimulai...")
         try:
-            # Buka stream audio
-            with sd.InputStream(
+            # Buka stream audio; capture berjalan di callback
+            stream = self.stream_factory(
                 samplerate=SAMPLE_RATE,
                 channels=1,
                 dtype='float32',
-                blocksize=BUFFER_SIZE
-            ) as stream:
-                while not self._stop_event.is_set():
-                    # 1. Rekam satu chunk (memblokir selama CHUNK_DURATION_SEC)
-                    audio_chunk, overflowed = stream.read(BUFFER_SIZE)
-                    
-                    if overflowed:
-                        print("Peringatan: Audio buffer overflow!")
-                    
-                    # Konversi ke array 1D
-                    audio_numpy = audio_chunk.flatten()
-
-                    # 2. Transkripsi
-                    # Ini adalah operasi yang "berat" (CPU-bound)
-                    text, delay = self.engine.transcribe_segment(
-                        self.model_name, 
-                        audio_numpy
-                    )
-                    
-                    # 3. Kirim hasil ke UI
-                    if not self._stop_event.is_set():
-                        # Kirim sebagai dictionary
-                        self.ui_queue.put({
-                            "text": text,
-                            "delay": delay
-                        })
-                        
+                blocksize=CAPTURE_BLOCK_SIZE,
+                callback=self._audio_callback
+            )
+            if hasattr(stream, "set_backpressure"):
+                # Sumber replay menahan blok sampai muat (tidak ada di sd.InputStream)
+                stream.set_backpressure(self._ring.free_space)
+            if self._recorder is not None:
+                self._recorder.start()
+            with stream:
+                if self._corrector is not None:
+                    self._corrector.start()
+                if self.mode == MODE_STREAM:
+                    self._run_stream()
+                elif self._segmenter is not None:
+                    self._run_vad_chunk()
+                else:
+                    self._run_chunk()
+
         except sd.PortAudioError as e:
             print(f"Error audio device: {e}")
             self.ui_queue.put(f"ERROR: Tidak bisa membuka mikrofon. {e}")
         except Exception as e:
             print(f"Error di LiveWorker: {e}")
             self.ui_queue.put(f"ERROR: {e}")
-            
-        print(f"LiveWorker (model: {self.model_name}) berhenti.")
+
+        if self._corrector is not None:
+            self._corrector.stop()
+        if self._recorder is not None:
+            self._recorder.stop()
+        stats = self.get_stats()
+        print(f"LiveWorker (model: {self.model_name}) berhenti. "
+              f"Overflow: {stats['overflow_count']}, Drop: {stats['dropped_sec']:.2f} dtk, "
+              f"Antrian maks: {stats['max_queue_depth_sec']:.2f} dtk")
+
+    def _run_chunk(self):
+        """
+        Mode potongan tetap: setiap CHUNK_DURATION_SEC audio didekode sekali.
+        """
+        while not self._stop_event.is_set():
+            # 1. Ambil satu chunk dari ring buffer (menunggu sampai cukup)
+            with tracing.span("capture.ring_read"):
+                audio_numpy = self._ring.read(BUFFER_SIZE, timeout=READ_TIMEOUT_SEC)
+            self.waiting_for_audio = audio_numpy is None
+            if audio_numpy is None:
+                continue
+            captured_at = time.time()
+
+            # 2. Transkripsi
+            # Ini adalah operasi yang "berat" (CPU-bound)
+            text, delay = self.engine.transcribe_segment(
+                self.model_name,
+                audio_numpy
+            )
+            self.segments_processed += 1
+
+            # 3. Kirim hasil ke UI
+            if not self._stop_event.is_set():
+                self._publish(audio_numpy, text, delay, captured_at)
+
+    def _run_vad_chunk(self):
+        """
+        Mode potongan dengan VAD: hanya segmen speech yang ditranskripsi,
+        dan segmen dipotong di batas ucapan, bukan setiap CHUNK_DURATION_SEC.
+        """
+        while not self._stop_event.is_set():
+            with tracing.span("capture.ring_read"):
+                audio_numpy = self._ring.read(VAD_BLOCK_SIZE, timeout=READ_TIMEOUT_SEC)
+            self.waiting_for_audio = audio_numpy is None
+            if audio_numpy is None:
+                continue
+
+            with tracing.span("vad.feed"):
+                segments = self._segmenter.feed(audio_numpy)
+            captured_at = time.time()
+            for segment in segments:
+                text, delay = self.engine.transcribe_segment(self.model_name, segment)
+                self.segments_processed += 1
+                self._publish(segment, text, delay, captured_at)
+
+        # Stop ditekan: audio yang sudah ter-capture dan ucapan yang masih berjalan tetap ditranskripsi
+        remaining = self._ring.available()
+        segments = self._segmenter.feed(self._ring.read(remaining)) if remaining else []
+        segments.extend(self._segmenter.flush())
+        captured_at = time.time()
+        for segment in segments:
+            text, delay = self.engine.transcribe_segment(self.model_name, segment)
+            self.segments_processed += 1
+            self._publish(segment, text, delay, captured_at)
+
+    def _publish(self, audio, text, delay, captured_at):
+        """
+        Mengirim hasil model cepat ke UI dan, jika tier koreksi aktif,
+        meneruskan audio segmen yang berisi teks ke model koreksi.
+        """
+        segment_id = self._next_segment_id
+        self._next_segment_id += 1
+        tracing.count("ui.queued")
+        # Kirim sebagai dictionary
+        self.ui_queue.put({
+            "text": text,
+            "delay": delay,
+            "segment_id": segment_id
+        })
+        if self._corrector is not None and text and not text.startswith("Error:"):
+            self._corrector.submit(segment_id, audio, text, captured_at)
+
+    def _run_stream(self):
+        """
+        Mode streaming: jendela `window_sec` maju setiap `hop_sec`. Teks yang
+        stabil dikirim sekali sebagai `text`, ekornya sebagai `partial`.
+        """
+        stream = self.engine.create_stream(
+            self.model_name,
+            window_sec=self.window_sec,
+            hop_sec=self.hop_sec
+        )
+        hop = stream.hop_samples
+        vad = VoiceActivityDetector() if self.use_vad else None
+        was_speech = False
+
+        while not self._stop_event.is_set():
+            with tracing.span("capture.ring_read"):
+                audio_numpy = self._ring.read(hop, timeout=READ_TIMEOUT_SEC)
+            self.waiting_for_audio = audio_numpy is None
+            if audio_numpy is None:
+                continue
+            stream.push(audio_numpy)
+            is_speech = vad is None or vad.process(audio_numpy)[1].any()
+
+            # Jika inferensi tertinggal, habiskan hop yang sudah menumpuk sekaligus
+            while self._ring.available() >= hop:
+                audio_numpy = self._ring.read(hop)
+                stream.push(audio_numpy)
+                if vad is not None:
+                    is_speech = vad.process(audio_numpy)[1].any() or is_speech
+
+            self.vad_steps_total += 1
+            if not is_speech and not was_speech:
+                # Hening: jendela tidak didekode sama sekali
+                self.vad_steps_skipped += 1
+                continue
+
+            with tracing.span("stream.step"):
+                result = stream.step()
+            self.segments_processed += 1
+            if not is_speech:
+                # Ucapan baru saja selesai: ekor parsial tidak akan berubah lagi
+                final = stream.flush()
+                result = {
+                    "text": " ".join(t for t in (result["text"], final["text"]) if t),
+                    "partial": "",
+                    "delay": result["delay"]
+                }
+            was_speech = is_speech
+
+            if not self._stop_event.is_set():
+                tracing.count("ui.queued")
+                self.ui_queue.put(result)
+
+    def get_stats(self):
+        """
+        Metrik capture untuk tuning: overflow, sampel yang dibuang, dan kedalaman antrian.
+        """
+        ring = self._ring
+        if self._segmenter is not None:
+            vad_skipped = self._segmenter.skipped_fraction()
+        elif self.vad_steps_total:
+            vad_skipped = self.vad_steps_skipped / self.vad_steps_total
+        else:
+            vad_skipped = 0.0
+        stats = {
+            "overflow_count": self.overflow_count,
+            "callback_count": self.callback_count,
+            "dropped_samples": ring.dropped_samples,
+            "dropped_sec": ring.dropped_samples / SAMPLE_RATE,
+            "captured_sec": ring.written_samples / SAMPLE_RATE,
+            "queue_depth_sec": ring.available() / SAMPLE_RATE,
+            "max_queue_depth_sec": ring.max_depth / SAMPLE_RATE,
+            "queue_capacity_sec": ring.capacity / SAMPLE_RATE,
+            "segments_processed": self.segments_processed,
+            "ui_queue_size": self.ui_queue.qsize(),
+            "vad_enabled": self.use_vad,
+            "vad_skipped_fraction": vad_skipped,
+        }
+        if self._recorder is not None:
+            stats.update(self._recorder.get_stats())
+        if self._corrector is not None:
+            stats.update({f"correction_{key}": value for key, value in self._corrector.get_stats().items()})
+        return stats
 
     def stop(self):
         """
         Sinyal untuk menghentikan thread.
         """
-        self._stop_event.set()
\ No newline at end of file
+        self._stop_event.set()
@@ -2,14 +2,24 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from tkinter.scrolledtext import ScrolledText
 import queue
-import jiwer
 import time
-
-from whisper_engine import WhisperEngine
-from live_worker import LiveWorker
-
-# Model yang tersedia
-AVAILABLE_MODELS = ["tiny", "base", "small", "medium", "large"]
+import os
+
+from whisper_engine import (
+    WhisperEngine, AVAILABLE_MODELS,
+    PRELOAD_LOADING, PRELOAD_WARMING, PRELOAD_READY, PRELOAD_ERROR
+)
+from live_worker import LiveWorker, MODE_CHUNK, MODE_STREAM, STREAM_WINDOW_SEC, STREAM_HOP_SEC
+from eval_scheduler import (
+    EvaluationScheduler, DEFAULT_MAX_CONCURRENT,
+    EVENT_STARTED, EVENT_PROGRESS, EVENT_DONE, EVENT_FAILED, EVENT_CANCELLED, EVENT_FINISHED
+)
+from caption_view import CaptionView, FRAME_MS
+from incremental_wer import IncrementalWER
+from scoring import score
+import tracing
+
+NO_CORRECTION = "-"  # Pilihan combobox koreksi: tanpa tier koreksi
 
 class WhisperEvalApp:
     def __init__(self, root):
@@ -25,10 +35,34 @@ class WhisperEvalApp:
         self.live_ui_queue = queue.Queue()
         self.live_segments = []
         self.live_delays = []
+        self.live_delay_total = 0.0  # Jumlah berjalan agar rata-rata tidak dihitung ulang tiap frame
+        self.live_partial = ""  # Ekor hipotesis yang belum stabil (mode streaming)
+        self.live_capture_stats = {}
+        self.live_caption_stats = {}
+        self.live_wer = None  # IncrementalWER; None jika tidak ada teks referensi
+        self.live_wer_reference = ""
+        self.live_segment_index = {}  # segment_id -> indeks di live_segments (tier koreksi)
+        self.live_correction_model = None
+        self.live_corrections = 0
+        self.live_corrections_changed = 0
+        self.live_draft_segments = []  # Teks model cepat sebelum dikoreksi
+
+        # Variabel untuk Mode 2
+        self.file_scheduler = None
+        self.file_reference = ""
+        self.file_report_blocks = {}  # model_name -> baris laporan
+
+        # Variabel preload model
+        self.preload_queue = queue.Queue()
+        self.live_pending_start = None  # Model yang ditunggu sebelum sesi live dimulai
 
         # Setup UI
         self._setup_ui()
 
+        # Muat & panaskan model default di background agar Start langsung jalan
+        self.preload_model(self.live_model_var.get())
+        self.root.after(100, self.check_preload_queue)
+
     def _setup_ui(self):
         # Gunakan tema jika ada
         try:
@@ -50,6 +84,11 @@ class WhisperEvalApp:
         self.notebook.add(self.tab_file, text='Mode 2: Evaluasi File')
         self._setup_tab_file()
 
+        # --- Tab 3: Metrik (tracing) ---
+        self.tab_metrics = ttk.Frame(self.notebook, padding=10)
+        self.notebook.add(self.tab_metrics, text='Metrik')
+        self._setup_tab_metrics()
+
         self.notebook.pack(expand=True, fill='both')
 
     # --- Setup UI Tab 1: Live ---
@@ -67,6 +106,43 @@ class WhisperEvalApp:
             state='readonly'
         )
         self.live_model_combo.pack(side='left', padx=5)
+        self.live_model_combo.bind(
+            '<<ComboboxSelected>>',
+            lambda event: self.preload_model(self.live_model_var.get())
+        )
+
+        self.live_stream_var = tk.BooleanVar(value=False)
+        self.live_stream_check = ttk.Checkbutton(
+            control_frame,
+            text=f"Streaming ({STREAM_WINDOW_SEC}s / {STREAM_HOP_SEC}s)",
+            variable=self.live_stream_var
+        )
+        self.live_stream_check.pack(side='left', padx=5)
+
+        self.live_vad_var = tk.BooleanVar(value=True)
+        self.live_vad_check = ttk.Checkbutton(control_frame, text="VAD", variable=self.live_vad_var)
+        self.live_vad_check.pack(side='left', padx=5)
+
+        # Audio mentah direkam di samping arsip caption agar sesi bisa di-replay
+        self.live_record_var = tk.BooleanVar(value=False)
+        self.live_record_check = ttk.Checkbutton(control_frame, text="Rekam Audio", variable=self.live_record_var)
+        self.live_record_check.pack(side='left', padx=5)
+
+        # Tier koreksi: model lebih besar mendekode ulang segmen di background
+        ttk.Label(control_frame, text="Koreksi:").pack(side='left', padx=5)
+        self.live_correction_var = tk.StringVar(value=NO_CORRECTION)
+        self.live_correction_combo = ttk.Combobox(
+            control_frame,
+            textvariable=self.live_correction_var,
+            values=[NO_CORRECTION] + AVAILABLE_MODELS,
+            state='readonly',
+            width=8
+        )
+        self.live_correction_combo.pack(side='left', padx=5)
+        self.live_correction_combo.bind('<<ComboboxSelected>>', self.preload_correction_model)
+
+        self.live_model_status_label = ttk.Label(control_frame, text="")
+        self.live_model_status_label.pack(side='left', padx=5)
 
         self.live_start_btn = ttk.Button(
             control_frame, 
@@ -95,9 +171,13 @@ class WhisperEvalApp:
         
         self.live_status_label = ttk.Label(result_frame, text="Status: Idle")
         self.live_status_label.pack(anchor='w')
+        self.live_wer_label = ttk.Label(result_frame, text="")
+        self.live_wer_label.pack(anchor='w')
         
         self.live_result_text = ScrolledText(result_frame, height=15, wrap=tk.WORD, state='disabled')
         self.live_result_text.pack(fill='both', expand=True)
+        # Render dibatch per frame dengan scrollback terbatas; teks lama diarsipkan ke file sesi
+        self.caption_view = CaptionView(self.live_result_text)
 
     # --- Setup UI Tab 2: File ---
     def _setup_tab_file(self):
@@ -130,38 +210,216 @@ class WhisperEvalApp:
         action_frame = ttk.Frame(self.tab_file, padding=10)
         action_frame.pack(fill='x')
         
-        self.file_eval_btn = ttk.Button(action_frame, text="4. Mulai Evaluasi", command=self.start_file_evaluation)
-        self.file_eval_btn.pack()
+        button_row = ttk.Frame(action_frame)
+        button_row.pack()
+
+        self.file_eval_btn = ttk.Button(button_row, text="4. Mulai Evaluasi", command=self.start_file_evaluation)
+        self.file_eval_btn.pack(side='left', padx=5)
+
+        self.file_cancel_btn = ttk.Button(button_row, text="Batal", command=self.cancel_file_evaluation, state='disabled')
+        self.file_cancel_btn.pack(side='left', padx=5)
+
+        ttk.Label(button_row, text="Model paralel:").pack(side='left', padx=(15, 5))
+        self.file_concurrency_var = tk.IntVar(value=DEFAULT_MAX_CONCURRENT)
+        ttk.Spinbox(
+            button_row,
+            from_=1,
+            to=len(AVAILABLE_MODELS),
+            width=3,
+            textvariable=self.file_concurrency_var,
+            state='readonly'
+        ).pack(side='left')
 
         self.file_result_text = ScrolledText(action_frame, height=15, wrap=tk.WORD, state='disabled')
         self.file_result_text.pack(fill='both', expand=True, pady=10)
 
+    # --- Setup UI Tab 3: Metrik ---
+    def _setup_tab_metrics(self):
+        control_frame = ttk.LabelFrame(self.tab_metrics, text="Tracing", padding=10)
+        control_frame.pack(fill='x', pady=5)
+
+        self.trace_enabled_var = tk.BooleanVar(value=tracing.is_enabled())
+        ttk.Checkbutton(
+            control_frame,
+            text="Aktifkan tracing",
+            variable=self.trace_enabled_var,
+            command=self.toggle_tracing
+        ).pack(side='left', padx=5)
+
+        self.trace_sampler_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            control_frame,
+            text="Sampling profiler",
+            variable=self.trace_sampler_var,
+            command=self.toggle_sampler
+        ).pack(side='left', padx=5)
+        self.trace_sampler = None
+
+        ttk.Button(control_frame, text="Ekspor Trace...", command=self.export_trace).pack(side='left', padx=5)
+        ttk.Button(control_frame, text="Reset", command=tracing.reset).pack(side='left', padx=5)
+
+        self.metrics_text = ScrolledText(self.tab_metrics, height=20, wrap=tk.NONE, state='disabled',
+                                         font=('Courier', 9))
+        self.metrics_text.pack(fill='both', expand=True, pady=5)
+        self.root.after(1000, self.refresh_metrics)
+
+    def toggle_tracing(self):
+        if self.trace_enabled_var.get():
+            tracing.enable()
+        else:
+            tracing.disable()
+
+    def toggle_sampler(self):
+        if self.trace_sampler_var.get():
+            self.trace_sampler = tracing.start_sampler()
+        else:
+            tracing.stop_sampler()  # Hasil tetap tersimpan di self.trace_sampler untuk diekspor
+
+    def export_trace(self):
+        path = filedialog.asksaveasfilename(
+            title="Simpan Chrome Trace",
+            defaultextension=".json",
+            filetypes=[("Chrome Trace", "*.json")]
+        )
+        if not path:
+            return
+        n_events = tracing.export_chrome_trace(path)
+        message = f"{n_events} event ditulis ke {path}"
+        if self.trace_sampler is not None:
+            stacks_path = os.path.splitext(path)[0] + ".stacks.txt"
+            self.trace_sampler.export(stacks_path)
+            message += f"\nStack profiler ({self.trace_sampler.samples} sampel) ditulis ke {stacks_path}"
+        messagebox.showinfo("Ekspor Trace", message)
+
+    def refresh_metrics(self):
+        """
+        Memperbarui panel metrik sekali per detik, hanya jika tab Metrik sedang dibuka.
+        """
+        if self.notebook.select() == str(self.tab_metrics):
+            lines = [tracing.format_metrics()]
+            if not tracing.is_enabled():
+                lines.insert(0, "(Tracing nonaktif - angka di bawah tidak bertambah)\n")
+            if self.live_worker_thread is not None:
+                lines.append("\nCapture live")
+                for key, value in self.live_worker_thread.get_stats().items():
+                    lines.append(f"  {key:<30}{value}")
+            lines.append("\nCache model")
+            for key, value in self.engine.cache_stats().items():
+                lines.append(f"  {key:<30}{value}")
+
+            self.metrics_text.config(state='normal')
+            self.metrics_text.delete('1.0', tk.END)
+            self.metrics_text.insert(tk.END, "\n".join(lines))
+            self.metrics_text.config(state='disabled')
+        self.root.after(1000, self.refresh_metrics)
+
     # --- Logika Aplikasi ---
 
     # --- Logika Mode 1 (Live) ---
     
+    def preload_model(self, model_name):
+        """
+        Memuat model di background; progres dikirim ke preload_queue.
+        """
+        if self.engine.is_ready(model_name):
+            self.live_model_status_label.config(text=f"Model '{model_name}' siap")
+            return
+        self.engine.preload(
+            model_name,
+            lambda name, stage, info: self.preload_queue.put((name, stage, info))
+        )
+
+    def preload_correction_model(self, event=None):
+        """
+        Model koreksi dimuat lebih awal agar segmen pertama langsung bisa dikoreksi.
+        """
+        model_name = self.live_correction_var.get()
+        if model_name != NO_CORRECTION and not self.engine.is_ready(model_name):
+            self.engine.preload(
+                model_name,
+                lambda name, stage, info: self.preload_queue.put((name, stage, info))
+            )
+
+    def check_preload_queue(self):
+        """
+        Menampilkan progres preload dan memulai sesi live yang menunggu model siap.
+        """
+        labels = {
+            PRELOAD_LOADING: "memuat...",
+            PRELOAD_WARMING: "pemanasan...",
+            PRELOAD_READY: "siap",
+            PRELOAD_ERROR: "gagal dimuat",
+        }
+        try:
+            while True:
+                model_name, stage, info = self.preload_queue.get_nowait()
+                if model_name == self.live_model_var.get():
+                    self.live_model_status_label.config(text=f"Model '{model_name}' {labels[stage]}")
+
+                if model_name != self.live_pending_start:
+                    continue
+                if stage == PRELOAD_READY:
+                    self.live_pending_start = None
+                    self.start_live_caption()
+                elif stage == PRELOAD_ERROR:
+                    self.live_pending_start = None
+                    self.live_start_btn.config(state='normal')
+                    self.live_status_label.config(text="Status: Idle.")
+                    messagebox.showerror("Error", f"Model '{model_name}' gagal dimuat: {info}")
+        except queue.Empty:
+            pass
+
+        self.root.after(200, self.check_preload_queue)
+
     def start_live_caption(self):
         model_name = self.live_model_var.get()
         if self.live_worker_thread:
             messagebox.showwarning("Peringatan", "Sesi live sudah berjalan.")
             return
 
+        # Sesi live hanya dimulai dengan model yang sudah dimuat & dipanaskan
+        if not self.engine.is_ready(model_name):
+            if self.live_pending_start != model_name:
+                self.live_pending_start = model_name
+                self.preload_model(model_name)
+            self.live_start_btn.config(state='disabled')
+            self.live_status_label.config(text=f"Status: Menunggu model '{model_name}' siap...")
+            return
+
         # Reset
         self.live_segments = []
         self.live_delays = []
-        self.live_result_text.config(state='normal')
-        self.live_result_text.delete('1.0', tk.END)
-        self.live_result_text.config(state='disabled')
+        self.live_delay_total = 0.0
+        self.live_partial = ""
+        self.live_segment_index = {}
+        self.live_draft_segments = []
+        self.live_corrections = 0
+        self.live_corrections_changed = 0
+        self.caption_view.start_session()
+
+        # Koreksi tidak tersedia di mode streaming atau jika modelnya sama dengan model cepat
+        correction_model = self.live_correction_var.get()
+        if correction_model == NO_CORRECTION or correction_model == model_name or self.live_stream_var.get():
+            correction_model = None
+        self.live_correction_model = correction_model
+
+        # WER berjalan terhadap referensi yang diisi sebelum Start
+        self.live_wer_reference = self.live_ref_text.get("1.0", tk.END).strip()
+        self.live_wer = IncrementalWER(self.live_wer_reference) if self.live_wer_reference else None
+        self.live_wer_label.config(text="")
         
         self.live_status_label.config(text=f"Memulai model '{model_name}'...")
-        self.root.update_idletasks() # Paksa UI update
 
         # Mulai thread worker
         self.live_ui_queue = queue.Queue()
         self.live_worker_thread = LiveWorker(
             self.engine, 
             model_name, 
-            self.live_ui_queue
+            self.live_ui_queue,
+            mode=MODE_STREAM if self.live_stream_var.get() else MODE_CHUNK,
+            use_vad=self.live_vad_var.get(),
+            correction_model=correction_model,
+            record_path=os.path.splitext(self.caption_view.archive_path)[0] if self.live_record_var.get() else None
         )
         self.live_worker_thread.start()
 
@@ -169,47 +427,86 @@ class WhisperEvalApp:
         self.live_start_btn.config(state='disabled')
         self.live_stop_btn.config(state='normal')
         self.live_model_combo.config(state='disabled')
+        self.live_stream_check.config(state='disabled')
+        self.live_vad_check.config(state='disabled')
+        self.live_correction_combo.config(state='disabled')
+        self.live_record_check.config(state='disabled')
         
         # Mulai memantau antrian (queue) dari thread
-        self.root.after(100, self.check_live_queue)
+        self.root.after(FRAME_MS, self.check_live_queue)
 
     def check_live_queue(self):
         """
-        Periksa queue dari worker thread tanpa memblokir UI.
+        Periksa queue dari worker thread tanpa memblokir UI. Semua hasil
+        yang masuk sejak frame terakhir dirender sebagai satu update widget.
         """
-        try:
-            while True:
-                # Ambil data dari queue
-                result = self.live_ui_queue.get_nowait()
-                
-                if "ERROR:" in str(result):
-                    messagebox.showerror("Error Thread", result)
-                    self.stop_live_caption(show_eval=False)
-                    return
-
-                text = result.get("text", "")
-                delay = result.get("delay", 0)
-
-                # Simpan data
-                self.live_segments.append(text)
-                self.live_delays.append(delay)
-
-                # Update UI
-                self.live_result_text.config(state='normal')
-                self.live_result_text.insert(tk.END, f"{text} ")
-                self.live_result_text.see(tk.END) # Auto-scroll
-                self.live_result_text.config(state='disabled')
+        with tracing.span("ui.poll"):
+            try:
+                while True:
+                    # Ambil data dari queue
+                    result = self.live_ui_queue.get_nowait()
                 
-                avg_delay = sum(self.live_delays) / len(self.live_delays)
-                self.live_status_label.config(text=f"Status: Merekam... (Avg. Seg. Delay: {avg_delay:.2f} dtk)")
-
-        except queue.Empty:
-            # Jika queue kosong, tidak ada masalah. Cek lagi nanti.
-            pass
+                    if "ERROR:" in str(result):
+                        messagebox.showerror("Error Thread", result)
+                        self.stop_live_caption(show_eval=False)
+                        return
+
+                    if "correction" in result:
+                        # Teks model koreksi menggantikan segmen yang sudah tampil
+                        index = self.live_segment_index.pop(result["correction"], None)
+                        if index is not None:
+                            self.live_segments[index] = result["text"]
+                            self.live_corrections += 1
+                            self.live_corrections_changed += result["changed"]
+                            if result["changed"]:
+                                self.caption_view.correct(result["correction"], result["text"])
+                        continue
+
+                    text = result.get("text", "")
+                    delay = result.get("delay", 0)
+                    partial = result.get("partial")  # Hanya ada di mode streaming
+                    segment_id = result.get("segment_id")
+
+                    # Simpan data
+                    if text or partial is None:
+                        if self.live_correction_model and text:
+                            self.live_segment_index[segment_id] = len(self.live_segments)
+                        self.live_segments.append(text)
+                        self.live_draft_segments.append(text)
+                    self.live_delays.append(delay)
+                    self.live_delay_total += delay
+                    self.live_partial = partial or ""
+
+                    # Hanya ditampung; widget diperbarui sekali di akhir frame
+                    self.caption_view.push(text, partial, segment_id if self.live_correction_model else None)
+                    tracing.count("ui.received")
+                    if text and self.live_wer is not None:
+                        self.live_wer.update(text)
+
+            except queue.Empty:
+                # Jika queue kosong, tidak ada masalah. Cek lagi nanti.
+                pass
+
+        with tracing.span("ui.render"):
+            rendered = self.caption_view.render()
+        if rendered:
+            avg_delay = self.live_delay_total / len(self.live_delays)
+            status = f"Status: Merekam... (Avg. Seg. Delay: {avg_delay:.2f} dtk)"
+            if self.live_correction_model:
+                status += (f" | Koreksi '{self.live_correction_model}': {self.live_corrections} segmen, "
+                           f"{self.live_corrections_changed} berubah")
+            self.live_status_label.config(text=status)
+            if self.live_wer is not None:
+                wer_stats = self.live_wer.stats()
+                self.live_wer_label.config(
+                    text=f"WER berjalan: {wer_stats['wer'] * 100:.1f} % "
+                         f"(S {wer_stats['substitutions']} / D {wer_stats['deletions']} / I {wer_stats['insertions']}) | "
+                         f"Posisi referensi: {wer_stats['position']}/{wer_stats['ref_words']} kata"
+                )
         
         # Jadwalkan cek berikutnya jika thread masih jalan
         if self.live_worker_thread and self.live_worker_thread.is_alive():
-            self.root.after(100, self.check_live_queue)
+            self.root.after(FRAME_MS, self.check_live_queue)
 
     def stop_live_caption(self, show_eval=True):
         if not self.live_worker_thread:
@@ -217,12 +514,22 @@ class WhisperEvalApp:
 
         # Kirim sinyal stop ke thread
         self.live_worker_thread.stop()
+        self.live_capture_stats = self.live_worker_thread.get_stats()
         self.live_worker_thread = None # Hapus referensi
 
+        # Hasil yang masih tertampung dirender, lalu arsip sesi ditutup
+        self.caption_view.render()
+        self.caption_view.close()
+        self.live_caption_stats = self.caption_view.get_stats()
+
         # Update UI
         self.live_start_btn.config(state='normal')
         self.live_stop_btn.config(state='disabled')
         self.live_model_combo.config(state='normal')
+        self.live_stream_check.config(state='normal')
+        self.live_vad_check.config(state='normal')
+        self.live_correction_combo.config(state='readonly')
+        self.live_record_check.config(state='normal')
         self.live_status_label.config(text="Status: Idle. Menyiapkan evaluasi...")
         
         if not show_eval:
@@ -231,7 +538,8 @@ class WhisperEvalApp:
 
         # --- Lakukan Evaluasi Final ---
         reference = self.live_ref_text.get("1.0", tk.END).strip()
-        hypothesis = " ".join(self.live_segments).strip()
+        # Ekor parsial terakhir ikut dievaluasi karena sesi sudah berakhir
+        hypothesis = " ".join(self.live_segments + [self.live_partial]).strip()
         
         if not reference or not hypothesis:
             messagebox.showinfo("Evaluasi", "Tidak ada teks referensi atau hasil untuk dievaluasi.")
@@ -239,19 +547,51 @@ class WhisperEvalApp:
             return
 
         try:
-            measures = jiwer.compute_measures(reference, hypothesis)
+            if self.live_wer is not None and reference == self.live_wer_reference:
+                # Alignment sudah diperbarui per segmen; cukup tambahkan ekor parsial
+                self.live_wer.update(self.live_partial)
+                measures = self.live_wer.final()
+            else:
+                # Referensi diubah selama sesi: hitung ulang penuh
+                measures = score(reference, " ".join(self.live_draft_segments + [self.live_partial]))
+            # Skor di atas memakai teks model cepat; hasil akhir memakai teks setelah koreksi
+            draft_measures = measures
+            if self.live_corrections_changed:
+                measures = score(reference, hypothesis)
             wer = measures['wer'] * 100
             mer = measures['mer'] * 100
             wil = measures['wil'] * 100
             
-            avg_delay = sum(self.live_delays) / len(self.live_delays) if self.live_delays else 0
+            avg_delay = self.live_delay_total / len(self.live_delays) if self.live_delays else 0
+            stats = self.live_capture_stats
+            caption_stats = self.live_caption_stats
+
+            correction_report = ""
+            if self.live_correction_model:
+                correction_report = f"""
+--- Tier Koreksi ---
+Model Koreksi: {self.live_correction_model}
+Segmen Dikoreksi: {stats.get('correction_corrected', 0)} dari {stats.get('correction_submitted', 0)} ({stats.get('correction_correction_rate', 0) * 100:.1f} %)
+Koreksi Mengubah Teks: {stats.get('correction_changed', 0)} ({stats.get('correction_change_rate', 0) * 100:.1f} %)
+Lag Koreksi (rata-rata / p95 / maks): {stats.get('correction_lag_mean_sec', 0):.2f} / {stats.get('correction_lag_p95_sec', 0):.2f} / {stats.get('correction_lag_max_sec', 0):.2f} detik
+Dilewati (antrian penuh / terlalu lama): {stats.get('correction_dropped_backlog', 0)} / {stats.get('correction_dropped_stale', 0)}
+WER Model Cepat Saja: {draft_measures['wer'] * 100:.2f} %
+"""
+                if stats.get('correction_failed'):
+                    correction_report += f"Model koreksi gagal dimuat: {stats['correction_failed']}\n"
 
             report = f"""
 --- EVALUASI FINAL (MODE 1) ---
 Model: {self.live_model_var.get()}
 Rata-rata Delay Segmen: {avg_delay:.3f} detik
 Total Segmen: {len(self.live_segments)}
-
+Audio Overflow: {stats.get('overflow_count', 0)} kali
+Audio Dibuang: {stats.get('dropped_sec', 0):.2f} detik
+Antrian Maks: {stats.get('max_queue_depth_sec', 0):.2f} detik
+Audio Hening Dilewati (VAD): {stats.get('vad_skipped_fraction', 0) * 100:.1f} %
+Arsip Caption: {caption_stats.get('archive_path')}
+Rekaman Audio: {stats.get('recording_path', '-')}
+{correction_report}
 Word Error Rate (WER): {wer:.2f} %
 MER (Match Error Rate): {mer:.2f} %
 WIL (Word Info. Lost): {wil:.2f} %
@@ -304,60 +644,132 @@ Total Kata Hasil: {measures['hypothesis']}
             messagebox.showerror("Error", "Silakan pilih minimal satu model untuk evaluasi.")
             return
             
+        if self.file_scheduler and self.file_scheduler.is_running():
+            messagebox.showwarning("Peringatan", "Evaluasi sebelumnya masih berjalan.")
+            return
+
         # Tampilkan status
         self.file_result_text.config(state='normal')
         self.file_result_text.delete('1.0', tk.END)
         self.file_result_text.insert('1.0', "Memulai evaluasi...\n\n")
-        self.root.update_idletasks()
-        
-        # Mulai evaluasi
+        self.file_result_text.config(state='disabled')
+
+        self.file_reference = reference
+        self.file_models_to_run = models_to_run
+        self.file_report_blocks = {}
+
+        # Setiap model berjalan di proses terpisah; hasil dipantau lewat after()
+        self.file_scheduler = EvaluationScheduler(max_concurrent=self.file_concurrency_var.get())
+        self.file_scheduler.start(models_to_run, self.audio_file_path)
+
+        self.file_eval_btn.config(state='disabled')
+        self.file_cancel_btn.config(state='normal')
+        self.root.after(100, self.check_file_queue)
+
+    def cancel_file_evaluation(self):
+        if self.file_scheduler:
+            self.file_scheduler.cancel()
+            self.file_cancel_btn.config(state='disabled')
+            self._append_file_status("\nMembatalkan evaluasi...\n")
+
+    def check_file_queue(self):
+        """
+        Periksa hasil per model dari scheduler tanpa memblokir UI.
+        """
+        finished = False
+        try:
+            while True:
+                event = self.file_scheduler.events.get_nowait()
+                tracing.count("ui.file_events")
+                kind = event["type"]
+                model_name = event.get("model")
+
+                if kind == EVENT_STARTED:
+                    self._append_file_status(
+                        f"\nMemproses dengan model '{model_name}' ({event['n_threads']} thread)...\n"
+                    )
+                elif kind == EVENT_PROGRESS:
+                    segment = event["segment"]
+                    self._append_file_status(
+                        f"  [{model_name} {segment['end']:.0f} dtk] {segment['text']}\n"
+                    )
+                elif kind == EVENT_DONE:
+                    self._handle_file_result(model_name, event["text"], event["process_time"])
+                elif kind == EVENT_FAILED:
+                    self._append_file_status(f"  -> '{model_name}' GAGAL: {event['error']}\n")
+                    self.file_report_blocks[model_name] = [
+                        f"\nMODEL: {model_name}",
+                        f"  STATUS: GAGAL ({event['error']})"
+                    ]
+                elif kind == EVENT_CANCELLED:
+                    self.file_report_blocks[model_name] = [
+                        f"\nMODEL: {model_name}",
+                        "  STATUS: DIBATALKAN"
+                    ]
+                elif kind == EVENT_FINISHED:
+                    finished = True
+                    break
+        except queue.Empty:
+            pass
+
+        if finished:
+            self._show_file_report()
+        else:
+            self.root.after(100, self.check_file_queue)
+
+    def _handle_file_result(self, model_name, hypothesis, process_time):
+        try:
+            # Hitung WER/CER (teks dinormalisasi: huruf kecil, tanda baca, angka, singkatan)
+            measures = score(self.file_reference, hypothesis)
+            wer = measures['wer'] * 100
+
+            # Tambah ke laporan
+            self.file_report_blocks[model_name] = [
+                f"\nMODEL: {model_name}",
+                f"  Waktu Proses: {process_time:.2f} detik",
+                f"  WER: {wer:.2f} %",
+                f"  CER: {measures['cer'] * 100:.2f} %",
+                f"  S/D/I: {measures['substitutions']}/{measures['deletions']}/{measures['insertions']}",
+                f"  Teks Hasil: {hypothesis}"
+            ]
+
+            # Update UI
+            self._append_file_status(f"  -> '{model_name}' selesai! (WER: {wer:.2f} %)\n")
+
+        except Exception as e:
+            self._append_file_status(f"  -> '{model_name}' GAGAL: {e}\n")
+            self.file_report_blocks[model_name] = [
+                f"\nMODEL: {model_name}",
+                f"  STATUS: GAGAL ({e})"
+            ]
+
+    def _append_file_status(self, text):
+        self.file_result_text.config(state='normal')
+        self.file_result_text.insert(tk.END, text)
+        self.file_result_text.see(tk.END)
+        self.file_result_text.config(state='disabled')
+
+    def _show_file_report(self):
         report_lines = []
         report_lines.append(f"--- LAPORAN EVALUASI FILE ---")
         report_lines.append(f"File: {os.path.basename(self.audio_file_path)}")
-        report_lines.append(f"Teks Referensi: {reference[:100]}...\n")
+        report_lines.append(f"Teks Referensi: {self.file_reference[:100]}...\n")
         report_lines.append("=" * 30)
-        
-        for model_name in models_to_run:
-            self.file_result_text.insert(tk.END, f"\nMemproses dengan model '{model_name}'...\n")
-            self.root.update_idletasks()
-            
-            try:
-                # Panggil Engine
-                hypothesis, process_time = self.engine.transcribe_file(
-                    model_name, 
-                    self.audio_file_path
-                )
-                
-                if "Error:" in hypothesis:
-                    report_lines.append(f"\nMODEL: {model_name}")
-                    report_lines.append(f"  STATUS: GAGAL ({hypothesis})")
-                    continue
-
-                # Hitung WER
-                measures = jiwer.compute_measures(reference, hypothesis)
-                wer = measures['wer'] * 100
-                
-                # Tambah ke laporan
-                report_lines.append(f"\nMODEL: {model_name}")
-                report_lines.append(f"  Waktu Proses: {process_time:.2f} detik")
-                report_lines.append(f"  WER: {wer:.2f} %")
-                report_lines.append(f"  S/D/I: {measures['substitutions']}/{measures['deletions']}/{measures['insertions']}")
-                report_lines.append(f"  Teks Hasil: {hypothesis}")
-                
-                # Update UI
-                self.file_result_text.insert(tk.END, f"  -> Selesai! (WER: {wer:.2f} %)\n")
 
-            except Exception as e:
-                self.file_result_text.insert(tk.END, f"  -> GAGAL: {e}\n")
-                report_lines.append(f"\nMODEL: {model_name}")
-                report_lines.append(f"  STATUS: GAGAL ({e})")
+        # Urutan laporan mengikuti urutan model, bukan urutan selesai
+        for model_name in self.file_models_to_run:
+            report_lines.extend(self.file_report_blocks.get(model_name, []))
 
         # Tampilkan laporan lengkap
         self.file_result_text.config(state='normal')
         self.file_result_text.delete('1.0', tk.END)
         self.file_result_text.insert('1.0', "\n".join(report_lines))
         self.file_result_text.config(state='disabled')
-        
+
+        self.file_eval_btn.config(state='normal')
+        self.file_cancel_btn.config(state='disabled')
+        self.file_scheduler = None
+
     def show_report_window(self, report_text):
         """
         Menampilkan laporan di jendela pop-up baru.
@@ -0,0 +1,154 @@
+import gc
+import os
+import threading
+from collections import OrderedDict
+
+# Perkiraan RAM model dibanding ukuran file ggml (buffer kerja, KV cache, dll.)
+MODEL_MEMORY_FACTOR = 1.3
+
+
+def estimate_model_bytes(model_path):
+    """
+    Perkiraan pemakaian RAM sebuah model dari ukuran file ggml-nya.
+    """
+    return int(os.path.getsize(model_path) * MODEL_MEMORY_FACTOR)
+
+
+class ModelCache:
+    """
+    Cache model LRU dengan batas memori, aman dipakai dari banyak thread.
+
+    Model yang paling lama tidak dipakai dilepas ketika total perkiraan
+    memori melebihi `memory_budget_bytes`. Model yang sedang dimuat oleh
+    satu thread tidak akan dimuat ulang oleh thread lain; thread kedua
+    menunggu lalu memakai hasil yang sama.
+    """
+    def __init__(self, loader, memory_budget_bytes):
+        self._loader = loader  # callable(model_path) -> model
+        self.memory_budget_bytes = int(memory_budget_bytes)
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (model, perkiraan_bytes), urutan = LRU
+        self._load_locks = {}  # key -> Lock, mencegah load ganda untuk model yang sama
+
+        # Statistik
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key, model_path):
+        """
+        Mengambil model dari cache atau memuatnya dari `model_path`.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                return entry
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Thread lain mungkin sudah selesai memuat model yang sama
+            with self._lock:
+                entry = self._lookup(key)
+                if entry is not None:
+                    return entry
+
+            size = estimate_model_bytes(model_path)
+            with self._lock:
+                evicted = self._evict_until_fits(size)
+            self._release(evicted)
+
+            # Load dilakukan di luar lock global agar model lain tetap bisa diakses
+            model = self._loader(model_path)
+
+            with self._lock:
+                self._entries[key] = (model, size)
+                self.misses += 1
+                evicted = self._evict_until_fits(0, keep=key)
+            self._release(evicted)
+            return model
+
+    def evict(self, key):
+        """
+        Melepas satu model secara eksplisit. Mengembalikan True jika model ada di cache.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.evictions += 1
+        if entry is None:
+            return False
+        evicted = [(key, entry[0])]
+        del entry
+        self._release(evicted)
+        return True
+
+    def clear(self):
+        with self._lock:
+            evicted = [(key, model) for key, (model, _) in self._entries.items()]
+            self.evictions += len(evicted)
+            self._entries.clear()
+        self._release(evicted)
+
+    def memory_used(self):
+        with self._lock:
+            return sum(size for _, size in self._entries.values())
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "loaded": list(self._entries.keys()),
+                "memory_used_mb": sum(size for _, size in self._entries.values()) / 2**20,
+                "memory_budget_mb": self.memory_budget_bytes / 2**20,
+            }
+
+    def _lookup(self, key):
+        # Harus dipanggil dengan self._lock dipegang
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def _evict_until_fits(self, incoming_bytes, keep=None):
+        # Harus dipanggil dengan self._lock dipegang; mengembalikan model yang dikeluarkan
+        evicted = []
+        used = sum(size for _, size in self._entries.values())
+        for key in list(self._entries.keys()):
+            if used + incoming_bytes <= self.memory_budget_bytes:
+                break
+            if key == keep:
+                continue
+            model, size = self._entries.pop(key)
+            used -= size
+            evicted.append((key, model))
+            self.evictions += 1
+        return evicted
+
+    def _release(self, evicted):
+        """
+        Melepas referensi cache ke model di luar lock lalu menjalankan GC.
+
+        Model tidak ditutup paksa karena thread lain mungkin masih
+        menjalankan inferensi dengannya; memori kembali begitu referensi
+        terakhir dilepas (destruktor binding membebaskan konteks whisper).
+        """
+        if not evicted:
+            return
+        while evicted:
+            key, model = evicted.pop()
+            print(f"Model '{key}' dikeluarkan dari cache.")
+            del model
+        gc.collect()
@@ -0,0 +1,175 @@
+"""
+Verifikasi checksum file model ggml.
+
+Isi file dicek terhadap index checksum SHA-1 di `MODEL_DIR/checksums.json`;
+SHA-1 dipakai agar bisa dicocokkan dengan daftar checksum resmi model
+whisper.cpp. Hash yang sama dipakai ResultCache sebagai identitas model,
+jadi file model hanya di-hash sekali per perubahan isi.
+
+Binding whisper_cpp_python memuat model dari path dan whisper.cpp menyalin
+tensor ke buffer miliknya sendiri, sehingga file model tidak dipetakan di
+sini. `process_memory()` dipakai WhisperEngine untuk mengukur memori privat
+yang ditambahkan saat model dimuat.
+
+Contoh:
+    python model_store.py status
+    python model_store.py verify --full
+    python model_store.py update medium
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+
+MODEL_DIR = "./models"
+CHECKSUM_INDEX = "checksums.json"
+HASH_CHUNK_BYTES = 16 << 20
+
+
+class ModelChecksumError(Exception):
+    """
+    Isi file model tidak sama dengan checksum yang tercatat.
+    """
+    pass
+
+
+def _read_smaps_fields(lines, fields):
+    # Menjumlahkan field "Nama:   123 kB" dari baris-baris smaps (hasil dalam byte)
+    totals = dict.fromkeys(fields, 0)
+    for line in lines:
+        name, _, rest = line.partition(":")
+        if name in totals:
+            totals[name] += int(rest.split()[0]) * 1024
+    return totals
+
+
+def process_memory():
+    """
+    Memori proses ini dari /proc/self/smaps_rollup (byte), atau None di luar Linux.
+    """
+    try:
+        with open("/proc/self/smaps_rollup", encoding="ascii") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+    return _read_smaps_fields(lines, ("Rss", "Pss", "Shared_Clean", "Shared_Dirty",
+                                      "Private_Clean", "Private_Dirty", "Anonymous"))
+
+
+class ModelStore:
+    """
+    Memverifikasi file model sebelum dimuat.
+
+    Hasil verifikasi di-memo per (ukuran, mtime): file yang tidak berubah
+    tidak di-hash ulang. File baru dicatat saat pertama dipakai; file yang
+    isinya berubah ditolak dengan ModelChecksumError sampai dicatat ulang
+    lewat `update()`.
+    """
+    def __init__(self, model_dir=MODEL_DIR):
+        self.model_dir = model_dir
+        self.index_path = os.path.join(model_dir, CHECKSUM_INDEX)
+        self._lock = threading.Lock()
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _write_index(self, index):
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def _hash(self, path):
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def verify(self, model_path, full=False):
+        """
+        Memastikan isi file sama dengan index. `full=True` selalu menghitung
+        ulang hash. Mengembalikan SHA-1 file.
+        """
+        name = os.path.basename(model_path)
+        stat = os.stat(model_path)
+        stamp = [stat.st_size, stat.st_mtime_ns]
+
+        with self._lock:
+            index = self._read_index()
+            entry = index.get(name)
+            if entry and entry["stamp"] == stamp and not full:
+                return entry["sha1"]
+
+            print(f"Memverifikasi checksum {name}...")
+            sha1 = self._hash(model_path)
+            if entry and entry["sha1"] != sha1:
+                raise ModelChecksumError(
+                    f"Checksum {name} tidak cocok (tercatat {entry['sha1'][:12]}, file {sha1[:12]}). "
+                    f"Jika file memang diganti, jalankan: python model_store.py update {name}"
+                )
+            index[name] = {"sha1": sha1, "stamp": stamp, "verified_at": time.time()}
+            self._write_index(index)
+            return sha1
+
+    def update(self, model_path):
+        """
+        Mencatat ulang checksum file (setelah model diunduh/diganti dengan sengaja).
+        """
+        name = os.path.basename(model_path)
+        stat = os.stat(model_path)
+        with self._lock:
+            index = self._read_index()
+            sha1 = self._hash(model_path)
+            index[name] = {"sha1": sha1, "stamp": [stat.st_size, stat.st_mtime_ns], "verified_at": time.time()}
+            self._write_index(index)
+        return sha1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Checksum dan status file model ggml.")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="Daftar model dan checksum tercatat")
+    verify = sub.add_parser("verify", help="Verifikasi semua model terhadap index")
+    verify.add_argument("--full", action="store_true", help="Hash ulang walau file tidak berubah")
+    update = sub.add_parser("update", help="Catat ulang checksum model")
+    update.add_argument("models", nargs="+", help="Nama model (base) atau nama file (ggml-base.bin)")
+    args = parser.parse_args(argv)
+
+    store = ModelStore(args.model_dir)
+    files = sorted(n for n in os.listdir(args.model_dir) if n.startswith("ggml-") and n.endswith(".bin"))
+
+    if args.command == "status":
+        index = store._read_index()
+        for name in files:
+            entry = index.get(name)
+            size_mb = os.path.getsize(os.path.join(args.model_dir, name)) / 2**20
+            print(f"{name}: {size_mb:.0f} MB, sha1 {entry['sha1'] if entry else '(belum tercatat)'}")
+        return 0
+
+    if args.command == "update":
+        for model in args.models:
+            name = model if model.endswith(".bin") else f"ggml-{model}.bin"
+            print(f"{name}: {store.update(os.path.join(args.model_dir, name))}")
+        return 0
+
+    failed = 0
+    for name in files:
+        try:
+            print(f"{name}: OK ({store.verify(os.path.join(args.model_dir, name), full=args.full)})")
+        except ModelChecksumError as e:
+            failed += 1
+            print(f"{name}: GAGAL - {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+from audio_frontend import file_hash
+
+RESULT_CACHE_DIR = "./cache/results"
+RESULT_CACHE_MAX_MB = 256  # Batas total ukuran cache hasil; entri tertua dihapus lebih dulu
+
+
+class ResultCache:
+    """
+    Cache persisten hasil transkripsi file (teks, segmen, waktu proses).
+
+    Kunci entri adalah hash dari: isi file audio, isi file model ggml,
+    bahasa, dan parameter decoding. Mengganti teks referensi tidak
+    mengubah kunci, sehingga evaluasi ulang cukup menghitung WER.
+    Setiap entri disimpan sebagai satu file JSON; urutan LRU memakai
+    mtime file (diperbarui setiap hit).
+
+    `model_hash(path)` menghitung identitas file model; WhisperEngine
+    memakai `ModelStore.verify` agar checksum model hanya dihitung sekali.
+    """
+    def __init__(self, cache_dir=RESULT_CACHE_DIR, max_mb=RESULT_CACHE_MAX_MB, model_hash=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_mb * 2**20)
+        self.model_hash = model_hash or (lambda path: file_hash(path, cache_dir))
+        self._lock = threading.Lock()
+
+        # Statistik
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def make_key(self, audio_file_path, model_path, language, params):
+        """
+        Kunci cache. Hash file audio & model di-memo per (path, ukuran, mtime).
+        """
+        parts = {
+            "audio": file_hash(audio_file_path),
+            "model": self.model_hash(model_path),
+            "language": language,
+            "params": params,
+        }
+        return hashlib.sha1(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest(), parts
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """
+        Mengembalikan entri (dict) atau None.
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        try:
+            os.utime(path)  # Tandai baru dipakai (LRU)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return entry
+
+    def put(self, key, meta, text, process_time, segments, segment_table=None):
+        """
+        `segments` adalah daftar yang dikembalikan apa adanya saat hit (mis. per
+        jendela); `segment_table` (opsional) berisi segmen whisper lengkap
+        dari `SegmentTable.to_dicts()`.
+        """
+        entry = dict(meta)
+        entry.update({
+            "text": text,
+            "process_time": process_time,
+            "segments": segments,
+            "created": time.time(),
+        })
+        if segment_table is not None:
+            entry["segment_table"] = segment_table
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._entry_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def invalidate(self, audio_file_path=None, model_path=None):
+        """
+        Menghapus entri untuk file audio dan/atau model tertentu.
+        Tanpa argumen, seluruh cache dihapus. Mengembalikan jumlah entri yang dihapus.
+        """
+        audio_sha1 = file_hash(audio_file_path) if audio_file_path else None
+        model_sha1 = self.model_hash(model_path) if model_path else None
+
+        removed = 0
+        for path, _, _ in self._entries():
+            if audio_sha1 or model_sha1:
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        entry = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    continue
+                if audio_sha1 and entry.get("audio") != audio_sha1:
+                    continue
+                if model_sha1 and entry.get("model") != model_sha1:
+                    continue
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def clear(self):
+        return self.invalidate()
+
+    def stats(self):
+        entries = self._entries()
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(entries),
+                "size_mb": sum(size for _, size, _ in entries) / 2**20,
+                "max_mb": self.max_bytes / 2**20,
+            }
+
+    def _entries(self):
+        # Daftar (path, ukuran, mtime) semua entri
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json") or name == "index.json":
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        # Hapus yang paling lama tidak dipakai sampai di bawah batas
+        for path, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self.evictions += 1
@@ -0,0 +1,99 @@
+import threading
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Ring buffer audio float32 untuk satu producer dan satu consumer (SPSC).
+
+    Producer (callback PortAudio) hanya mengubah `_write_pos`, consumer
+    (thread inferensi) hanya mengubah `_read_pos`. Kedua indeks terus naik
+    dan baru di-modulo saat mengakses array, sehingga jumlah data yang
+    tersedia cukup dihitung dari selisihnya tanpa lock.
+    """
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        self._buffer = np.zeros(self.capacity, dtype=np.float32)  # Dialokasikan sekali di awal
+        self._write_pos = 0
+        self._read_pos = 0
+        self._data_event = threading.Event()
+
+        # Statistik
+        self.written_samples = 0
+        self.dropped_samples = 0
+        self.max_depth = 0
+
+    def available(self):
+        """
+        Jumlah sampel yang siap dibaca consumer.
+        """
+        return self._write_pos - self._read_pos
+
+    def free_space(self):
+        """
+        Jumlah sampel yang masih bisa ditulis producer.
+        """
+        return self.capacity - (self._write_pos - self._read_pos)
+
+    def write(self, data):
+        """
+        Menulis sampel dari sisi producer. Tidak pernah memblokir.
+
+        Jika buffer penuh, sampel yang tidak muat dibuang dan dihitung
+        di `dropped_samples`. Mengembalikan jumlah sampel yang ditulis.
+        """
+        n = len(data)
+        free = self.free_space()
+        if n > free:
+            self.dropped_samples += n - free
+            data = data[:free]
+            n = free
+        if n == 0:
+            return 0
+
+        start = self._write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        self._buffer[start:start + first] = data[:first]
+        if first < n:
+            self._buffer[:n - first] = data[first:]
+
+        # Indeks dinaikkan setelah data tersalin agar consumer tidak membaca data setengah jadi
+        self._write_pos += n
+        self.written_samples += n
+        depth = self._write_pos - self._read_pos
+        if depth > self.max_depth:
+            self.max_depth = depth
+        self._data_event.set()
+        return n
+
+    def read(self, n, timeout=None):
+        """
+        Membaca tepat `n` sampel dari sisi consumer.
+
+        Menunggu sampai data cukup; mengembalikan None jika `timeout`
+        (detik) habis lebih dulu.
+        """
+        n = int(n)
+        if n > self.capacity:
+            raise ValueError(f"Tidak bisa membaca {n} sampel dari buffer berkapasitas {self.capacity}")
+
+        while self.available() < n:
+            if not self._data_event.wait(timeout):
+                return None
+            self._data_event.clear()
+
+        start = self._read_pos % self.capacity
+        first = min(n, self.capacity - start)
+        out = np.empty(n, dtype=np.float32)
+        out[:first] = self._buffer[start:start + first]
+        if first < n:
+            out[first:] = self._buffer[:n - first]
+
+        self._read_pos += n
+        return out
+
+    def clear(self):
+        """
+        Membuang semua data yang belum dibaca (dipanggil dari sisi consumer).
+        """
+        self._read_pos = self._write_pos
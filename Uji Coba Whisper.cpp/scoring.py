@@ -0,0 +1,424 @@
+"""
+Penilaian WER/CER dengan normalisasi teks Bahasa Indonesia.
+
+Teks dinormalisasi dan ditokenisasi sekali (huruf kecil, tanda baca,
+angka -> kata, singkatan umum). S/D/I per kata diambil dari editops
+rapidfuzz, backtrace yang sama dengan jiwer, jadi pembagiannya identik.
+Tanpa rapidfuzz, token diubah menjadi ID integer dan edit distance
+dihitung dengan kernel NumPy yang memproses satu baris tabel sekaligus
+untuk banyak pasangan; WER tetap sama, tetapi pada seri pembagian S/D/I
+bisa berbeda dari jiwer.
+
+Validasi terhadap jiwer:
+    python scoring.py --validate text/text1.txt text/text2.txt --perturb 200
+"""
+import re
+import sys
+import time
+import random
+import argparse
+
+import numpy as np
+
+try:
+    import jiwer  # Hanya untuk validasi
+except ImportError:
+    jiwer = None
+
+try:
+    # Ikut terpasang bersama jiwer; jika ada, dipakai untuk S/D/I kata dan CER
+    from rapidfuzz.distance import Levenshtein as _rf_levenshtein
+except ImportError:
+    _rf_levenshtein = None
+
+BATCH_SIZE = 128  # Pasangan per batch kernel (diurutkan per panjang agar padding kecil)
+PAD_REF = -2  # ID padding referensi; tidak pernah sama dengan token apa pun
+PAD_HYP = -3
+
+# Singkatan umum dalam teks referensi/hasil berbahasa Indonesia
+ABBREVIATIONS = {
+    "yg": "yang",
+    "dgn": "dengan",
+    "dg": "dengan",
+    "tdk": "tidak",
+    "utk": "untuk",
+    "dll": "dan lain-lain",
+    "dsb": "dan sebagainya",
+    "sdh": "sudah",
+    "udh": "sudah",
+    "blm": "belum",
+    "krn": "karena",
+    "tsb": "tersebut",
+    "jg": "juga",
+    "spt": "seperti",
+    "thd": "terhadap",
+    "pd": "pada",
+    "sbg": "sebagai",
+    "kpd": "kepada",
+    "sy": "saya",
+    "org": "orang",
+    "tgl": "tanggal",
+}
+
+_DIGITS = ["nol", "satu", "dua", "tiga", "empat", "lima", "enam", "tujuh", "delapan", "sembilan"]
+_SCALES = [(10**12, "triliun"), (10**9, "miliar"), (10**6, "juta"), (1000, "ribu")]
+
+_THOUSANDS_RE = re.compile(r"(?<![\d.,])\d{1,3}(?:\.\d{3})+(?![\d.])")  # 1.000.000
+_DECIMAL_RE = re.compile(r"(\d+),(\d+)")  # 3,5
+_ORDINAL_RE = re.compile(r"\bke-(\d+)\b")  # ke-2
+_NUMBER_RE = re.compile(r"\d+")
+_PUNCT_RE = re.compile(r"[^\w\s-]|_")
+_LOOSE_HYPHEN_RE = re.compile(r"(?<!\w)-|-(?!\w)")  # Tanda hubung yang bukan di dalam kata
+
+
+def number_to_words(n):
+    """
+    Angka bulat non-negatif -> kata Bahasa Indonesia (1250 -> "seribu dua ratus lima puluh").
+    """
+    if n < 10:
+        return _DIGITS[n]
+    if n < 20:
+        if n == 10:
+            return "sepuluh"
+        if n == 11:
+            return "sebelas"
+        return f"{_DIGITS[n - 10]} belas"
+    if n < 100:
+        tens, rest = divmod(n, 10)
+        return f"{_DIGITS[tens]} puluh" + (f" {_DIGITS[rest]}" if rest else "")
+    if n < 1000:
+        hundreds, rest = divmod(n, 100)
+        head = "seratus" if hundreds == 1 else f"{_DIGITS[hundreds]} ratus"
+        return head + (f" {number_to_words(rest)}" if rest else "")
+    for scale, name in _SCALES:
+        if n >= scale:
+            count, rest = divmod(n, scale)
+            head = "seribu" if scale == 1000 and count == 1 else f"{number_to_words(count)} {name}"
+            return head + (f" {number_to_words(rest)}" if rest else "")
+    return " ".join(_DIGITS[int(d)] for d in str(n))  # Di atas triliun: dibaca per digit
+
+
+def normalize_text(text):
+    """
+    Normalisasi untuk penilaian: huruf kecil, angka -> kata, tanda baca dibuang.
+    Tanda hubung di dalam kata (anak-anak) dipertahankan.
+    """
+    text = text.lower()
+    text = _THOUSANDS_RE.sub(lambda m: m.group(0).replace(".", ""), text)
+    text = _DECIMAL_RE.sub(
+        lambda m: f"{m.group(1)} koma " + " ".join(_DIGITS[int(d)] for d in m.group(2)), text
+    )
+    text = text.replace("%", " persen")
+    text = _ORDINAL_RE.sub(lambda m: "ke" + number_to_words(int(m.group(1))), text)
+    text = _NUMBER_RE.sub(lambda m: f" {number_to_words(int(m.group(0)))} ", text)
+    text = _PUNCT_RE.sub(" ", text)
+    text = _LOOSE_HYPHEN_RE.sub(" ", text)
+    return " ".join(text.split())
+
+
+def tokenize(text, normalize=True):
+    """
+    Daftar kata; dengan `normalize` singkatan juga diperluas.
+    """
+    if not normalize:
+        return text.split()
+    words = []
+    for word in normalize_text(text).split():
+        expansion = ABBREVIATIONS.get(word)
+        if expansion is None:
+            words.append(word)
+        else:
+            words.extend(expansion.split())
+    return words
+
+
+class Vocabulary:
+    """
+    Interning token -> ID integer, dipakai bersama untuk semua pasangan satu batch.
+    """
+    def __init__(self):
+        self.ids = {}
+
+    def intern(self, token):
+        return self.ids.setdefault(token, len(self.ids))
+
+    def encode(self, tokens):
+        return np.fromiter((self.intern(t) for t in tokens), dtype=np.int64, count=len(tokens))
+
+    def lookup(self, token, default=-1):
+        # Tanpa menambah token baru (token yang tidak dikenal tidak pernah cocok)
+        return self.ids.get(token, default)
+
+
+def initial_row(n_cols, leading=()):
+    """
+    Baris 0 tabel edit distance (hipotesis kosong): (biaya, jumlah substitusi).
+    `leading` menambah dimensi batch di depan.
+    """
+    cols = np.broadcast_to(np.arange(n_cols, dtype=np.int32), tuple(leading) + (n_cols,))
+    return cols.copy(), np.zeros_like(cols)
+
+
+def advance_row(cost, sub, ref_ids, word_ids):
+    """
+    Satu baris tabel edit distance untuk satu kata hipotesis, di sumbu terakhir.
+
+    `cost/sub` adalah baris sebelumnya (kolom = posisi referensi), `ref_ids`
+    token referensi untuk kolom ke-1 dan seterusnya (satu lebih pendek),
+    `word_ids` token hipotesis (skalar atau satu per baris batch). Kolom
+    pertama hanya bisa dicapai lewat insersi. Pada seri, substitusi/match
+    diutamakan. Delesi (rantai kiri -> kanan) dihitung dengan cumulative-min:
+    new[j] = min_k(new[k] + j - k) = cummin(new - j) + j.
+
+    Hanya jumlah substitusi yang dilacak; D dan I diturunkan di `split_counts`.
+    """
+    word_ids = np.asarray(word_ids)
+    if word_ids.ndim:
+        word_ids = word_ids[..., None]
+
+    # Insersi (kolom sama)
+    new_cost = cost + 1
+    new_sub = sub.copy()
+
+    # Substitusi/match (kolom kiri)
+    if cost.shape[-1] > 1:
+        mismatch = (ref_ids != word_ids).astype(np.int32)
+        diag = cost[..., :-1] + mismatch
+        take = diag <= new_cost[..., 1:]
+        new_cost[..., 1:] = np.where(take, diag, new_cost[..., 1:])
+        new_sub[..., 1:] = np.where(take, sub[..., :-1] + mismatch, new_sub[..., 1:])
+
+    # Delesi; `src` = kolom asal rantai delesi (substitusi ikut dari sana)
+    cols = np.arange(cost.shape[-1], dtype=np.int32)
+    shifted = new_cost - cols
+    running = np.minimum.accumulate(shifted, axis=-1)
+    src = np.maximum.accumulate(np.where(shifted == running, cols, 0), axis=-1)
+    return running + cols, np.take_along_axis(new_sub, src, axis=-1)
+
+
+def split_counts(cost, substitutions, n_ref, n_hyp):
+    """
+    (S, D, I) dari biaya total dan S: S + D + I = biaya dan D - I = n_ref - n_hyp.
+    """
+    deletions = (cost - substitutions + n_ref - n_hyp) // 2
+    return substitutions, deletions, cost - substitutions - deletions
+
+
+def _align_group(refs, hyps):
+    # Satu batch berpadding: mengembalikan array biaya dan S per pasangan
+    n = np.array([len(r) for r in refs], dtype=np.int64)
+    m = np.array([len(h) for h in hyps], dtype=np.int64)
+    batch = len(refs)
+    n_max, m_max = int(n.max()), int(m.max())
+    ref_ids = np.full((batch, n_max), PAD_REF, dtype=np.int64)
+    hyp_ids = np.full((batch, max(m_max, 1)), PAD_HYP, dtype=np.int64)
+    for b, (r, h) in enumerate(zip(refs, hyps)):
+        ref_ids[b, :len(r)] = r
+        hyp_ids[b, :len(h)] = h
+
+    cost, sub = initial_row(n_max + 1, (batch,))
+    for i in range(m_max):
+        new_cost, new_sub = advance_row(cost, sub, ref_ids, hyp_ids[:, i])
+        active = (m > i)[:, None]  # Pasangan yang hipotesisnya sudah habis dibekukan
+        cost = np.where(active, new_cost, cost)
+        sub = np.where(active, new_sub, sub)
+
+    idx = n[:, None]
+    return np.take_along_axis(cost, idx, axis=-1)[:, 0], np.take_along_axis(sub, idx, axis=-1)[:, 0]
+
+
+def align_batch(refs, hyps, batch_size=BATCH_SIZE):
+    """
+    Jumlah (S, D, I) untuk setiap pasangan array ID (referensi, hipotesis).
+    """
+    results = [None] * len(refs)
+    # Urut per panjang agar pasangan dalam satu batch berukuran mirip
+    order = sorted(range(len(refs)), key=lambda k: (len(refs[k]), len(hyps[k])))
+    for start in range(0, len(order), batch_size):
+        group = order[start:start + batch_size]
+        cost, sub = _align_group([refs[k] for k in group], [hyps[k] for k in group])
+        for k, c, s in zip(group, cost, sub):
+            results[k] = split_counts(int(c), int(s), len(refs[k]), len(hyps[k]))
+    return results
+
+
+def editops_counts(ref_tokens, hyp_tokens):
+    """
+    (S, D, I) dari editops rapidfuzz, seperti jiwer.process_words.
+    """
+    counts = {"replace": 0, "delete": 0, "insert": 0}
+    for op in _rf_levenshtein.editops(ref_tokens, hyp_tokens):
+        counts[op.tag] += 1
+    return counts["replace"], counts["delete"], counts["insert"]
+
+
+def edit_distance(ref, hyp):
+    """
+    Edit distance saja (tanpa S/D/I) dengan algoritma bit-parallel Myers/Hyyrö:
+    satu kolom tabel disimpan sebagai bit integer Python, jadi satu token
+    hipotesis diproses dengan beberapa operasi bit pada seluruh kolom.
+    Dipakai untuk CER yang urutannya panjang jika rapidfuzz tidak ada.
+    """
+    n = len(ref)
+    if n == 0:
+        return len(hyp)
+    mask = (1 << n) - 1
+    high = 1 << (n - 1)
+    peq = {}
+    for pos, token in enumerate(ref):
+        peq[token] = peq.get(token, 0) | (1 << pos)
+
+    pv, mv, dist = mask, 0, n
+    for token in hyp:
+        eq = peq.get(token, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & mask) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & high:
+            dist += 1
+        elif mh & high:
+            dist -= 1
+        ph = ((ph << 1) | 1) & mask  # Baris atas tabel: D[0][j] = j
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return dist
+
+
+def measures_from_counts(n_ref, n_hyp, substitutions, deletions, insertions):
+    """
+    WER/MER/WIL dari jumlah S/D/I (nama field mengikuti jiwer.compute_measures).
+    """
+    hits = n_ref - substitutions - deletions
+    errors = substitutions + deletions + insertions
+    return {
+        "wer": errors / n_ref if n_ref else float(n_hyp > 0),
+        "mer": errors / (hits + errors) if hits + errors else 0.0,
+        "wil": 1.0 - (hits / n_ref) * (hits / n_hyp) if n_ref and n_hyp else 1.0,
+        "hits": hits,
+        "substitutions": substitutions,
+        "deletions": deletions,
+        "insertions": insertions,
+        "truth": n_ref,
+        "hypothesis": n_hyp,
+    }
+
+
+def score_batch(pairs, normalize=True, with_cer=True):
+    """
+    Menilai banyak pasangan (referensi, hipotesis) sekaligus.
+    Mengembalikan daftar dict seperti `score()`.
+    """
+    ref_tokens = [tokenize(ref, normalize) for ref, _ in pairs]
+    hyp_tokens = [tokenize(hyp, normalize) for _, hyp in pairs]
+    if _rf_levenshtein is not None:
+        word_counts = [editops_counts(r, h) for r, h in zip(ref_tokens, hyp_tokens)]
+    else:
+        vocab = Vocabulary()
+        word_counts = align_batch([vocab.encode(t) for t in ref_tokens], [vocab.encode(t) for t in hyp_tokens])
+
+    results = [
+        measures_from_counts(len(r), len(h), *counts)
+        for r, h, counts in zip(ref_tokens, hyp_tokens, word_counts)
+    ]
+    if with_cer:
+        for result, r, h in zip(results, ref_tokens, hyp_tokens):
+            ref_text, hyp_text = " ".join(r), " ".join(h)
+            if _rf_levenshtein is not None:
+                errors = _rf_levenshtein.distance(ref_text, hyp_text)
+            else:
+                errors = edit_distance(ref_text, hyp_text)
+            result["cer"] = errors / len(ref_text) if ref_text else float(errors > 0)
+    return results
+
+
+def score(reference, hypothesis, normalize=True, with_cer=True):
+    """
+    WER, MER, WIL, CER dan S/D/I satu pasangan.
+    """
+    return score_batch([(reference, hypothesis)], normalize, with_cer)[0]
+
+
+def perturb(words, rng, rate=0.15):
+    """
+    Hipotesis tiruan dari referensi dengan substitusi/delesi/insersi acak (untuk validasi).
+    """
+    out = []
+    for word in words:
+        r = rng.random()
+        if r < rate / 3:
+            continue
+        out.append(rng.choice(words) if r < 2 * rate / 3 else word)
+        if rng.random() < rate / 3:
+            out.append(rng.choice(words))
+    return " ".join(out)
+
+
+def validate(paths, n_perturb=100, seed=0):
+    """
+    Membandingkan WER, CER dan pembagian S/D/I dengan jiwer pada teks yang
+    sudah dinormalisasi. Pembagian S/D/I hanya diwajibkan sama jika
+    rapidfuzz terpasang (kernel NumPy memakai aturan seri sendiri).
+    """
+    if jiwer is None:
+        print("jiwer tidak terpasang; validasi dilewati.")
+        return False
+
+    texts = [" ".join(tokenize(open(p, encoding="utf-8").read())) for p in paths]
+    rng = random.Random(seed)
+    pairs = [(a, b) for a in texts for b in texts]  # Termasuk pasangan antar file
+    for text in texts:
+        words = text.split()
+        pairs.extend((text, perturb(words, rng)) for _ in range(n_perturb))
+
+    t_start = time.perf_counter()
+    ours = score_batch(pairs, normalize=False)
+    t_ours = time.perf_counter() - t_start
+
+    t_start = time.perf_counter()
+    theirs = [jiwer.compute_measures(ref, hyp) for ref, hyp in pairs]
+    cers = [jiwer.cer(ref, hyp) for ref, hyp in pairs]
+    t_jiwer = time.perf_counter() - t_start
+
+    wer_diff = max(abs(o["wer"] - t["wer"]) for o, t in zip(ours, theirs))
+    cer_diff = max(abs(o["cer"] - c) for o, c in zip(ours, cers))
+    split_diff = sum(
+        (o["substitutions"], o["deletions"], o["insertions"])
+        != (t["substitutions"], t["deletions"], t["insertions"])
+        for o, t in zip(ours, theirs)
+    )
+    print(f"{len(pairs)} pasangan: scoring.py {t_ours:.3f} dtk, jiwer {t_jiwer:.3f} dtk")
+    print(f"Selisih maks WER: {wer_diff:.2e}, CER: {cer_diff:.2e}")
+    print(f"Pembagian S/D/I berbeda pada {split_diff} pasangan")
+    split_ok = split_diff == 0 or _rf_levenshtein is None
+    return wer_diff < 1e-9 and cer_diff < 1e-9 and split_ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="WER/CER dengan normalisasi Bahasa Indonesia.")
+    parser.add_argument("reference", nargs="?", help="File teks referensi")
+    parser.add_argument("hypothesis", nargs="?", help="File teks hasil transkripsi")
+    parser.add_argument("--raw", action="store_true", help="Tanpa normalisasi")
+    parser.add_argument("--validate", nargs="+", metavar="FILE", help="Bandingkan dengan jiwer pada file-file ini")
+    parser.add_argument("--perturb", type=int, default=100, help="Jumlah hipotesis tiruan per file untuk validasi")
+    args = parser.parse_args(argv)
+
+    if args.validate:
+        return 0 if validate(args.validate, args.perturb) else 1
+    if not args.reference or not args.hypothesis:
+        parser.error("butuh file referensi dan hipotesis (atau --validate)")
+
+    with open(args.reference, encoding="utf-8") as f:
+        reference = f.read()
+    with open(args.hypothesis, encoding="utf-8") as f:
+        hypothesis = f.read()
+    result = score(reference, hypothesis, normalize=not args.raw)
+    print(f"WER: {result['wer'] * 100:.2f} %  CER: {result['cer'] * 100:.2f} %  "
+          f"S/D/I: {result['substitutions']}/{result['deletions']}/{result['insertions']}  "
+          f"({result['truth']} kata referensi)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+"""
+Metadata segmen hasil whisper (waktu, token, probabilitas) dalam bentuk ringkas.
+
+`SegmentTable` menyimpan segmen secara kolumnar di `array.array`
+(waktu float64, token int32, probabilitas float32) alih-alih satu dict per
+segmen, sehingga file berjam-jam tetap kecil di memori. Akses per segmen
+lewat `Segment`, view ber-`__slots__` yang tidak menyalin data.
+
+Waktu dalam detik dari awal audio. Field yang tidak dilaporkan binding
+(probabilitas/waktu token) disimpan sebagai NaN.
+
+Contoh:
+    table = SegmentTable()
+    table.add_result(model.transcribe(audio, language='id'))
+    table.segment_at(12.5).text
+    table.write("rekaman.srt")  # Format dari ekstensi: .srt, .vtt, .json
+
+    python segments.py rekaman.wav --model base -o rekaman.vtt
+"""
+import os
+import sys
+import json
+import math
+import argparse
+from array import array
+from bisect import bisect_right
+
+NAN = float("nan")
+
+
+def _format_timestamp(seconds, decimal_marker):
+    # 00:01:02,345 (SRT) atau 00:01:02.345 (VTT)
+    ms = int(round(seconds * 1000))
+    hours, ms = divmod(ms, 3_600_000)
+    minutes, ms = divmod(ms, 60_000)
+    secs, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{decimal_marker}{ms:03d}"
+
+
+def _optional(value):
+    # NaN -> None untuk JSON
+    return None if math.isnan(value) else value
+
+
+class Segment:
+    """
+    View satu baris SegmentTable.
+    """
+    __slots__ = ("_table", "index")
+
+    def __init__(self, table, index):
+        self._table = table
+        self.index = index
+
+    @property
+    def start(self):
+        return self._table._starts[self.index]
+
+    @property
+    def end(self):
+        return self._table._ends[self.index]
+
+    @property
+    def text(self):
+        return self._table._texts[self.index]
+
+    @property
+    def avg_logprob(self):
+        return self._table._avg_logprobs[self.index]
+
+    @property
+    def no_speech_prob(self):
+        return self._table._no_speech_probs[self.index]
+
+    def _token_slice(self):
+        offsets = self._table._token_offsets
+        return slice(offsets[self.index], offsets[self.index + 1])
+
+    @property
+    def token_ids(self):
+        return self._table._token_ids[self._token_slice()]
+
+    @property
+    def token_probs(self):
+        return self._table._token_probs[self._token_slice()]
+
+    @property
+    def token_times(self):
+        """
+        Pasangan (mulai, selesai) per token; NaN jika binding tidak memberi timestamp token.
+        """
+        part = self._token_slice()
+        return list(zip(self._table._token_starts[part], self._table._token_ends[part]))
+
+    @property
+    def mean_token_prob(self):
+        probs = [p for p in self.token_probs if not math.isnan(p)]
+        return sum(probs) / len(probs) if probs else NAN
+
+    def to_dict(self):
+        return self._table._row_dict(self.index)
+
+    def __repr__(self):
+        return f"Segment({self.start:.2f}-{self.end:.2f}, {self.text!r})"
+
+
+class SegmentTable:
+    """
+    Daftar segmen terurut waktu dengan indeks waktu -> segmen (bisect).
+
+    Segmen harus ditambahkan berurutan; `add_result(..., after=t)` membuang
+    segmen yang sudah tercakup sampai waktu `t` (overlap antar jendela) dan
+    memotong awal segmen yang masih beririsan dengan segmen terakhir.
+    """
+    def __init__(self):
+        self._starts = array("d")
+        self._ends = array("d")
+        self._texts = []
+        self._avg_logprobs = array("f")
+        self._no_speech_probs = array("f")
+        self._token_offsets = array("I", [0])  # Token segmen i: [offsets[i], offsets[i+1])
+        self._token_ids = array("i")
+        self._token_probs = array("f")
+        self._token_starts = array("f")
+        self._token_ends = array("f")
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("indeks segmen di luar jangkauan")
+        return Segment(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield Segment(self, index)
+
+    @property
+    def last_end(self):
+        return self._ends[-1] if self._ends else 0.0
+
+    def append(self, start, end, text, avg_logprob=NAN, no_speech_prob=NAN, tokens=()):
+        """
+        Menambah satu segmen. `tokens` berisi id token (int) atau dict
+        dengan kunci `id` dan opsional `p`, `t0`, `t1` (detik).
+        """
+        if self._starts and start < self._starts[-1]:
+            raise ValueError(f"Segmen harus berurutan waktu ({start:.2f} < {self._starts[-1]:.2f})")
+        self._starts.append(start)
+        self._ends.append(end)
+        self._texts.append(text)
+        self._avg_logprobs.append(NAN if avg_logprob is None else avg_logprob)
+        self._no_speech_probs.append(NAN if no_speech_prob is None else no_speech_prob)
+        for token in tokens:
+            if isinstance(token, dict):
+                self._token_ids.append(token["id"])
+                self._token_probs.append(token.get("p", NAN))
+                self._token_starts.append(token.get("t0", NAN))
+                self._token_ends.append(token.get("t1", NAN))
+            else:
+                self._token_ids.append(token)
+                self._token_probs.append(NAN)
+                self._token_starts.append(NAN)
+                self._token_ends.append(NAN)
+        self._token_offsets.append(len(self._token_ids))
+
+    def add_result(self, result, offset=0.0, after=None):
+        """
+        Menambah semua segmen dari hasil `model.transcribe`. `offset` (detik)
+        digeser ke waktu segmen dan token; segmen yang titik tengahnya
+        <= `after` dilewati. Segmen yang mulai sebelum akhir segmen terakhir
+        di tabel dipotong awalnya (atau dilewati jika tidak tersisa), jadi
+        `append` tidak pernah menolak hasil jendela yang overlap.
+        Mengembalikan jumlah segmen yang ditambahkan.
+        """
+        added = 0
+        for seg in result['segments']:
+            start = seg.get('start', 0.0) + offset
+            end = seg.get('end', seg.get('start', 0.0)) + offset
+            if after is not None and (start + end) / 2 <= after:
+                continue
+            if self._ends and start < self._ends[-1]:
+                start = self._ends[-1]
+                if end <= start:
+                    continue
+            tokens = seg.get('tokens') or ()
+            if offset and tokens and isinstance(tokens[0], dict):
+                tokens = [dict(t, t0=t['t0'] + offset, t1=t['t1'] + offset) if 't0' in t else t
+                          for t in tokens]
+            self.append(start, end, seg['text'], seg.get('avg_logprob'), seg.get('no_speech_prob'), tokens)
+            added += 1
+        return added
+
+    def index_at(self, t):
+        """
+        Indeks segmen yang mencakup waktu `t`, atau -1 (hening di antara segmen).
+        """
+        index = bisect_right(self._starts, t) - 1
+        if index >= 0 and t < self._ends[index]:
+            return index
+        return -1
+
+    def segment_at(self, t):
+        index = self.index_at(t)
+        return Segment(self, index) if index >= 0 else None
+
+    def between(self, t0, t1):
+        """
+        Segmen yang beririsan dengan rentang [t0, t1), untuk decode ulang bagian tertentu.
+        """
+        first = max(0, bisect_right(self._starts, t0) - 1)
+        last = bisect_right(self._starts, t1)
+        return [Segment(self, i) for i in range(first, last) if self._ends[i] > t0 and self._starts[i] < t1]
+
+    def text(self):
+        return " ".join(self._texts)
+
+    def nbytes(self):
+        """
+        Perkiraan ukuran data kolumnar (byte), tidak termasuk string teks.
+        """
+        columns = (self._starts, self._ends, self._avg_logprobs, self._no_speech_probs, self._token_offsets,
+                   self._token_ids, self._token_probs, self._token_starts, self._token_ends)
+        return sum(len(column) * column.itemsize for column in columns)
+
+    def _row_dict(self, index):
+        row = {
+            "start": self._starts[index],
+            "end": self._ends[index],
+            "text": self._texts[index],
+        }
+        for key, column in (("avg_logprob", self._avg_logprobs), ("no_speech_prob", self._no_speech_probs)):
+            if not math.isnan(column[index]):
+                row[key] = column[index]
+        first, last = self._token_offsets[index], self._token_offsets[index + 1]
+        if last > first:
+            row["tokens"] = [
+                {"id": self._token_ids[i], "p": _optional(self._token_probs[i]),
+                 "t0": _optional(self._token_starts[i]), "t1": _optional(self._token_ends[i])}
+                for i in range(first, last)
+            ]
+        return row
+
+    def to_dicts(self):
+        """
+        List dict per segmen (untuk JSON/cache hasil); kebalikan dari `from_dicts`.
+        """
+        return [self._row_dict(i) for i in range(len(self))]
+
+    @classmethod
+    def from_dicts(cls, rows):
+        table = cls()
+        for row in rows:
+            tokens = [{k: v for k, v in token.items() if v is not None} if isinstance(token, dict) else token
+                      for token in row.get("tokens") or ()]
+            table.append(row["start"], row["end"], row["text"], row.get("avg_logprob"),
+                         row.get("no_speech_prob"), tokens)
+        return table
+
+    def to_srt(self):
+        parts = []
+        for i in range(len(self)):
+            parts.append(f"{i + 1}\n{_format_timestamp(self._starts[i], ',')} --> "
+                         f"{_format_timestamp(self._ends[i], ',')}\n{self._texts[i].strip()}\n\n")
+        return "".join(parts)
+
+    def to_vtt(self):
+        parts = ["WEBVTT\n\n"]
+        for i in range(len(self)):
+            parts.append(f"{_format_timestamp(self._starts[i], '.')} --> "
+                         f"{_format_timestamp(self._ends[i], '.')}\n{self._texts[i].strip()}\n\n")
+        return "".join(parts)
+
+    def to_json(self):
+        return json.dumps({"text": self.text(), "segments": self.to_dicts()}, ensure_ascii=False)
+
+    def write(self, path, fmt=None):
+        """
+        Menulis ke file dalam format `fmt` ('srt', 'vtt', 'json'); default dari ekstensi.
+        """
+        fmt = (fmt or os.path.splitext(path)[1].lstrip(".")).lower()
+        writers = {"srt": self.to_srt, "vtt": self.to_vtt, "json": self.to_json}
+        if fmt not in writers:
+            raise ValueError(f"Format tidak dikenal: {fmt!r} (pilih srt, vtt atau json)")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(writers[fmt]())
+
+
+def main(argv=None):
+    from whisper_engine import WhisperEngine, AVAILABLE_MODELS
+
+    parser = argparse.ArgumentParser(description="Transkripsi file dan ekspor segmen ke SRT/VTT/JSON.")
+    parser.add_argument("audio")
+    parser.add_argument("--model", default="base", choices=AVAILABLE_MODELS)
+    parser.add_argument("-o", "--output", help="File keluaran (.srt, .vtt, .json); default <audio>.srt")
+    args = parser.parse_args(argv)
+
+    engine = WhisperEngine()
+    text, process_time, table = engine.transcribe_file(args.model, args.audio, return_segments=True)
+    if table is None:
+        print(text)
+        return 1
+    output = args.output or os.path.splitext(args.audio)[0] + ".srt"
+    table.write(output)
+    print(f"{len(table)} segmen ({process_time:.2f} dtk) ditulis ke {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+"""
+Rekaman biner sesi live dan replay deterministik tanpa mikrofon.
+
+Satu rekaman terdiri dari tiga file dengan nama dasar yang sama:
+    <nama>.f32   header 64 byte + sampel float32 mentah (append-only, bisa di-mmap)
+    <nama>.idx   satu record per callback capture: posisi sampel, waktu capture
+                 (detik sejak mulai rekam), jumlah frame, flag (overflow)
+    <nama>.json  metadata sesi (model, mode, waktu mulai, ringkasan)
+
+Callback audio hanya menyalin blok ke ring buffer milik recorder; thread
+penulis mengosongkannya ke disk setiap FLUSH_INTERVAL_SEC. Rekaman yang
+terputus (aplikasi crash) tetap bisa dibaca: ukuran diambil dari file.
+
+Contoh:
+    python session_recorder.py info sessions/live_20251017_101500
+    python session_recorder.py replay sessions/live_20251017_101500 --model base --speed 0 \\
+        --reference referensi.txt -o replay.json
+"""
+import os
+import sys
+import json
+import time
+import queue
+import struct
+import argparse
+import threading
+from collections import deque
+
+import numpy as np
+
+from ring_buffer import RingBuffer
+
+RECORDING_MAGIC = b"WHSPREC1"
+RECORDING_VERSION = 1
+HEADER_BYTES = 64
+HEADER_FORMAT = "<8sIIId"  # magic, versi, sample rate, channel, waktu mulai (epoch)
+INDEX_DTYPE = np.dtype([("sample", "<u8"), ("time", "<f8"), ("frames", "<u4"), ("flags", "<u4")])
+FLAG_OVERFLOW = 1
+
+RECORDER_RING_SEC = 10  # Audio yang boleh menumpuk sebelum ditulis ke disk
+FLUSH_INTERVAL_SEC = 0.25
+REPLAY_DRAIN_TIMEOUT_SEC = 60  # Batas tunggu antrian live habis setelah replay selesai
+
+
+def recording_base(path):
+    """
+    Nama dasar rekaman; menerima path dengan atau tanpa ekstensi .f32/.idx/.json.
+    """
+    root, ext = os.path.splitext(path)
+    return root if ext in (".f32", ".idx", ".json") else path
+
+
+class SessionRecorder:
+    """
+    Menulis audio capture apa adanya beserta waktu tiap callback.
+
+    `write()` dipanggil dari callback PortAudio: hanya menyalin ke ring
+    buffer yang dialokasikan di awal dan mencatat satu entri index.
+    """
+    def __init__(self, path, sample_rate=16000, ring_sec=RECORDER_RING_SEC, metadata=None):
+        self.base_path = recording_base(path)
+        self.sample_rate = sample_rate
+        self.metadata = dict(metadata or {})
+        self._ring = RingBuffer(int(ring_sec * sample_rate))
+        self._pending_index = deque()  # (sampel, waktu, frame, flag) yang belum ditulis
+        self._captured = 0  # Posisi sampel blok berikutnya di file .f32
+        self._t0 = None
+        self._audio_file = None
+        self._index_file = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+        # Statistik
+        self.blocks = 0
+        self.written_samples = 0
+
+    def start(self):
+        os.makedirs(os.path.dirname(self.base_path) or ".", exist_ok=True)
+        started = time.time()
+        self._audio_file = open(self.base_path + ".f32", "wb")
+        header = struct.pack(HEADER_FORMAT, RECORDING_MAGIC, RECORDING_VERSION, self.sample_rate, 1, started)
+        self._audio_file.write(header.ljust(HEADER_BYTES, b"\0"))
+        self._index_file = open(self.base_path + ".idx", "wb")
+        self.metadata.update({"sample_rate": self.sample_rate, "started": started})
+        self._write_metadata()
+
+        self._t0 = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="session-recorder", daemon=True)
+        self._thread.start()
+        print(f"Merekam sesi ke {self.base_path}.f32")
+
+    def write(self, block, overflow=False):
+        """
+        Dipanggil dari callback audio. Tidak memblokir dan tidak melakukan I/O.
+        """
+        if self._t0 is None:
+            return
+        t = time.perf_counter() - self._t0
+        n = self._ring.write(block)
+        # Entri tetap dicatat walau ring penuh (frame = sampel yang benar-benar tersimpan)
+        self._pending_index.append((self._captured, t, n, FLAG_OVERFLOW if overflow else 0))
+        self._captured += n
+        self.blocks += 1
+
+    def _run(self):
+        while not self._stop_event.wait(FLUSH_INTERVAL_SEC):
+            self._flush()
+
+    def _flush(self):
+        n = self._ring.available()
+        if n:
+            self._audio_file.write(self._ring.read(n).tobytes())
+            self.written_samples += n
+        entries = []
+        while self._pending_index:
+            entries.append(self._pending_index.popleft())
+        if entries:
+            self._index_file.write(np.array(entries, dtype=INDEX_DTYPE).tobytes())
+        self._audio_file.flush()
+        self._index_file.flush()
+
+    def _write_metadata(self):
+        tmp_path = f"{self.base_path}.json.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.metadata, f, indent=2)
+        os.replace(tmp_path, self.base_path + ".json")
+
+    def stop(self):
+        """
+        Menulis sisa audio dan menutup file. Aman dipanggil lebih dari sekali.
+        """
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self._flush()
+        self._audio_file.close()
+        self._index_file.close()
+        self.metadata.update({
+            "finished": time.time(),
+            "samples": self.written_samples,
+            "duration_sec": self.written_samples / self.sample_rate,
+            "blocks": self.blocks,
+            "dropped_sec": self._ring.dropped_samples / self.sample_rate,
+        })
+        self._write_metadata()
+        print(f"Rekaman sesi selesai: {self.written_samples / self.sample_rate:.1f} dtk, {self.blocks} blok.")
+
+    def get_stats(self):
+        return {
+            "recording_path": self.base_path,
+            "recorded_sec": self.written_samples / self.sample_rate,
+            "recording_dropped_sec": self._ring.dropped_samples / self.sample_rate,
+        }
+
+
+class Recording:
+    """
+    Rekaman yang dibuka read-only: `audio` dan `index` adalah np.memmap.
+    """
+    def __init__(self, path):
+        self.base_path = recording_base(path)
+        audio_path = self.base_path + ".f32"
+        with open(audio_path, "rb") as f:
+            header = f.read(HEADER_BYTES)
+        magic, version, self.sample_rate, self.channels, self.started = \
+            struct.unpack_from(HEADER_FORMAT, header)
+        if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+            raise ValueError(f"{audio_path} bukan rekaman sesi (versi {RECORDING_VERSION})")
+
+        # Ukuran dari file, bukan metadata: rekaman yang terputus tetap terbaca
+        n_samples = (os.path.getsize(audio_path) - HEADER_BYTES) // 4
+        self.audio = (np.memmap(audio_path, dtype="<f4", mode="r", offset=HEADER_BYTES, shape=(n_samples,))
+                      if n_samples else np.zeros(0, dtype=np.float32))
+        index_path = self.base_path + ".idx"
+        n_blocks = os.path.getsize(index_path) // INDEX_DTYPE.itemsize
+        index = (np.memmap(index_path, dtype=INDEX_DTYPE, mode="r", shape=(n_blocks,))
+                 if n_blocks else np.zeros(0, dtype=INDEX_DTYPE))
+        # Blok yang audionya belum sempat tertulis dibuang
+        self.index = index[index["sample"] + index["frames"] <= n_samples]
+
+        try:
+            with open(self.base_path + ".json", encoding="utf-8") as f:
+                self.metadata = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self.metadata = {}
+
+    @property
+    def duration(self):
+        return len(self.audio) / self.sample_rate
+
+    def info(self):
+        overflows = int(np.count_nonzero(self.index["flags"] & FLAG_OVERFLOW))
+        intervals = np.diff(self.index["time"]) if len(self.index) > 1 else np.zeros(0)
+        return {
+            "path": self.base_path,
+            "duration_sec": self.duration,
+            "blocks": len(self.index),
+            "overflow_blocks": overflows,
+            "callback_interval_ms_mean": float(intervals.mean() * 1000) if len(intervals) else None,
+            "callback_interval_ms_max": float(intervals.max() * 1000) if len(intervals) else None,
+            "metadata": self.metadata,
+        }
+
+
+def replay(recording_path, model_name, speed=0.0, mode="chunk", use_vad=False, reference=None, engine=None):
+    """
+    Memutar rekaman lewat LiveWorker dan mengembalikan teks, latensi dan
+    (jika ada referensi) WER. `speed=0` = secepat mungkin dengan backpressure.
+    """
+    from live_worker import LiveWorker
+    from audio_sources import replay_stream_factory
+    from benchmark import percentiles
+    from scoring import score
+
+    if engine is None:
+        from whisper_engine import WhisperEngine
+        engine = WhisperEngine(use_result_cache=False)
+    engine._load_model(model_name)
+    engine.warm_up(model_name)
+
+    ui_queue = queue.Queue()
+    factory = replay_stream_factory(recording_path, speed=speed)
+    worker = LiveWorker(engine, model_name, ui_queue, mode=mode, use_vad=use_vad, stream_factory=factory)
+    t_start = time.perf_counter()
+    worker.start()
+    while factory.last_stream is None or not factory.last_stream.finished.is_set():
+        time.sleep(0.05)
+        if not worker.is_alive():
+            break
+    deadline = time.perf_counter() + REPLAY_DRAIN_TIMEOUT_SEC
+    while worker.is_alive() and not worker.waiting_for_audio and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    worker.stop()
+    worker.join()
+    wall = time.perf_counter() - t_start
+
+    texts, delays, errors = [], [], []
+    partial = ""
+    while not ui_queue.empty():
+        item = ui_queue.get()
+        if not isinstance(item, dict):
+            errors.append(str(item))
+            continue
+        if item.get("text"):
+            texts.append(item["text"])
+        partial = item.get("partial") or ""
+        delays.append(item.get("delay", 0))
+    hypothesis = " ".join(texts + [partial]).strip()
+
+    result = {
+        "recording": recording_base(recording_path),
+        "model": model_name,
+        "mode": mode,
+        "vad": use_vad,
+        "speed": speed,
+        "wall_sec": wall,
+        "segment_latency": percentiles(delays),
+        "capture": worker.get_stats(),
+        "errors": errors,
+        "text": hypothesis,
+    }
+    if reference:
+        measures = score(reference, hypothesis)
+        result["wer"] = measures["wer"]
+        result["cer"] = measures.get("cer")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Info dan replay rekaman sesi live.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info", help="Ringkasan rekaman")
+    info.add_argument("recording")
+    play = sub.add_parser("replay", help="Putar ulang rekaman lewat pipeline live")
+    play.add_argument("recording")
+    play.add_argument("--model", default="base")
+    play.add_argument("--mode", default="chunk", choices=["chunk", "stream"])
+    play.add_argument("--vad", action="store_true")
+    play.add_argument("--speed", type=float, default=0.0,
+                      help="1.0 = real-time seperti saat direkam, 0 = secepat mungkin (deterministik)")
+    play.add_argument("--reference", help="File teks referensi untuk menghitung WER")
+    play.add_argument("-o", "--output", help="Tulis hasil sebagai JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        print(json.dumps(Recording(args.recording).info(), indent=2))
+        return 0
+
+    reference = None
+    if args.reference:
+        with open(args.reference, encoding="utf-8") as f:
+            reference = f.read().strip()
+    result = replay(args.recording, args.model, args.speed, args.mode, args.vad, reference)
+    latency = result["segment_latency"]
+    print(f"Replay '{args.model}' selesai dalam {result['wall_sec']:.2f} dtk, "
+          f"p95 latensi {latency.get('p95', 0):.2f} dtk"
+          + (f", WER {result['wer'] * 100:.2f} %" if "wer" in result else ""))
+    print(result["text"])
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+import re
+import numpy as np
+
+SAMPLE_RATE = 16000
+DEFAULT_WINDOW_SEC = 10  # Panjang jendela audio yang didekode setiap langkah
+DEFAULT_HOP_SEC = 1  # Jendela maju setiap 1 detik
+MAX_OVERLAP_WORDS = 30  # Jumlah kata committed terakhir yang dipakai untuk mencari overlap
+MAX_UNSTABLE_FRACTION = 0.5  # Ekor parsial yang lebih panjang dari ini (x jendela) di-commit paksa
+
+_NON_WORD_RE = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def normalize_word(word):
+    """
+    Bentuk kata untuk perbandingan: huruf kecil tanpa tanda baca.
+    """
+    return _NON_WORD_RE.sub("", word.lower())
+
+
+def find_overlap(previous_words, new_words, max_words=MAX_OVERLAP_WORDS):
+    """
+    Mencari bagian awal `new_words` yang sudah ada di akhir `previous_words`.
+
+    Mengembalikan indeks di `new_words` tempat teks baru dimulai (0 jika
+    tidak ada overlap). Overlap satu kata hanya diterima di awal `new_words`
+    agar kata umum seperti "yang" tidak memotong teks secara keliru.
+    """
+    prev = [normalize_word(w) for w in previous_words[-max_words:]]
+    new = [normalize_word(w) for w in new_words]
+
+    for k in range(min(len(prev), len(new)), 0, -1):
+        tail = prev[-k:]
+        last_start = 0 if k == 1 else len(new) - k
+        # Cari kemunculan terakhir agar teks committed tidak terulang
+        for j in range(last_start, -1, -1):
+            if new[j:j + k] == tail:
+                return j + k
+    return 0
+
+
+def common_prefix_length(words_a, words_b):
+    """
+    Panjang prefix yang sama dari dua daftar kata (setelah normalisasi).
+    """
+    n = 0
+    for a, b in zip(words_a, words_b):
+        if normalize_word(a) != normalize_word(b):
+            break
+        n += 1
+    return n
+
+
+class StreamingTranscriber:
+    """
+    Transkripsi streaming dengan jendela geser dan commit bertahap.
+
+    Setiap langkah mendekode `window_sec` audio terakhir. Kata yang sama
+    pada dua hipotesis berturut-turut (setelah bagian yang sudah committed)
+    di-commit sekali; sisanya dikirim sebagai hipotesis parsial yang
+    masih bisa berubah.
+
+    Overlap dicari dari teks. Posisi sampel akhir kata committed juga
+    dicatat (perkiraan dari porsi kata di jendela): jika teks committed
+    tidak dikenali lagi di hipotesis baru, kata sebelum posisi itu
+    dilewati. Ekor parsial dibatasi `MAX_UNSTABLE_FRACTION` jendela; jika
+    lebih panjang, ekor di-commit apa adanya agar posisi commit tidak
+    keluar dari jendela.
+    """
+    def __init__(self, whisper_engine, model_name,
+                 window_sec=DEFAULT_WINDOW_SEC, hop_sec=DEFAULT_HOP_SEC,
+                 sample_rate=SAMPLE_RATE):
+        if hop_sec <= 0 or hop_sec > window_sec:
+            raise ValueError("hop_sec harus > 0 dan tidak lebih besar dari window_sec")
+
+        self.engine = whisper_engine
+        self.model_name = model_name
+        self.sample_rate = sample_rate
+        self.window_samples = int(window_sec * sample_rate)
+        self.hop_samples = int(hop_sec * sample_rate)
+
+        self._window = np.zeros(self.window_samples, dtype=np.float32)
+        self._filled = 0
+        self.max_unstable_samples = int(self.window_samples * MAX_UNSTABLE_FRACTION)
+        self.committed_words = []
+        self._previous_tail = []
+        self._total_samples = 0  # Sampel yang sudah di-push sejak awal sesi
+        self._committed_sample = 0  # Perkiraan posisi akhir kata committed terakhir
+
+    def push(self, audio):
+        """
+        Menambahkan audio baru ke ujung jendela; audio tertua digeser keluar.
+        """
+        n = len(audio)
+        if n >= self.window_samples:
+            self._window[:] = audio[-self.window_samples:]
+        else:
+            self._window[:-n] = self._window[n:]
+            self._window[-n:] = audio
+        self._filled = min(self._filled + n, self.window_samples)
+        self._total_samples += n
+
+    def step(self):
+        """
+        Mendekode jendela saat ini.
+
+        Mengembalikan dict: `text` (kata yang baru di-commit), `partial`
+        (ekor yang belum stabil) dan `delay` (waktu inferensi).
+        """
+        if self._filled == 0:
+            return {"text": "", "partial": "", "delay": 0}
+
+        audio = self._window[-self._filled:]
+        text, delay = self.engine.transcribe_segment(self.model_name, audio)
+        if text.startswith("Error:"):
+            return {"text": text, "partial": "", "delay": delay}
+
+        words = text.split()
+        start = find_overlap(self.committed_words, words) if self.committed_words else 0
+        window_start = self._total_samples - self._filled
+        if start == 0 and self._committed_sample > window_start:
+            # Teks committed tidak dikenali lagi: lewati kata sebelum posisi commit terakhir
+            start = len(words) * (self._committed_sample - window_start) // self._filled
+        new_words = words[start:]
+
+        agreed = common_prefix_length(self._previous_tail, new_words)
+        if agreed == 0 and new_words and \
+                self._total_samples - self._committed_sample >= self.max_unstable_samples:
+            # Ekor tidak kunjung stabil: commit sebelum posisi commit keluar dari jendela
+            agreed = len(new_words)
+        commit = new_words[:agreed]
+        self._previous_tail = new_words[agreed:]
+        if commit:
+            self._committed_sample = self._total_samples - \
+                self._filled * len(self._previous_tail) // max(1, len(words))
+
+        self.committed_words.extend(commit)
+        # Hanya ekor committed yang dibutuhkan untuk mencari overlap
+        del self.committed_words[:-MAX_OVERLAP_WORDS]
+
+        return {
+            "text": " ".join(commit),
+            "partial": " ".join(self._previous_tail),
+            "delay": delay
+        }
+
+    def flush(self):
+        """
+        Meng-commit sisa hipotesis parsial (dipanggil saat sesi berakhir).
+        """
+        tail = self._previous_tail
+        self._previous_tail = []
+        self._committed_sample = self._total_samples
+        self.committed_words.extend(tail)
+        del self.committed_words[:-MAX_OVERLAP_WORDS]
+        return {"text": " ".join(tail), "partial": "", "delay": 0}
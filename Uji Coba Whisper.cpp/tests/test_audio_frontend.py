@@ -0,0 +1,102 @@
+import os
+import json
+
+import numpy as np
+import pytest
+
+import audio_frontend
+from audio_frontend import PolyphaseResampler
+
+signal = pytest.importorskip("scipy.signal")
+
+
+@pytest.mark.parametrize("orig_sr", [8000, 22050, 44100, 48000])
+def test_resampler_matches_resample_poly(orig_sr):
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal(orig_sr).astype(np.float32)  # 1 detik
+    resampler = PolyphaseResampler(orig_sr)
+
+    # Blok tidak rata untuk menguji state antar blok
+    blocks = [resampler.process(block) for block in np.array_split(x, [1000, 1001, 7000, 15000])]
+    out = np.concatenate(blocks + [resampler.flush()])
+
+    expected = signal.resample_poly(x.astype(np.float64), resampler.up, resampler.down)
+    assert len(out) == len(expected) == resampler.output_length(len(x))
+    np.testing.assert_allclose(out, expected, atol=1e-4)
+
+
+def test_same_rate_passthrough():
+    resampler = PolyphaseResampler(16000)
+    x = np.arange(10, dtype=np.float32)
+    np.testing.assert_array_equal(resampler.process(x), x)
+    assert len(resampler.flush()) == 0
+
+
+def _write_wav(path, seconds, seed=0, sample_rate=22050):
+    sf = pytest.importorskip("soundfile")
+    rng = np.random.default_rng(seed)
+    sf.write(path, 0.1 * rng.standard_normal(int(seconds * sample_rate)).astype(np.float32), sample_rate)
+    return str(path)
+
+
+def test_cached_blocks_match_streamed_decode(tmp_path):
+    wav = _write_wav(tmp_path / "a.wav", 12)
+    cache_dir = str(tmp_path / "cache")
+
+    first = np.concatenate(list(audio_frontend.iter_audio_blocks(wav, cache_dir=cache_dir)))
+    second = np.concatenate(list(audio_frontend.iter_audio_blocks(wav, cache_dir=cache_dir)))
+    decoded = np.concatenate(list(audio_frontend.iter_decoded_blocks(wav)))
+
+    np.testing.assert_array_equal(first, second)
+    np.testing.assert_allclose(first, decoded[:len(first)])
+    np.testing.assert_array_equal(audio_frontend.load_audio_16k(wav, cache_dir), first)
+
+
+def test_abandoned_decode_leaves_no_cache_file(tmp_path):
+    wav = _write_wav(tmp_path / "a.wav", 12)
+    cache_dir = str(tmp_path / "cache")
+
+    blocks = audio_frontend.iter_audio_blocks(wav, cache_dir=cache_dir)
+    next(blocks)
+    blocks.close()
+    assert os.listdir(cache_dir) == ["index.json"]
+
+
+def test_index_written_only_on_change_and_pruned(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    a = tmp_path / "a.bin"
+    b = tmp_path / "b.bin"
+    a.write_bytes(b"a")
+    b.write_bytes(b"b")
+
+    audio_frontend.file_hash(str(a), cache_dir)
+    index_path = os.path.join(cache_dir, "index.json")
+    os.utime(index_path, ns=(0, 0))
+    audio_frontend.file_hash(str(a), cache_dir)
+    assert os.stat(index_path).st_mtime_ns == 0  # Hit tidak menulis ulang index
+
+    os.remove(a)
+    audio_frontend.file_hash(str(b), cache_dir)
+    with open(index_path, encoding="utf-8") as f:
+        assert list(json.load(f)) == [os.path.abspath(b)]
+
+
+def test_audio_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    wavs = [_write_wav(tmp_path / f"{i}.wav", 10, seed=i) for i in range(3)]
+    # Satu file 10 detik = 160000 float32 = ~0.61 MB; batas muat dua file
+    monkeypatch.setattr(audio_frontend, "AUDIO_CACHE_MAX_MB", 1.5)
+
+    audio_frontend.load_audio_16k(wavs[0], cache_dir)
+    audio_frontend.load_audio_16k(wavs[1], cache_dir)
+    npy = sorted(os.path.join(cache_dir, n) for n in os.listdir(cache_dir) if n.endswith(".npy"))
+    for age, path in enumerate(npy):
+        os.utime(path, (age, age))
+    audio_frontend.load_audio_16k(wavs[0], cache_dir)  # Hit: jadi paling baru
+    audio_frontend.load_audio_16k(wavs[2], cache_dir)
+
+    cached = {n for n in os.listdir(cache_dir) if n.endswith(".npy")}
+    names = {f"{audio_frontend.file_hash(w, cache_dir)}_16000.npy" for w in wavs}
+    assert len(cached) == 2
+    assert f"{audio_frontend.file_hash(wavs[1], cache_dir)}_16000.npy" not in cached
+    assert cached < names
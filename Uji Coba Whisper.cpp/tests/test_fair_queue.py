@@ -0,0 +1,67 @@
+import threading
+
+from transcription_server import FairQueue
+
+
+def _drain(queue):
+    order = []
+    while True:
+        got = queue.get(timeout=0)
+        if got is None:
+            return order
+        order.append(got)
+        queue.task_done(got[0])
+
+
+def test_round_robin_between_streams():
+    queue = FairQueue()
+    for i in range(3):
+        queue.put("ramai", f"r{i}")
+    queue.put("sepi", "s0")
+
+    assert _drain(queue) == [("ramai", "r0"), ("sepi", "s0"), ("ramai", "r1"), ("ramai", "r2")]
+
+
+def test_one_item_in_flight_per_stream():
+    queue = FairQueue()
+    queue.put("a", 1)
+    queue.put("a", 2)
+
+    assert queue.get(timeout=0) == ("a", 1)
+    assert queue.get(timeout=0) is None  # Segmen berikutnya menunggu task_done
+    queue.task_done("a")
+    assert queue.get(timeout=0) == ("a", 2)
+
+
+def test_empty_queues_are_dropped():
+    queue = FairQueue()
+    for i in range(50):
+        queue.put(f"stream-{i}", i)
+    _drain(queue)
+
+    assert len(queue._queues) == 0
+    assert queue.pending() == 0
+    assert queue.wait_idle("stream-0", timeout=0)
+
+
+def test_backpressure_and_remove():
+    queue = FairQueue(max_pending=10, max_per_stream=2)
+    assert queue.put("a", 1) and queue.put("a", 2)
+    assert not queue.put("a", 3, timeout=0.01)  # Jatah per stream penuh
+
+    queue.remove("a")
+    assert queue.pending() == 0
+    assert "a" not in queue._queues
+    assert queue.put("a", 3, timeout=0)
+
+
+def test_close_wakes_blocked_get():
+    queue = FairQueue()
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(queue.get()))
+    waiter.start()
+    queue.close()
+    waiter.join(timeout=2)
+
+    assert results == [None]
+    assert not queue.put("a", 1)
@@ -0,0 +1,77 @@
+import threading
+import time
+
+import pytest
+
+from model_cache import ModelCache, MODEL_MEMORY_FACTOR
+
+
+@pytest.fixture
+def model_files(tmp_path):
+    # File ggml tiruan 100 byte per model (perkiraan RAM = 130 byte)
+    paths = {}
+    for name in ("tiny", "base", "small"):
+        path = tmp_path / f"ggml-{name}.bin"
+        path.write_bytes(b"\0" * 100)
+        paths[name] = str(path)
+    return paths
+
+
+def _cache(budget_models, loads):
+    def loader(path):
+        loads.append(path)
+        return object()
+    return ModelCache(loader, int(budget_models * 100 * MODEL_MEMORY_FACTOR))
+
+
+def test_lru_eviction_within_budget(model_files):
+    loads = []
+    cache = _cache(2, loads)
+    tiny = cache.get("tiny", model_files["tiny"])
+    cache.get("base", model_files["base"])
+    assert cache.get("tiny", model_files["tiny"]) is tiny  # tiny jadi yang terbaru dipakai
+
+    cache.get("small", model_files["small"])
+    assert "base" not in cache  # Paling lama tidak dipakai
+    assert "tiny" in cache and "small" in cache
+    assert cache.memory_used() <= cache.memory_budget_bytes
+    assert cache.stats()["evictions"] == 1
+    assert cache.hits == 1 and cache.misses == 3
+
+
+def test_model_larger_than_budget_is_still_loaded(model_files):
+    cache = _cache(0.5, [])
+    cache.get("tiny", model_files["tiny"])
+    cache.get("base", model_files["base"])
+    # Model baru tidak pernah dikeluarkan; yang lama dilepas
+    assert cache.stats()["loaded"] == ["base"]
+
+
+def test_concurrent_get_loads_once(model_files):
+    loads = []
+
+    def slow_loader(path):
+        time.sleep(0.05)
+        loads.append(path)
+        return object()
+
+    cache = ModelCache(slow_loader, 10**6)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("base", model_files["base"])))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(loads) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_evict_and_clear(model_files):
+    cache = _cache(3, [])
+    cache.get("tiny", model_files["tiny"])
+    cache.get("base", model_files["base"])
+    assert cache.evict("tiny") is True
+    assert cache.evict("tiny") is False
+    cache.clear()
+    assert len(cache) == 0 and cache.memory_used() == 0
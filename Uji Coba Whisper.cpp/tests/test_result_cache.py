@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from result_cache import ResultCache
+
+PARAMS = {"beam_size": 5, "temperature": 0.0}
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # file_hash menulis index ke ./cache/audio; jalankan di folder sementara
+    monkeypatch.chdir(tmp_path)
+    for name in ("a.wav", "b.wav"):
+        (tmp_path / name).write_bytes(name.encode() * 100)
+    return tmp_path
+
+
+def _cache(max_mb=1):
+    return ResultCache(cache_dir="results", max_mb=max_mb, model_hash=lambda path: f"model:{path}")
+
+
+def test_key_depends_on_audio_model_and_params(workdir):
+    cache = _cache()
+    key, meta = cache.make_key("a.wav", "ggml-tiny.bin", "id", PARAMS)
+
+    assert cache.make_key("a.wav", "ggml-tiny.bin", "id", dict(PARAMS))[0] == key
+    assert cache.make_key("b.wav", "ggml-tiny.bin", "id", PARAMS)[0] != key
+    assert cache.make_key("a.wav", "ggml-base.bin", "id", PARAMS)[0] != key
+    assert cache.make_key("a.wav", "ggml-tiny.bin", "id", {**PARAMS, "beam_size": 1})[0] != key
+    assert meta["model"] == "model:ggml-tiny.bin"
+
+    # Isi file berubah -> kunci berubah
+    (workdir / "a.wav").write_bytes(b"changed")
+    assert cache.make_key("a.wav", "ggml-tiny.bin", "id", PARAMS)[0] != key
+
+
+def test_put_get_round_trip(workdir):
+    cache = _cache()
+    key, meta = cache.make_key("a.wav", "ggml-tiny.bin", "id", PARAMS)
+    assert cache.get(key) is None
+
+    cache.put(key, meta, "halo dunia", 1.5, [{"text": "halo dunia"}],
+              segment_table=[{"t0": 0, "t1": 100, "text": "halo dunia"}])
+    entry = cache.get(key)
+    assert entry["text"] == "halo dunia"
+    assert entry["process_time"] == 1.5
+    assert entry["segments"] == [{"text": "halo dunia"}]
+    assert entry["segment_table"][0]["t1"] == 100
+    assert entry["audio"] == meta["audio"]
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_invalidate_by_audio_and_model(workdir):
+    cache = _cache()
+    for audio in ("a.wav", "b.wav"):
+        for model in ("ggml-tiny.bin", "ggml-base.bin"):
+            key, meta = cache.make_key(audio, model, "id", PARAMS)
+            cache.put(key, meta, audio, 1.0, [])
+
+    assert cache.invalidate(audio_file_path="a.wav") == 2
+    assert cache.invalidate(model_path="ggml-tiny.bin") == 1
+    assert cache.stats()["entries"] == 1
+    assert cache.clear() == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_evicts_least_recently_used(workdir):
+    cache = _cache(max_mb=2.5 * 1024 / 2**20)  # Muat dua entri ~1 KB
+    text = "x" * 1000
+    keys = []
+    for i, model in enumerate(("m0.bin", "m1.bin", "m2.bin")):
+        key, meta = cache.make_key("a.wav", model, "id", PARAMS)
+        cache.put(key, meta, text, 1.0, [])
+        os.utime(cache._entry_path(key), (i, i))
+        keys.append(key)
+        if i == 1:
+            cache.get(keys[0])  # Hit: m0 jadi paling baru
+
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is not None
+    assert cache.stats()["evictions"] == 1
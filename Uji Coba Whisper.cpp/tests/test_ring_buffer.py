@@ -0,0 +1,56 @@
+import threading
+
+import numpy as np
+import pytest
+
+from ring_buffer import RingBuffer
+
+
+def test_wraparound_preserves_order():
+    ring = RingBuffer(8)
+    source = np.arange(100, dtype=np.float32)
+    out = []
+    pos = 0
+    # Tulis 5, baca 3: posisi baca/tulis melewati batas array berkali-kali
+    while pos < len(source):
+        pos += ring.write(source[pos:pos + min(5, ring.free_space())])
+        out.append(ring.read(min(3, ring.available()), timeout=0))
+    out.append(ring.read(ring.available(), timeout=0))
+
+    np.testing.assert_array_equal(np.concatenate(out), source)
+    assert ring.dropped_samples == 0
+    assert ring.max_depth <= ring.capacity
+
+
+def test_full_buffer_drops_excess():
+    ring = RingBuffer(4)
+    assert ring.write(np.arange(6, dtype=np.float32)) == 4
+    assert ring.dropped_samples == 2
+    assert ring.free_space() == 0
+    np.testing.assert_array_equal(ring.read(4), [0, 1, 2, 3])
+
+
+def test_read_timeout_and_clear():
+    ring = RingBuffer(4)
+    ring.write(np.ones(2, dtype=np.float32))
+    assert ring.read(3, timeout=0.01) is None
+    ring.clear()
+    assert ring.available() == 0
+    with pytest.raises(ValueError):
+        ring.read(5)
+
+
+def test_reader_waits_for_producer():
+    ring = RingBuffer(16)
+    source = np.arange(1000, dtype=np.float32)
+
+    def produce():
+        pos = 0
+        while pos < len(source):
+            pos += ring.write(source[pos:pos + 7])
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    out = [ring.read(10, timeout=5) for _ in range(100)]
+    producer.join()
+    np.testing.assert_array_equal(np.concatenate(out), source)
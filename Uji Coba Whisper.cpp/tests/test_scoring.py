@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from scoring import score, score_batch, tokenize, number_to_words, perturb, align_batch, Vocabulary
+
+jiwer = pytest.importorskip("jiwer")
+
+REFERENCE = ("pada hari senin pemerintah mengumumkan anggaran baru untuk pendidikan dan kesehatan "
+             "yang akan mulai berlaku tahun depan menurut menteri keuangan anggaran itu naik")
+
+
+def _pairs(n=200, seed=0):
+    rng = random.Random(seed)
+    words = REFERENCE.split()
+    return [(REFERENCE, perturb(words, rng, rate=0.3)) for _ in range(n)]
+
+
+def test_split_matches_jiwer():
+    pairs = _pairs()
+    for ours, (ref, hyp) in zip(score_batch(pairs, normalize=False), pairs):
+        theirs = jiwer.process_words(ref, hyp)
+        for key in ("substitutions", "deletions", "insertions", "hits"):
+            assert ours[key] == getattr(theirs, key), (key, hyp)
+        assert ours["wer"] == pytest.approx(theirs.wer)
+        assert ours["cer"] == pytest.approx(jiwer.cer(ref, hyp))
+
+
+def test_numpy_kernel_total_matches_jiwer():
+    # Kernel cadangan (tanpa rapidfuzz): total kesalahan sama, pembagian boleh beda
+    pairs = _pairs(50, seed=1)
+    vocab = Vocabulary()
+    refs = [vocab.encode(ref.split()) for ref, _ in pairs]
+    hyps = [vocab.encode(hyp.split()) for _, hyp in pairs]
+    for counts, (ref, hyp) in zip(align_batch(refs, hyps, batch_size=16), pairs):
+        theirs = jiwer.process_words(ref, hyp)
+        assert sum(counts) == theirs.substitutions + theirs.deletions + theirs.insertions
+
+
+def test_normalization():
+    assert tokenize("Harganya Rp 1.250, yg ke-2!") == ["harganya", "rp", "seribu", "dua", "ratus",
+                                                      "lima", "puluh", "yang", "kedua"]
+    assert number_to_words(11) == "sebelas"
+    assert number_to_words(2_000_000) == "dua juta"
+    # "dr." bisa berarti dokter: tidak diperluas
+    assert tokenize("dr. Budi") == ["dr", "budi"]
+
+
+def test_empty_inputs():
+    assert score("", "")["wer"] == 0.0
+    assert score("", "halo")["wer"] == 1.0
+    assert score("halo dunia", "")["deletions"] == 2
@@ -0,0 +1,68 @@
+import pytest
+
+from segments import SegmentTable
+
+
+def _result(*segments):
+    return {"segments": [{"start": start, "end": end, "text": text} for start, end, text in segments]}
+
+
+def _add_window(table, result, offset):
+    # Sama seperti WhisperEngine.iter_transcribe_file
+    return table.add_result(result, offset=offset, after=table.last_end if len(table) else None)
+
+
+def test_overlapping_window_segment_is_clamped():
+    table = SegmentTable()
+    _add_window(table, _result((0.0, 28.0, "satu"), (28.0, 30.0, "dua")), 0.0)
+    # Jendela kedua mulai di detik 25: segmen absolut 26-35 beririsan dengan 28-30
+    added = _add_window(table, _result((1.0, 10.0, "tiga")), 25.0)
+
+    assert added == 1
+    assert [(s.start, s.end, s.text) for s in table] == [
+        (0.0, 28.0, "satu"), (28.0, 30.0, "dua"), (30.0, 35.0, "tiga")]
+
+
+def test_segment_inside_previous_is_dropped():
+    table = SegmentTable()
+    _add_window(table, _result((0.0, 30.0, "satu")), 0.0)
+    # Titik tengah sesudah 'after' tetapi seluruhnya sudah tercakup
+    assert table.add_result(_result((2.0, 4.0, "ulang")), offset=25.0, after=26.0) == 0
+    assert len(table) == 1
+
+
+def test_many_overlapping_windows_stay_ordered():
+    table = SegmentTable()
+    for window in range(20):
+        offset = window * 25.0
+        _add_window(table, _result((0.0, 12.0, "a"), (11.0, 29.5, "b"), (29.0, 30.0, "c")), offset)
+
+    starts = [s.start for s in table]
+    assert starts == sorted(starts)
+    assert all(s.end > s.start for s in table)
+    assert all(prev.end <= cur.start for prev, cur in zip(table, list(table)[1:]))
+
+
+def test_append_still_rejects_out_of_order():
+    table = SegmentTable()
+    table.append(5.0, 6.0, "x")
+    with pytest.raises(ValueError):
+        table.append(4.0, 7.0, "y")
+
+
+def test_time_index_and_round_trip():
+    table = SegmentTable()
+    table.add_result({"segments": [
+        {"start": 0.0, "end": 1.5, "text": "halo", "avg_logprob": -0.25,
+         "tokens": [{"id": 7, "p": 0.5, "t0": 0.0, "t1": 0.5}]},
+        {"start": 2.0, "end": 3.0, "text": "dunia"},
+    ]}, offset=10.0)
+
+    assert table.segment_at(10.5).text == "halo"
+    assert table.segment_at(11.8) is None  # Hening di antara segmen
+    assert table[0].token_times == [(10.0, 10.5)]
+    assert [s.text for s in table.between(11.0, 12.5)] == ["halo", "dunia"]
+
+    copy = SegmentTable.from_dicts(table.to_dicts())
+    assert copy.to_dicts() == table.to_dicts()
+    assert "00:00:10,000 --> 00:00:11,500" in copy.to_srt()
@@ -0,0 +1,77 @@
+import numpy as np
+
+from streaming import find_overlap, StreamingTranscriber, SAMPLE_RATE
+
+
+def test_overlap_found_after_punctuation_and_case():
+    previous = "saya pergi ke pasar.".split()
+    new = "Pasar pagi ini ramai".split()
+    assert find_overlap(previous, new) == 1
+
+
+def test_multi_word_overlap():
+    previous = "hari ini kita akan membahas".split()
+    new = "kita akan membahas anggaran tahun depan".split()
+    assert find_overlap(previous, new) == 3
+
+
+def test_no_overlap():
+    assert find_overlap("satu dua tiga".split(), "empat lima".split()) == 0
+    assert find_overlap([], "empat lima".split()) == 0
+
+
+def test_single_common_word_only_at_start():
+    # "yang" di tengah jendela baru tidak boleh memotong teks
+    previous = "buku yang".split()
+    new = "dibaca oleh orang yang".split()
+    assert find_overlap(previous, new) == 0
+
+
+def test_last_occurrence_is_used():
+    previous = "a b".split()
+    new = "a b c a b d".split()
+    assert find_overlap(previous, new) == 5
+
+
+class _SecondsEngine:
+    """
+    Engine tiruan: setiap detik audio berisi satu nilai konstan (indeks detik + 1)
+    yang "ditranskripsi" menjadi satu kata. Panggilan `unstable` memberi kata
+    yang berbeda setiap kali untuk detik >= `unstable_from`.
+    """
+    def __init__(self, unstable=range(0), unstable_from=0):
+        self.calls = 0
+        self.unstable = unstable
+        self.unstable_from = unstable_from
+
+    def transcribe_segment(self, model_name, audio):
+        call = self.calls
+        self.calls += 1
+        words = []
+        for value in audio[::SAMPLE_RATE]:
+            second = int(value) - 1
+            if second < 0:
+                continue
+            unstable = call in self.unstable and second >= self.unstable_from
+            words.append(f"w{second}x{call}" if unstable else f"w{second}")
+        return " ".join(words), 0.0
+
+
+def _run(engine, seconds=40):
+    stream = StreamingTranscriber(engine, "tiny", window_sec=10, hop_sec=1)
+    committed = []
+    for second in range(seconds):
+        stream.push(np.full(SAMPLE_RATE, second + 1, dtype=np.float32))
+        committed += stream.step()["text"].split()
+    committed += stream.flush()["text"].split()
+    return [int(word[1:].split("x")[0]) for word in committed]
+
+
+def test_stable_stream_commits_every_word_once():
+    assert _run(_SecondsEngine()) == list(range(40))
+
+
+def test_long_unstable_tail_neither_repeats_nor_drops_words():
+    # Ekor berubah terus selama 15 langkah: kata committed terakhir akan keluar dari jendela
+    engine = _SecondsEngine(unstable=range(3, 18), unstable_from=3)
+    assert _run(engine) == list(range(40))
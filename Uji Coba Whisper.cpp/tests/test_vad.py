@@ -0,0 +1,65 @@
+import numpy as np
+
+from vad import VoiceActivityDetector, SpeechSegmenter, SAMPLE_RATE
+
+
+def _tone(sec, amplitude=0.3, freq=220.0):
+    t = np.arange(int(sec * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def _silence(sec):
+    return np.zeros(int(sec * SAMPLE_RATE), dtype=np.float32)
+
+
+def _feed(segmenter, audio, block=1234):
+    segments = []
+    for start in range(0, len(audio), block):
+        segments.extend(segmenter.feed(audio[start:start + block]))
+    return segments
+
+
+def test_vad_flags_tone_not_silence():
+    vad = VoiceActivityDetector()
+    _, flags = vad.process(_silence(1.0))
+    assert not flags.any()
+    _, flags = vad.process(_tone(1.0))
+    assert flags.all()
+
+
+def test_hangover_carries_across_blocks():
+    vad = VoiceActivityDetector(hangover_ms=300)
+    vad.process(_tone(0.48))  # Tepat 16 frame, tanpa sisa
+    _, flags = vad.process(_silence(0.6))
+    # 300 ms / 30 ms = 10 frame hangover setelah speech
+    assert flags[:10].all() and not flags[10:].any()
+
+
+def test_segmenter_cuts_at_speech_boundaries():
+    segmenter = SpeechSegmenter()
+    audio = np.concatenate([_silence(1.0), _tone(1.0), _silence(1.0), _tone(2.0), _silence(1.0)])
+    segments = _feed(segmenter, audio)
+
+    assert len(segments) == 2
+    # Pre-roll + speech + hangover
+    assert 1.0 < len(segments[0]) / SAMPLE_RATE < 1.6
+    assert 2.0 < len(segments[1]) / SAMPLE_RATE < 2.6
+    assert segmenter.skipped_fraction() > 0.2
+
+
+def test_segmenter_limits_segment_length():
+    segmenter = SpeechSegmenter(max_segment_sec=2)
+    segments = _feed(segmenter, _tone(5.0)) + segmenter.flush()
+    assert [round(len(s) / SAMPLE_RATE, 1) for s in segments[:2]] == [2.0, 2.0]
+    assert sum(len(s) for s in segments) >= int(4.9 * SAMPLE_RATE)
+
+
+def test_flush_emits_open_speech_and_drops_short_blips():
+    segmenter = SpeechSegmenter()
+    assert _feed(segmenter, np.concatenate([_silence(0.5), _tone(1.0)])) == []
+    segments = segmenter.flush()
+    assert len(segments) == 1 and len(segments[0]) >= SAMPLE_RATE
+
+    _feed(segmenter, _tone(0.05))
+    assert segmenter.flush() == []
+    assert segmenter.segments_discarded == 1
@@ -0,0 +1,273 @@
+"""
+Instrumentasi ringan: span (durasi tahap), counter, dan sampling profiler.
+
+Saat nonaktif (default), `span()` mengembalikan objek no-op bersama dan
+`count()` langsung kembali, jadi titik instrumentasi di hot path hanya
+berbiaya satu pemanggilan fungsi. Aktifkan lewat `enable()` atau
+environment variable WHISPER_TRACE=1.
+
+Pemakaian:
+    import tracing
+    with tracing.span("engine.transcribe", model="base"):
+        ...
+    tracing.count("capture.overflow")
+    tracing.export_chrome_trace("trace.json")  # Buka di chrome://tracing atau Perfetto
+
+Sampling profiler (opsional) mengambil stack semua thread secara berkala
+dan menulisnya dalam format "collapsed stack" untuk flamegraph.
+"""
+import os
+import sys
+import json
+import time
+import threading
+from collections import deque
+
+import numpy as np
+
+MAX_EVENTS = 200000  # Event span terakhir yang disimpan untuk ekspor trace
+STATS_WINDOW = 512  # Durasi terakhir per span untuk p95 di panel metrik
+SAMPLE_INTERVAL_SEC = 0.005  # Interval sampling profiler (5 ms)
+
+_enabled = False
+_t0 = time.perf_counter_ns()
+_events = deque(maxlen=MAX_EVENTS)  # (nama, mulai_ns, durasi_ns, thread_id, args)
+_durations = {}  # nama -> deque durasi (detik)
+_span_counts = {}  # nama -> jumlah total
+_counters = {}  # nama -> nilai
+_thread_names = {}
+_sampler = None
+
+
+class _NullSpan:
+    """
+    Span no-op yang dipakai saat tracing nonaktif.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter_ns() - self.start
+        tid = threading.get_ident()
+        if tid not in _thread_names:
+            _thread_names[tid] = threading.current_thread().name
+        _events.append((self.name, self.start, duration, tid, self.args))
+        window = _durations.get(self.name)
+        if window is None:
+            window = _durations.setdefault(self.name, deque(maxlen=STATS_WINDOW))
+        window.append(duration / 1e9)
+        _span_counts[self.name] = _span_counts.get(self.name, 0) + 1
+        return False
+
+    def set(self, **args):
+        """
+        Menambah atribut span setelah dibuka (mis. jumlah kata hasil).
+        """
+        if self.args is None:
+            self.args = args
+        else:
+            self.args.update(args)
+
+
+def span(name, **args):
+    """
+    Context manager yang mengukur durasi satu tahap.
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, args or None)
+
+
+def count(name, value=1):
+    """
+    Menambah counter (mis. overflow, pesan UI).
+    """
+    if _enabled:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def reset():
+    """
+    Mengosongkan semua event, statistik dan counter.
+    """
+    global _t0
+    _t0 = time.perf_counter_ns()
+    _events.clear()
+    _durations.clear()
+    _span_counts.clear()
+    _counters.clear()
+
+
+def metrics():
+    """
+    Ringkasan per span (jumlah, rata-rata, p95, maks dalam detik) dan nilai counter.
+    """
+    spans = {}
+    for name, window in list(_durations.items()):
+        values = np.fromiter(list(window), dtype=np.float64)
+        if not len(values):
+            continue
+        spans[name] = {
+            "count": _span_counts.get(name, len(values)),
+            "mean": float(values.mean()),
+            "p95": float(np.percentile(values, 95)),
+            "max": float(values.max()),
+        }
+    return {"spans": spans, "counters": dict(_counters)}
+
+
+def format_metrics():
+    """
+    Tabel teks untuk panel metrik di UI.
+    """
+    data = metrics()
+    lines = [f"{'Span':<32}{'Jumlah':>8}{'Rata2 ms':>11}{'p95 ms':>10}{'Maks ms':>10}"]
+    for name, stats in sorted(data["spans"].items()):
+        lines.append(f"{name:<32}{stats['count']:>8}{stats['mean'] * 1000:>11.2f}"
+                     f"{stats['p95'] * 1000:>10.2f}{stats['max'] * 1000:>10.2f}")
+    if data["counters"]:
+        lines.append("")
+        lines.append("Counter")
+        for name, value in sorted(data["counters"].items()):
+            lines.append(f"  {name:<30}{value:>10}")
+    return "\n".join(lines)
+
+
+def export_chrome_trace(path):
+    """
+    Menulis event ke format Chrome Trace Event (chrome://tracing, Perfetto).
+    Mengembalikan jumlah event yang ditulis.
+    """
+    pid = os.getpid()
+    trace = [
+        {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+        for tid, name in list(_thread_names.items())
+    ]
+    for name, start, duration, tid, args in list(_events):
+        event = {
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "X",
+            "ts": (start - _t0) / 1000,
+            "dur": duration / 1000,
+            "pid": pid,
+            "tid": tid,
+        }
+        if args:
+            event["args"] = args
+        trace.append(event)
+    now = (time.perf_counter_ns() - _t0) / 1000
+    for name, value in list(_counters.items()):
+        trace.append({"name": name, "ph": "C", "ts": now, "pid": pid, "args": {"value": value}})
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+    return len(trace)
+
+
+class SamplingProfiler(threading.Thread):
+    """
+    Mengambil stack semua thread setiap `interval` detik lewat
+    sys._current_frames() dan menghitung kemunculan tiap stack.
+    """
+    def __init__(self, interval=SAMPLE_INTERVAL_SEC):
+        super().__init__(name="sampling-profiler", daemon=True)
+        self.interval = interval
+        self.stacks = {}  # "thread;f1;f2;..." -> jumlah sampel
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for tid, frame in sys._current_frames().items():
+                if tid == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(names.get(tid, str(tid)))
+                key = ";".join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+
+    def export(self, path):
+        """
+        Format collapsed stack (flamegraph.pl / speedscope).
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, n in sorted(list(self.stacks.items()), key=lambda item: -item[1]):
+                f.write(f"{stack} {n}\n")
+
+
+def start_sampler(interval=SAMPLE_INTERVAL_SEC):
+    """
+    Memulai sampling profiler (sekali per proses).
+    """
+    global _sampler
+    if _sampler is None or not _sampler.is_alive():
+        _sampler = SamplingProfiler(interval)
+        _sampler.start()
+    return _sampler
+
+
+def stop_sampler(path=None):
+    """
+    Menghentikan sampling profiler; jika `path` diberikan, hasil ditulis ke file.
+    """
+    global _sampler
+    sampler, _sampler = _sampler, None
+    if sampler is None:
+        return None
+    sampler.stop()
+    sampler.join()
+    if path:
+        sampler.export(path)
+    return sampler
+
+
+if os.environ.get("WHISPER_TRACE", "0") != "0":
+    enable()
@@ -0,0 +1,509 @@
+"""
+Server transkripsi multi-stream: beberapa mikrofon/ruangan dilayani oleh
+satu WhisperEngine, sehingga setiap ukuran model hanya dimuat sekali.
+
+Protokol (TCP, cukup untuk localhost / LAN):
+  1. Klien mengirim satu baris JSON header, misalnya
+     {"stream_id": "ruang-1", "model": "base", "vad": true}
+  2. Lalu audio PCM int16 little-endian, 16kHz mono, terus-menerus.
+  3. Klien menutup sisi tulis (shutdown SHUT_WR) saat selesai.
+Server membalas baris-baris JSON: {"type": "segment", ...} per segmen,
+{"type": "error", ...} jika gagal, dan {"type": "end", "stats": ...}.
+
+Segmen dari semua stream masuk ke FairQueue (round-robin per stream) lalu
+diproses oleh sejumlah worker inferensi tetap. Jika antrian penuh, thread
+pembaca stream berhenti membaca socket, sehingga klien tertahan oleh TCP
+(backpressure) alih-alih memori server yang membengkak.
+
+Contoh:
+    python transcription_server.py serve --models tiny base --workers 2
+    python transcription_server.py send rekaman.wav --stream-id ruang-1 --model base
+"""
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import socketserver
+from collections import deque, OrderedDict
+
+import numpy as np
+
+from vad import SpeechSegmenter
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 2
+SAMPLE_RATE = 16000
+CHUNK_SEC = 4  # Panjang potongan jika VAD dimatikan
+READ_BLOCK_SAMPLES = 4000  # Sampel per pembacaan socket (250 ms)
+
+MAX_PENDING_SEGMENTS = 32  # Total segmen antri (semua stream) sebelum backpressure
+MAX_PENDING_PER_STREAM = 8  # Satu stream tidak boleh memenuhi antrian sendirian
+LATENCY_SLO_SEC = 3.0  # Target p95 latensi (akhir segmen diterima -> hasil dikirim)
+LATENCY_WINDOW = 200  # Jumlah latensi terakhir untuk menghitung p95
+
+
+class FairQueue:
+    """
+    Antrian segmen yang adil antar stream.
+
+    Setiap stream punya deque sendiri dan `get()` bergiliran (round-robin)
+    antar stream, jadi stream yang ramai tidak bisa membuat stream lain
+    kelaparan. Satu stream hanya boleh punya satu segmen yang sedang
+    diproses, sehingga hasilnya selalu terkirim berurutan.
+    """
+    def __init__(self, max_pending=MAX_PENDING_SEGMENTS, max_per_stream=MAX_PENDING_PER_STREAM):
+        self.max_pending = max_pending
+        self.max_per_stream = max_per_stream
+        self._queues = OrderedDict()  # stream_id -> deque; urutan = giliran
+        self._in_flight = set()
+        self._pending = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def put(self, stream_id, item, timeout=None):
+        """
+        Menambah segmen; memblokir selama antrian penuh (backpressure).
+        Mengembalikan False jika timeout atau antrian ditutup.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._closed and (
+                self._pending >= self.max_pending
+                or len(self._queues.get(stream_id, ())) >= self.max_per_stream
+            ):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            if self._closed:
+                return False
+            self._queues.setdefault(stream_id, deque()).append(item)
+            self._pending += 1
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        """
+        Mengambil (stream_id, item) berikutnya secara round-robin, atau None.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                for stream_id, items in self._queues.items():
+                    if items and stream_id not in self._in_flight:
+                        # Stream ini pindah ke akhir giliran
+                        self._queues.move_to_end(stream_id)
+                        self._in_flight.add(stream_id)
+                        self._pending -= 1
+                        item = items.popleft()
+                        if not items:
+                            # Deque kosong dibuang; put() berikutnya membuatnya lagi
+                            del self._queues[stream_id]
+                        self._cond.notify_all()
+                        return stream_id, item
+                if self._closed:
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def task_done(self, stream_id):
+        with self._cond:
+            self._in_flight.discard(stream_id)
+            self._cond.notify_all()
+
+    def wait_idle(self, stream_id, timeout=None):
+        """
+        Menunggu sampai semua segmen stream ini selesai diproses.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queues.get(stream_id) or stream_id in self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def remove(self, stream_id):
+        """
+        Membuang segmen stream yang belum diproses (misalnya klien terputus).
+        """
+        with self._cond:
+            items = self._queues.pop(stream_id, None)
+            if items:
+                self._pending -= len(items)
+            self._cond.notify_all()
+
+    def pending(self):
+        with self._cond:
+            return self._pending
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class StreamSession:
+    """
+    Status satu stream: koneksi, segmenter, dan statistik latensi/SLO.
+    """
+    def __init__(self, stream_id, model_name, connection, use_vad=True, slo_sec=LATENCY_SLO_SEC):
+        self.stream_id = stream_id
+        self.model_name = model_name
+        self.connection = connection
+        self.slo_sec = slo_sec
+        self.segmenter = SpeechSegmenter() if use_vad else None
+        self._chunk = []  # Potongan tanpa VAD
+        self._chunk_samples = 0
+        self._send_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        # Statistik
+        self.received_samples = 0
+        self.segments_done = 0
+        self.segments_failed = 0
+        self.slo_violations = 0
+        self.backpressure_sec = 0.0  # Total waktu pembaca tertahan karena antrian penuh
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def feed(self, audio):
+        """
+        Memasukkan audio baru; mengembalikan daftar segmen yang siap ditranskripsi.
+        """
+        self.received_samples += len(audio)
+        if self.segmenter is not None:
+            return self.segmenter.feed(audio)
+
+        self._chunk.append(audio)
+        self._chunk_samples += len(audio)
+        if self._chunk_samples < CHUNK_SEC * SAMPLE_RATE:
+            return []
+        return self._take_chunk()
+
+    def flush(self):
+        if self.segmenter is not None:
+            return self.segmenter.flush()
+        return self._take_chunk() if self._chunk_samples else []
+
+    def _take_chunk(self):
+        segment = np.concatenate(self._chunk)
+        self._chunk = []
+        self._chunk_samples = 0
+        return [segment]
+
+    def send(self, message):
+        """
+        Mengirim satu baris JSON ke klien. Mengembalikan False jika koneksi putus.
+        """
+        data = (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._send_lock:
+            try:
+                self.connection.sendall(data)
+                return True
+            except OSError:
+                return False
+
+    def record_latency(self, latency):
+        with self._stats_lock:
+            self.latencies.append(latency)
+            self.segments_done += 1
+            if latency > self.slo_sec:
+                self.slo_violations += 1
+
+    def get_stats(self):
+        with self._stats_lock:
+            latencies = list(self.latencies)
+            done = self.segments_done
+            violations = self.slo_violations
+        p95 = float(np.percentile(latencies, 95)) if latencies else 0.0
+        return {
+            "stream_id": self.stream_id,
+            "model": self.model_name,
+            "received_sec": self.received_samples / SAMPLE_RATE,
+            "segments_done": done,
+            "segments_failed": self.segments_failed,
+            "latency_p95_sec": p95,
+            "latency_max_sec": max(latencies) if latencies else 0.0,
+            "slo_sec": self.slo_sec,
+            "slo_ok": p95 <= self.slo_sec,
+            "slo_violations": violations,
+            "backpressure_sec": self.backpressure_sec,
+            "vad_skipped_fraction": self.segmenter.skipped_fraction() if self.segmenter else 0.0,
+        }
+
+
+class TranscriptionServer(socketserver.ThreadingTCPServer):
+    """
+    Server TCP yang berbagi satu WhisperEngine dan satu pool worker
+    inferensi untuk semua stream.
+
+    `n_threads` adalah jumlah thread whisper untuk model yang dipakai stream
+    (None = default model / profil autotune). Inferensi pada model yang sama tetap serial
+    (satu konteks whisper per model), jadi worker tambahan berguna saat
+    stream memakai ukuran model yang berbeda.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, engine, address=(DEFAULT_HOST, DEFAULT_PORT), n_workers=DEFAULT_WORKERS,
+                 n_threads=None, slo_sec=LATENCY_SLO_SEC, max_pending=MAX_PENDING_SEGMENTS):
+        super().__init__(address, _StreamHandler)
+        self.engine = engine
+        self.n_threads = n_threads
+        self.slo_sec = slo_sec
+        self.queue = FairQueue(max_pending=max_pending)
+        self.sessions = {}
+        self._sessions_lock = threading.Lock()
+        self.finished_stats = []  # Statistik stream yang sudah selesai
+
+        self._workers = [
+            threading.Thread(target=self._worker_loop, name=f"infer-{i}", daemon=True)
+            for i in range(max(1, n_workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def _worker_loop(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            stream_id, (session, audio, t_enqueued, index) = job
+            try:
+                text, delay = self.engine.transcribe_segment(session.model_name, audio)
+                latency = time.perf_counter() - t_enqueued
+                if text.startswith("Error:"):
+                    session.segments_failed += 1
+                    session.send({"type": "error", "segment": index, "error": text})
+                    continue
+                session.record_latency(latency)
+                session.send({
+                    "type": "segment",
+                    "segment": index,
+                    "text": text,
+                    "audio_sec": len(audio) / SAMPLE_RATE,
+                    "delay": delay,  # Waktu inferensi
+                    "latency": latency,  # Termasuk waktu antri
+                })
+            finally:
+                self.queue.task_done(stream_id)
+
+    def register(self, session):
+        with self._sessions_lock:
+            if session.stream_id in self.sessions:
+                return False
+            self.sessions[session.stream_id] = session
+            return True
+
+    def unregister(self, session):
+        with self._sessions_lock:
+            if self.sessions.get(session.stream_id) is session:
+                del self.sessions[session.stream_id]
+                self.finished_stats.append(session.get_stats())
+
+    def get_stats(self):
+        """
+        Statistik semua stream aktif, ditambah kedalaman antrian bersama.
+        """
+        with self._sessions_lock:
+            sessions = list(self.sessions.values())
+        return {
+            "pending_segments": self.queue.pending(),
+            "max_pending": self.queue.max_pending,
+            "workers": len(self._workers),
+            "streams": [s.get_stats() for s in sessions],
+        }
+
+    def server_close(self):
+        self.queue.close()
+        super().server_close()
+
+
+class _StreamHandler(socketserver.StreamRequestHandler):
+    """
+    Satu thread per koneksi: membaca audio, memotong segmen, dan
+    memasukkannya ke antrian bersama.
+    """
+    def handle(self):
+        server = self.server
+        try:
+            header = json.loads(self.rfile.readline().decode("utf-8") or "{}")
+        except ValueError as e:
+            self._send_raw({"type": "error", "error": f"Header tidak valid: {e}"})
+            return
+
+        from whisper_engine import AVAILABLE_MODELS
+
+        stream_id = str(header.get("stream_id") or f"{self.client_address[0]}:{self.client_address[1]}")
+        model_name = header.get("model", "base")
+        if model_name not in AVAILABLE_MODELS:
+            # Nama dari klien tidak boleh menjadi path file model sembarang
+            self._send_raw({"type": "error", "error": f"Model '{model_name}' tidak dikenal "
+                                                      f"(pilih: {', '.join(AVAILABLE_MODELS)})"})
+            return
+        session = StreamSession(stream_id, model_name, self.connection,
+                                use_vad=header.get("vad", True), slo_sec=server.slo_sec)
+        try:
+            if server.n_threads:
+                server.engine.set_model_threads(model_name, server.n_threads)
+            server.engine._load_model(model_name)  # Sudah ter-cache jika stream lain memakai model ini
+        except Exception as e:
+            session.send({"type": "error", "error": f"Model '{model_name}' tidak bisa dimuat: {e}"})
+            return
+        if not server.register(session):
+            session.send({"type": "error", "error": f"stream_id '{stream_id}' sudah dipakai"})
+            return
+
+        print(f"Stream '{stream_id}' terhubung (model: {model_name}).")
+        session.send({"type": "ready", "stream_id": stream_id})
+        index = 0
+        try:
+            block_bytes = READ_BLOCK_SAMPLES * 2
+            pending = b""
+            while True:
+                data = self.rfile.read1(block_bytes)
+                if not data:
+                    break
+                pending += data
+                usable = len(pending) - len(pending) % 2
+                if usable == 0:
+                    continue
+                audio = np.frombuffer(pending[:usable], dtype="<i2").astype(np.float32) / 32768.0
+                pending = pending[usable:]
+                for segment in session.feed(audio):
+                    index = self._enqueue(session, segment, index)
+
+            for segment in session.flush():
+                index = self._enqueue(session, segment, index)
+            server.queue.wait_idle(stream_id)
+            session.send({"type": "end", "stats": session.get_stats()})
+        except OSError as e:
+            print(f"Stream '{stream_id}' terputus: {e}")
+        finally:
+            server.queue.remove(stream_id)  # Buang segmen yang tersisa jika stream berhenti di tengah
+            server.unregister(session)
+            stats = session.get_stats()
+            print(f"Stream '{stream_id}' selesai: {stats['segments_done']} segmen, "
+                  f"p95 {stats['latency_p95_sec']:.2f} dtk (SLO {stats['slo_sec']:.1f} dtk), "
+                  f"backpressure {stats['backpressure_sec']:.1f} dtk")
+
+    def _enqueue(self, session, segment, index):
+        t_wait = time.perf_counter()
+        # Blokir di sini = socket tidak dibaca = klien tertahan oleh TCP
+        self.server.queue.put(session.stream_id, (session, segment, time.perf_counter(), index))
+        session.backpressure_sec += time.perf_counter() - t_wait
+        return index + 1
+
+    def _send_raw(self, message):
+        try:
+            self.wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+        except OSError:
+            pass
+
+
+def send_file(audio_file_path, stream_id, model_name="base", host=DEFAULT_HOST, port=DEFAULT_PORT,
+              speed=1.0, use_vad=True, on_message=None):
+    """
+    Klien sederhana: mengirim file audio sebagai stream (real-time dibagi
+    `speed`) dan mengembalikan daftar pesan dari server.
+    """
+    from audio_frontend import load_audio_16k
+
+    audio = load_audio_16k(audio_file_path)
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2")
+    messages = []
+
+    with socket.create_connection((host, port)) as sock:
+        def receive():
+            for line in sock.makefile("r", encoding="utf-8"):
+                message = json.loads(line)
+                messages.append(message)
+                if on_message is not None:
+                    on_message(message)
+
+        receiver = threading.Thread(target=receive, daemon=True)
+        receiver.start()
+
+        header = {"stream_id": stream_id, "model": model_name, "vad": use_vad}
+        sock.sendall((json.dumps(header) + "\n").encode("utf-8"))
+        t_start = time.perf_counter()
+        for pos in range(0, len(pcm), READ_BLOCK_SAMPLES):
+            block = pcm[pos:pos + READ_BLOCK_SAMPLES]
+            sock.sendall(block.tobytes())
+            if speed > 0:
+                delay = t_start + (pos + len(block)) / SAMPLE_RATE / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        sock.shutdown(socket.SHUT_WR)
+        receiver.join()
+    return messages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Server transkripsi multi-stream.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="Menjalankan server")
+    serve.add_argument("--host", default=DEFAULT_HOST)
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--models", nargs="+", default=["base"], help="Model yang di-preload")
+    serve.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    serve.add_argument("--threads", type=int, default=None, help="Thread whisper per inferensi")
+    serve.add_argument("--slo", type=float, default=LATENCY_SLO_SEC, help="Target p95 latensi (detik)")
+    serve.add_argument("--stats-interval", type=float, default=0, help="Cetak statistik setiap N detik")
+
+    send = sub.add_parser("send", help="Mengirim file audio sebagai satu stream")
+    send.add_argument("audio")
+    send.add_argument("--host", default=DEFAULT_HOST)
+    send.add_argument("--port", type=int, default=DEFAULT_PORT)
+    send.add_argument("--stream-id", default="file")
+    send.add_argument("--model", default="base")
+    send.add_argument("--speed", type=float, default=1.0, help="0 = secepatnya")
+    send.add_argument("--no-vad", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "send":
+        def show(message):
+            if message["type"] == "segment":
+                print(f"[{message['latency']:.2f} dtk] {message['text']}")
+            elif message["type"] != "ready":
+                print(json.dumps(message, ensure_ascii=False))
+        send_file(args.audio, args.stream_id, args.model, args.host, args.port,
+                  args.speed, not args.no_vad, on_message=show)
+        return 0
+
+    from whisper_engine import WhisperEngine
+    engine = WhisperEngine(use_result_cache=False)
+    for model_name in args.models:
+        engine.set_model_threads(model_name, args.threads)
+    engine.preload(args.models).join()
+
+    server = TranscriptionServer(engine, (args.host, args.port), n_workers=args.workers,
+                                 n_threads=args.threads, slo_sec=args.slo)
+    print(f"Server transkripsi mendengarkan di {args.host}:{args.port} "
+          f"({args.workers} worker, model: {', '.join(args.models)})")
+
+    if args.stats_interval > 0:
+        def report():
+            while True:
+                time.sleep(args.stats_interval)
+                print(json.dumps(server.get_stats(), ensure_ascii=False))
+        threading.Thread(target=report, daemon=True).start()
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Server dihentikan.")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
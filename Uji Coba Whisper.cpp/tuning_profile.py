@@ -0,0 +1,59 @@
+import os
+import json
+import time
+import socket
+import threading
+
+# Profil hasil autotune, disimpan per host lalu per model
+TUNING_PROFILE_PATH = os.path.join("./models", "tuning_profile.json")
+
+_lock = threading.Lock()
+
+
+def host_key():
+    return socket.gethostname()
+
+
+def load_profile(path=TUNING_PROFILE_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def get_tuned_params(model_name, path=TUNING_PROFILE_PATH):
+    """
+    Konfigurasi hasil autotune untuk model ini di host ini, atau None.
+    """
+    return load_profile(path).get(host_key(), {}).get(model_name)
+
+
+def save_tuned_params(model_name, params, path=TUNING_PROFILE_PATH):
+    """
+    Menyimpan konfigurasi terbaik satu model untuk host ini (menimpa yang lama).
+    """
+    with _lock:
+        profile = load_profile(path)
+        entry = dict(params)
+        entry["tuned_at"] = time.time()
+        profile.setdefault(host_key(), {})[model_name] = entry
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(profile, f, indent=2)
+        os.replace(tmp_path, path)
+
+
+def get_parallel_split(model_names, path=TUNING_PROFILE_PATH):
+    """
+    (concurrency, threads_per_job) hasil autotune untuk menjalankan model-model
+    ini bersamaan, atau None jika ada model yang belum di-autotune. Dengan
+    beberapa model, dipakai entri dengan concurrency terkecil (paling aman).
+    """
+    entries = [get_tuned_params(model_name, path) for model_name in model_names]
+    if not entries or any(not entry or not entry.get("concurrency") for entry in entries):
+        return None
+    entry = min(entries, key=lambda e: e["concurrency"])
+    return entry["concurrency"], entry["threads_per_job"]
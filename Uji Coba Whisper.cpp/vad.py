@@ -0,0 +1,175 @@
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30  # Panjang frame analisis
+ENERGY_FLOOR_DB = -50.0  # Di bawah ini selalu dianggap hening
+ENERGY_MARGIN_DB = 12.0  # Speech harus sekian dB di atas estimasi noise
+ZCR_MAX = 0.3  # Frame dengan zero-crossing rate tinggi cenderung desis/noise
+ZCR_OVERRIDE_DB = 10.0  # ...kecuali energinya jauh di atas ambang (frikatif keras)
+NOISE_ADAPT_RATE = 0.05  # Kecepatan adaptasi estimasi noise floor per blok
+HANGOVER_MS = 300  # Speech dianggap berlanjut selama ini setelah frame speech terakhir
+
+MIN_SEGMENT_SEC = 0.3  # Segmen lebih pendek dari ini dibuang
+MAX_SEGMENT_SEC = 8  # Segmen dipotong paksa jika speech terus berlanjut
+PRE_ROLL_MS = 200  # Audio sebelum onset speech yang ikut dikirim
+
+
+class VoiceActivityDetector:
+    """
+    VAD ringan berbasis energi + zero-crossing rate dengan hangover.
+
+    Semua perhitungan per frame dilakukan secara vektor dengan NumPy.
+    Sisa sampel yang belum genap satu frame dan status hangover dibawa
+    ke pemanggilan berikutnya, sehingga blok boleh berukuran bebas.
+    """
+    def __init__(self, sample_rate=SAMPLE_RATE, frame_ms=FRAME_MS, hangover_ms=HANGOVER_MS,
+                 margin_db=ENERGY_MARGIN_DB, zcr_max=ZCR_MAX):
+        self.sample_rate = sample_rate
+        self.frame_len = int(sample_rate * frame_ms / 1000)
+        self.hangover_frames = int(round(hangover_ms / frame_ms))
+        self.margin_db = margin_db
+        self.zcr_max = zcr_max
+
+        self.noise_floor_db = ENERGY_FLOOR_DB
+        self._residual = np.zeros(0, dtype=np.float32)
+        self._frames_since_speech = self.hangover_frames + 1
+
+        # Statistik
+        self.total_frames = 0
+        self.speech_frames = 0
+
+    def process(self, audio):
+        """
+        Menganalisis blok audio.
+
+        Mengembalikan (frames, flags): `frames` berbentuk (n_frame, frame_len)
+        dan `flags` bernilai True untuk frame speech (sudah termasuk hangover).
+        """
+        audio = np.concatenate((self._residual, np.asarray(audio, dtype=np.float32)))
+        n_frames = len(audio) // self.frame_len
+        self._residual = audio[n_frames * self.frame_len:]
+        frames = audio[:n_frames * self.frame_len].reshape(n_frames, self.frame_len)
+        if n_frames == 0:
+            return frames, np.zeros(0, dtype=bool)
+
+        # Energi (dB) dan zero-crossing rate per frame
+        energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_len - 1)
+
+        threshold = max(ENERGY_FLOOR_DB, self.noise_floor_db + self.margin_db)
+        raw = (energy_db > threshold) & (
+            (zcr < self.zcr_max) | (energy_db > threshold + ZCR_OVERRIDE_DB)
+        )
+
+        # Noise floor mengikuti frame non-speech (naik perlahan, turun cepat)
+        quiet = energy_db[~raw]
+        if len(quiet):
+            block_noise = float(np.percentile(quiet, 20))
+            if block_noise < self.noise_floor_db:
+                self.noise_floor_db = block_noise
+            else:
+                self.noise_floor_db += NOISE_ADAPT_RATE * (block_noise - self.noise_floor_db)
+
+        # Hangover: jarak tiap frame ke frame speech terakhir (termasuk dari blok sebelumnya)
+        idx = np.arange(n_frames)
+        last_speech = np.maximum.accumulate(np.where(raw, idx, -1 - self._frames_since_speech))
+        flags = (idx - last_speech) <= self.hangover_frames
+        self._frames_since_speech = int(n_frames - 1 - last_speech[-1])
+
+        self.total_frames += n_frames
+        self.speech_frames += int(np.count_nonzero(flags))
+        return frames, flags
+
+    def reset(self):
+        self._residual = np.zeros(0, dtype=np.float32)
+        self._frames_since_speech = self.hangover_frames + 1
+
+
+class SpeechSegmenter:
+    """
+    Memotong audio menjadi segmen speech berdasarkan VAD.
+
+    Segmen berakhir di batas speech (setelah hangover habis) atau saat
+    mencapai `max_segment_sec`. Audio hening tidak pernah dikirim ke model.
+    """
+    def __init__(self, vad=None, min_segment_sec=MIN_SEGMENT_SEC,
+                 max_segment_sec=MAX_SEGMENT_SEC, pre_roll_ms=PRE_ROLL_MS):
+        self.vad = vad or VoiceActivityDetector()
+        frame_len = self.vad.frame_len
+        sample_rate = self.vad.sample_rate
+        self.min_frames = int(min_segment_sec * sample_rate / frame_len)
+        self.max_frames = int(max_segment_sec * sample_rate / frame_len)
+        self.pre_roll_frames = int(pre_roll_ms * sample_rate / 1000 / frame_len)
+
+        self._segment = []  # Daftar array frame untuk segmen yang sedang berjalan
+        self._segment_frames = 0
+        self._pre_roll = np.zeros((0, frame_len), dtype=np.float32)
+
+        # Statistik
+        self.total_samples = 0
+        self.emitted_samples = 0
+        self.segments_emitted = 0
+        self.segments_discarded = 0
+
+    def feed(self, audio):
+        """
+        Memasukkan blok audio; mengembalikan daftar segmen speech yang selesai.
+        """
+        frames, flags = self.vad.process(audio)
+        self.total_samples += frames.size
+        segments = []
+        if len(flags) == 0:
+            return segments
+
+        # Iterasi per run (rangkaian frame dengan flag sama), bukan per frame
+        boundaries = np.flatnonzero(np.diff(flags.astype(np.int8))) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(flags)]))
+
+        for start, end in zip(starts, ends):
+            run = frames[start:end]
+            if flags[start]:
+                while len(run):
+                    if not self._segment and len(self._pre_roll):
+                        self._segment.append(self._pre_roll)
+                        self._segment_frames += len(self._pre_roll)
+                        self._pre_roll = self._pre_roll[:0]
+                    take = min(len(run), max(self.max_frames - self._segment_frames, 1))
+                    self._segment.append(run[:take])
+                    self._segment_frames += take
+                    run = run[take:]
+                    if self._segment_frames >= self.max_frames:
+                        segments.extend(self._finish())
+            else:
+                segments.extend(self._finish())
+                self._pre_roll = run[-self.pre_roll_frames:] if self.pre_roll_frames else run[:0]
+        return segments
+
+    def flush(self):
+        """
+        Mengeluarkan segmen yang masih berjalan (dipanggil saat sesi berakhir).
+        """
+        return self._finish()
+
+    def _finish(self):
+        if not self._segment:
+            return []
+        n_frames = self._segment_frames
+        audio = np.concatenate(self._segment).reshape(-1)
+        self._segment = []
+        self._segment_frames = 0
+        if n_frames < self.min_frames:
+            self.segments_discarded += 1
+            return []
+        self.emitted_samples += len(audio)
+        self.segments_emitted += 1
+        return [audio]
+
+    def skipped_fraction(self):
+        """
+        Fraksi audio yang tidak dikirim ke model (hemat komputasi).
+        """
+        if self.total_samples == 0:
+            return 0.0
+        return max(0.0, 1.0 - self.emitted_samples / self.total_samples)
@@ -1,68 +1,301 @@
 import os
 from whisper_cpp_python import Whisper
 import numpy as np
-import soundfile as sf
 import time
+import threading
+
+from streaming import StreamingTranscriber, DEFAULT_WINDOW_SEC, DEFAULT_HOP_SEC, find_overlap, MAX_OVERLAP_WORDS
+from audio_frontend import iter_audio_blocks, audio_duration, load_audio_16k
+from model_cache import ModelCache
+from result_cache import ResultCache
+from tuning_profile import get_tuned_params
+from model_store import ModelStore, process_memory
+from segments import SegmentTable
+import tracing
 
 
 MODEL_DIR = "./models"
 
+# Model yang tersedia
+AVAILABLE_MODELS = ["tiny", "base", "small", "medium", "large"]
+
+DEFAULT_N_THREADS = os.cpu_count() or 4
+
 WHISPER_PARAMS = {
-    'n_threads': os.cpu_count() or 4,
+    'n_threads': None,  # None = profil autotune host ini, lalu DEFAULT_N_THREADS
     'use_gpu': False,  # Set True jika pake NVIDIA GPU & CUDA
     'gpu_device': 0,
 }
 
+# Batas total RAM (perkiraan) untuk model yang disimpan di cache
+MODEL_MEMORY_BUDGET_MB = int(os.environ.get("WHISPER_MODEL_BUDGET_MB", 4096))
+
+WARMUP_SEC = 1  # Panjang audio hening untuk inferensi pemanasan
+SAMPLE_RATE = 16000
+
+# Transkripsi file secara streaming (memori konstan untuk rekaman panjang)
+FILE_WINDOW_SEC = 30  # Sama dengan jendela internal Whisper
+FILE_OVERLAP_SEC = 5  # Overlap antar jendela agar kata di batas tidak terpotong
+LONG_FILE_SEC = 120  # File lebih panjang dari ini otomatis diproses streaming
+# Field segmen whisper yang disimpan di cache hasil (cukup untuk SegmentTable.from_dicts)
+CACHED_SEGMENT_KEYS = ('start', 'end', 'text', 'avg_logprob', 'no_speech_prob', 'tokens')
+
+# Tahap preload yang dilaporkan ke progress_callback
+PRELOAD_LOADING = "loading"
+PRELOAD_WARMING = "warming"
+PRELOAD_READY = "ready"
+PRELOAD_ERROR = "error"
+
+
+class TranscriptionStopped(Exception):
+    """
+    Transkripsi streaming dihentikan oleh `should_stop`; tidak diubah menjadi "Error: ...".
+    """
+    pass
+
+
 class WhisperEngine:
     """
     Class wrapper untuk memuat dan menjalankan model whisper.cpp.
     """
-    def __init__(self):
-        self.models = {}  # Cache untuk menyimpan model yang sudah di-load
+    def __init__(self, memory_budget_mb=MODEL_MEMORY_BUDGET_MB, use_result_cache=True):
+        # Cache LRU untuk model yang sudah di-load, dibatasi total memori
+        self.models = ModelCache(self._create_model, memory_budget_mb * 2**20)
+        # File model diverifikasi (checksum) sebelum dimuat
+        self.store = ModelStore(MODEL_DIR)
+        # Cache persisten hasil transkripsi file (Mode 2 / batch); identitas model = checksum store
+        self.result_cache = ResultCache(model_hash=self.store.verify) if use_result_cache else None
+        self._warm_models = set()  # Model yang sudah menjalani inferensi pemanasan
+        self._model_params = {}  # model_name -> dict parameter yang dipakai model tsb
+        self._infer_locks = {}  # model_name -> Lock; satu konteks whisper tidak boleh dipakai paralel
+        self._thread_overrides = {}  # model_name -> n_threads dari set_model_threads
+        self._load_private_mb = {}  # model_name -> pertambahan memori privat saat load
         print("WhisperEngine siap.")
 
+    def _create_model(self, model_path):
+        model_name = os.path.basename(model_path)[len("ggml-"):-len(".bin")]
+
+        params = dict(WHISPER_PARAMS)
+        params['n_threads'] = self.model_threads(model_name)
+
+        self.store.verify(model_path)
+
+        before = process_memory()
+        model = Whisper(
+            model_path=model_path,
+            whisper_params=params
+        )
+        after = process_memory()
+        if before and after:
+            # Salinan bobot di buffer whisper.cpp (tidak bisa dibagi antar proses)
+            self._load_private_mb[model_name] = (after["Anonymous"] - before["Anonymous"]) / 2**20
+        self._model_params[model_name] = params
+        print(f"Model '{os.path.basename(model_path)}' berhasil dimuat ({params['n_threads']} thread).")
+        return model
+
+    def _model_path(self, model_name):
+        return os.path.join(MODEL_DIR, f"ggml-{model_name}.bin")
+
     def _load_model(self, model_name="base"):
         """
-        Memuat model ke memori jika belum ada.
+        Memuat model ke memori jika belum ada. Aman dipanggil dari banyak thread.
         """
-        if model_name not in self.models:
-            print(f"Memuat model '{model_name}'... (Mungkin perlu beberapa detik)")
-            model_path = os.path.join(MODEL_DIR, f"ggml-{model_name}.bin")
-            
-            if not os.path.exists(model_path):
-                print(f"Error: Model file not found at {model_path}")
-                raise FileNotFoundError(f"Model file not found at {model_path}")
-                
-            self.models[model_name] = Whisper(
-                model_path=model_path,
-                whisper_params=WHISPER_PARAMS
-            )
-            print(f"Model '{model_name}' berhasil dimuat.")
-        
-        return self.models[model_name]
+        model_path = self._model_path(model_name)
+        if model_name in self.models:
+            return self.models.get(model_name, model_path)
+
+        if not os.path.exists(model_path):
+            print(f"Error: Model file not found at {model_path}")
+            raise FileNotFoundError(f"Model file not found at {model_path}")
+        print(f"Memuat model '{model_name}'... (Mungkin perlu beberapa detik)")
+        with tracing.span("engine.load_model", model=model_name):
+            return self.models.get(model_name, model_path)
+
+    def _infer(self, model_name, audio):
+        """
+        Satu-satunya jalur pemanggilan model.transcribe.
+        """
+        model = self._load_model(model_name)
+        lock = self._infer_locks.setdefault(model_name, threading.Lock())
+        with tracing.span("engine.lock_wait", model=model_name):
+            lock.acquire()
+        try:
+            with tracing.span("engine.transcribe", model=model_name, audio_sec=len(audio) / SAMPLE_RATE):
+                return model.transcribe(audio, language='id') # Paksa Bahasa Indonesia
+        finally:
+            lock.release()
+
+    def model_threads(self, model_name):
+        """
+        Jumlah thread untuk model ini. Urutan prioritas: set_model_threads,
+        WHISPER_PARAMS['n_threads'] yang diisi eksplisit (mis. jatah per
+        proses dari scheduler), profil autotune host ini, DEFAULT_N_THREADS.
+        Nilai ini hanya dibaca saat model dimuat; mengubahnya berarti memuat ulang model.
+        """
+        if self._thread_overrides.get(model_name):
+            return self._thread_overrides[model_name]
+        if WHISPER_PARAMS['n_threads']:
+            return WHISPER_PARAMS['n_threads']
+        tuned = get_tuned_params(model_name)
+        if tuned and tuned.get('n_threads'):
+            return tuned['n_threads']
+        return DEFAULT_N_THREADS
+
+    def set_model_threads(self, model_name, n_threads):
+        """
+        Mengatur jumlah thread satu model (None = kembali ke default).
+
+        whisper.cpp menerima n_threads saat konteks dibuat, jadi model yang
+        sudah dimuat dengan jumlah thread berbeda dikeluarkan dari cache dan
+        dimuat ulang saat dipakai berikutnya.
+        """
+        if n_threads:
+            self._thread_overrides[model_name] = n_threads
+        else:
+            self._thread_overrides.pop(model_name, None)
+        params = self._model_params.get(model_name)
+        if model_name in self.models and params['n_threads'] != self.model_threads(model_name):
+            self.models.evict(model_name)
+            self._warm_models.discard(model_name)
 
-    def transcribe_file(self, model_name, audio_file_path):
+    def preload(self, model_names, progress_callback=None):
+        """
+        Memuat dan memanaskan model di thread background.
+
+        `progress_callback(model_name, tahap, info)` dipanggil dari thread
+        background untuk setiap tahap (PRELOAD_*); `info` berisi posisi
+        "i/n" atau pesan error. Mengembalikan thread yang sudah berjalan.
+        """
+        if isinstance(model_names, str):
+            model_names = [model_names]
+        model_names = list(model_names)
+
+        def report(model_name, stage, info=""):
+            if progress_callback is not None:
+                progress_callback(model_name, stage, info)
+
+        def worker():
+            for i, model_name in enumerate(model_names, start=1):
+                position = f"{i}/{len(model_names)}"
+                if self.is_ready(model_name):
+                    report(model_name, PRELOAD_READY, position)
+                    continue
+                try:
+                    report(model_name, PRELOAD_LOADING, position)
+                    self._load_model(model_name)
+                    report(model_name, PRELOAD_WARMING, position)
+                    self.warm_up(model_name)
+                    report(model_name, PRELOAD_READY, position)
+                except Exception as e:
+                    print(f"Error saat preload model '{model_name}': {e}")
+                    report(model_name, PRELOAD_ERROR, str(e))
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        return thread
+
+    def warm_up(self, model_name):
+        """
+        Menjalankan satu inferensi pendek pada audio hening agar alokasi
+        buffer sekali-jalan tidak terjadi pada caption pertama.
+        """
+        silence = np.zeros(WARMUP_SEC * SAMPLE_RATE, dtype=np.float32)
+        t_start = time.time()
+        self._infer(model_name, silence)
+        self._warm_models.add(model_name)
+        print(f"Pemanasan model '{model_name}' selesai dalam {time.time() - t_start:.2f} detik.")
+
+    def is_ready(self, model_name):
+        """
+        True jika model sudah dimuat, masih ada di cache, dan sudah dipanaskan.
+        """
+        return model_name in self._warm_models and model_name in self.models
+
+    def memory_stats(self):
+        """
+        Pertambahan memori privat saat load per model yang sedang dimuat,
+        plus total proses (MB). Kosong di luar Linux.
+        """
+        models = {}
+        for model_name in self._model_params:
+            if model_name not in self.models:
+                continue
+            models[model_name] = {
+                "file_mb": os.path.getsize(self._model_path(model_name)) / 2**20,
+                "load_private_mb": self._load_private_mb.get(model_name),
+            }
+
+        process = process_memory()
+        if process is not None:
+            process = {
+                "rss_mb": process["Rss"] / 2**20,
+                "pss_mb": process["Pss"] / 2**20,
+                "shared_mb": (process["Shared_Clean"] + process["Shared_Dirty"]) / 2**20,
+                "private_mb": (process["Private_Clean"] + process["Private_Dirty"]) / 2**20,
+            }
+        return {"models": models, "process": process}
+
+    def cache_stats(self):
+        """
+        Statistik cache model: hit/miss/eviction dan memori terpakai.
+        """
+        return self.models.stats()
+
+    def _cached_result(self, model_name, audio_file_path, decode_params):
+        """
+        Mengembalikan (kunci, meta, entri_cache_atau_None). Kunci None jika cache nonaktif.
+        """
+        if self.result_cache is None:
+            return None, None, None
+        params = {k: v for k, v in WHISPER_PARAMS.items() if k != 'n_threads'}  # Thread tidak mengubah hasil
+        params.update(decode_params)
+        key, meta = self.result_cache.make_key(audio_file_path, self._model_path(model_name), 'id', params)
+        entry = self.result_cache.get(key)
+        if entry is not None:
+            print(f"Hasil '{model_name}' untuk {os.path.basename(audio_file_path)} diambil dari cache.")
+        return key, meta, entry
+
+    def invalidate_results(self, audio_file_path=None, model_name=None):
+        """
+        Menghapus hasil transkripsi ter-cache untuk file dan/atau model tertentu
+        (tanpa argumen: semuanya). Mengembalikan jumlah entri yang dihapus.
+        """
+        if self.result_cache is None:
+            return 0
+        model_path = self._model_path(model_name) if model_name else None
+        return self.result_cache.invalidate(audio_file_path, model_path)
+
+    def transcribe_file(self, model_name, audio_file_path, return_segments=False):
         """
         Mentranskripsi seluruh file audio. (Untuk Mode 2)
         
-        Mengembalikan: (teks_hasil, waktu_proses_detik)
+        Mengembalikan: (teks_hasil, waktu_proses_detik), atau
+        (teks_hasil, waktu_proses_detik, SegmentTable) jika `return_segments`
+        (tabel None jika gagal).
         """
         try:
-            model = self._load_model(model_name)
-            
-            # Baca file audio
-            audio_data, samplerate = sf.read(audio_file_path, dtype='float32')
+            if audio_duration(audio_file_path) > LONG_FILE_SEC:
+                # Rekaman panjang tidak dibaca sekaligus ke memori
+                return self.transcribe_file_streaming(model_name, audio_file_path,
+                                                      return_segments=return_segments)
+
+            key, meta, cached = self._cached_result(model_name, audio_file_path, {'mode': 'full'})
+            if cached is not None:
+                if return_segments:
+                    # Dibangun dari segmen yang tersimpan; hanya saat diminta
+                    return cached['text'], cached['process_time'], SegmentTable.from_dicts(cached['segments'])
+                return cached['text'], cached['process_time']
+
+            self._load_model(model_name)
             
-            # Konversi ke 16kHz jika perlu (Whisper internal)
-            # whisper-cpp-python menangani ini, tapi pastikan audio mono
-            if audio_data.ndim > 1:
-                audio_data = np.mean(audio_data, axis=1) # Konversi ke mono
+            # Audio 16kHz mono float32 dari cache (didekode & di-resample sekali per file)
+            audio_data = load_audio_16k(audio_file_path)
 
             print(f"Mulai transkripsi file dengan model '{model_name}'...")
             t_start = time.time()
             
             # Transkripsi
-            result = model.transcribe(audio_data, language='id') # Paksa Bahasa Indonesia
+            result = self._infer(model_name, audio_data)
             
             t_end = time.time()
             
@@ -70,33 +303,183 @@ class WhisperEngine:
             process_time = t_end - t_start
             
             print(f"Transkripsi '{model_name}' selesai dalam {process_time:.2f} detik.")
+            if key is not None:
+                segments = [{k: seg[k] for k in CACHED_SEGMENT_KEYS if k in seg}
+                            for seg in result['segments']]
+                self.result_cache.put(key, meta, full_text, process_time, segments)
+            if return_segments:
+                table = SegmentTable()
+                table.add_result(result)
+                return full_text, process_time, table
             return full_text, process_time
 
         except Exception as e:
             print(f"Error saat transkripsi file: {e}")
+            if return_segments:
+                return f"Error: {e}", 0, None
             return f"Error: {e}", 0
 
-    def transcribe_segment(self, model_name, audio_numpy_array):
+    def iter_transcribe_file(self, model_name, audio_file_path,
+                             window_sec=FILE_WINDOW_SEC, overlap_sec=FILE_OVERLAP_SEC, table=None):
+        """
+        Mentranskripsi file per jendela tetap dengan overlap, sambil membaca
+        file per blok. Memori tetap sebesar satu jendela berapa pun panjang file.
+
+        Menghasilkan dict per jendela: `text` (hanya teks baru setelah overlap
+        dibuang), `start`/`end` (detik) dan `delay` (waktu inferensi).
+        Jika `table` (SegmentTable) diberikan, segmen whisper tiap jendela
+        ditambahkan dengan waktu absolut; segmen di overlap yang sudah
+        tercatat dari jendela sebelumnya dilewati.
+        """
+        if not 0 <= overlap_sec < window_sec:
+            raise ValueError("overlap_sec harus >= 0 dan lebih kecil dari window_sec")
+
+        self._load_model(model_name)
+        window_samples = int(window_sec * SAMPLE_RATE)
+        overlap_samples = int(overlap_sec * SAMPLE_RATE)
+        window = np.zeros(window_samples, dtype=np.float32)  # Dialokasikan sekali
+        filled = 0
+        window_start = 0  # Sampel pertama jendela dihitung dari awal file
+        has_new_audio = False
+        committed_words = []
+
+        def decode(audio):
+            t_start = time.time()
+            result = self._infer(model_name, audio)
+            delay = time.time() - t_start
+            if table is not None:
+                table.add_result(result, offset=window_start / SAMPLE_RATE, after=table.last_end if len(table) else None)
+
+            words = " ".join([seg['text'] for seg in result['segments']]).split()
+            start = find_overlap(committed_words, words) if committed_words else 0
+            new_words = words[start:]
+            committed_words.extend(new_words)
+            del committed_words[:-MAX_OVERLAP_WORDS]
+            return {
+                "text": " ".join(new_words),
+                "start": window_start / SAMPLE_RATE,
+                "end": (window_start + len(audio)) / SAMPLE_RATE,
+                "delay": delay
+            }
+
+        for block in iter_audio_blocks(audio_file_path):
+            pos = 0
+            while pos < len(block):
+                take = min(window_samples - filled, len(block) - pos)
+                window[filled:filled + take] = block[pos:pos + take]
+                filled += take
+                pos += take
+                has_new_audio = True
+
+                if filled == window_samples:
+                    yield decode(window)
+                    # Ekor jendela menjadi awal jendela berikutnya
+                    if overlap_samples:
+                        window[:overlap_samples] = window[-overlap_samples:]
+                    filled = overlap_samples
+                    window_start += window_samples - overlap_samples
+                    has_new_audio = False
+
+        if has_new_audio:
+            yield decode(window[:filled])
+
+    def transcribe_file_streaming(self, model_name, audio_file_path, on_segment=None,
+                                  window_sec=FILE_WINDOW_SEC, overlap_sec=FILE_OVERLAP_SEC, return_segments=False,
+                                  should_stop=None):
+        """
+        Versi streaming dari transcribe_file. `on_segment(dict)` dipanggil untuk
+        setiap jendela yang selesai sehingga hasil parsial bisa ditampilkan;
+        jendela yang diputar ulang dari cache hasil bertanda `cached: True`.
+        `should_stop()` dicek di antara jendela: jika True, TranscriptionStopped
+        dilempar dan hasil parsial tidak disimpan ke cache.
+
+        Mengembalikan: (teks_hasil, waktu_proses_detik), ditambah SegmentTable
+        jika `return_segments` (seperti transcribe_file).
+        """
+        try:
+            key, meta, cached = self._cached_result(
+                model_name,
+                audio_file_path,
+                {'mode': 'streaming', 'window_sec': window_sec, 'overlap_sec': overlap_sec}
+            )
+            if cached is not None and return_segments and 'segment_table' not in cached:
+                cached = None  # Entri tanpa segmen whisper: dekode ulang agar tabel lengkap
+            if cached is not None:
+                if on_segment is not None:
+                    for segment in cached['segments']:
+                        on_segment(dict(segment, cached=True))
+                if return_segments:
+                    return cached['text'], cached['process_time'], SegmentTable.from_dicts(cached['segment_table'])
+                return cached['text'], cached['process_time']
+
+            print(f"Mulai transkripsi streaming file dengan model '{model_name}'...")
+            texts = []
+            segments = []
+            table = SegmentTable() if return_segments else None
+            process_time = 0.0
+            for segment in self.iter_transcribe_file(model_name, audio_file_path, window_sec, overlap_sec, table):
+                process_time += segment['delay']
+                segments.append(segment)
+                if segment['text']:
+                    texts.append(segment['text'])
+                if on_segment is not None:
+                    on_segment(segment)
+                if should_stop is not None and should_stop():
+                    raise TranscriptionStopped(f"Transkripsi '{model_name}' dihentikan")
+
+            full_text = " ".join(texts)
+            print(f"Transkripsi '{model_name}' selesai dalam {process_time:.2f} detik.")
+            if key is not None:
+                self.result_cache.put(key, meta, full_text, process_time, segments,
+                                      table.to_dicts() if table is not None else None)
+            if return_segments:
+                return full_text, process_time, table
+            return full_text, process_time
+
+        except TranscriptionStopped:
+            raise
+        except Exception as e:
+            print(f"Error saat transkripsi file: {e}")
+            if return_segments:
+                return f"Error: {e}", 0, None
+            return f"Error: {e}", 0
+
+    def transcribe_segment(self, model_name, audio_numpy_array, return_segments=False):
         """
         Mentranskripsi potongan audio (numpy array). (Untuk Mode 1)
         
-        Mengembalikan: (teks_hasil, waktu_proses_detik)
+        Mengembalikan: (teks_hasil, waktu_proses_detik), ditambah SegmentTable
+        (waktu relatif terhadap awal potongan) jika `return_segments`.
         """
         try:
-            model = self._load_model(model_name)
+            self._load_model(model_name)
             
             t_start = time.time()
             
             # Transkripsi
-            result = model.transcribe(audio_numpy_array, language='id')
+            result = self._infer(model_name, audio_numpy_array)
             
             t_end = time.time()
             
-            full_text = " ".join([seg['text'] for seg in result['segments']])
+            with tracing.span("engine.join_segments"):
+                full_text = " ".join([seg['text'] for seg in result['segments']])
             process_time = t_end - t_start
             
+            if return_segments:
+                table = SegmentTable()
+                table.add_result(result)
+                return full_text.strip(), process_time, table
             return full_text.strip(), process_time
         
         except Exception as e:
             print(f"Error saat transkripsi segmen: {e}")
-            return f"Error: {e}", 0
\ No newline at end of file
+            if return_segments:
+                return f"Error: {e}", 0, None
+            return f"Error: {e}", 0
+
+    def create_stream(self, model_name, window_sec=DEFAULT_WINDOW_SEC, hop_sec=DEFAULT_HOP_SEC):
+        """
+        Membuat transkriptor streaming (jendela geser + commit bertahap). (Untuk Mode 1)
+        """
+        self._load_model(model_name)
+        return StreamingTranscriber(self, model_name, window_sec=window_sec, hop_sec=hop_sec)